@@ -0,0 +1,123 @@
+# api/aprovisionamiento.py
+# Alta masiva de usuarios desde CSV o JSON (endpoint usuarios/lote/ y comando aprovisionar_usuarios).
+# El comando hashea las contraseñas en paralelo en un pool de procesos; el endpoint, en el mismo
+# proceso. Los usuarios se insertan con bulk_create por lotes; cada fila inválida se informa
+# sin detener el resto.
+import csv
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from .models import CustomUser
+
+CAMPOS = ('dni', 'apel_nomb', 'tipo_usuarioapp', 'password')
+TIPOS_USUARIO = set(CustomUser.TipoUsuario.values)
+TAMANO_LOTE = 500
+
+
+def leer_filas(contenido, nombre=''):
+    # JSON: lista de objetos con CAMPOS; CSV: una fila de encabezado con CAMPOS
+    if nombre.endswith('.json') or contenido.lstrip().startswith('['):
+        filas = json.loads(contenido)
+        if not isinstance(filas, list):
+            raise ValueError('El JSON debe ser una lista de usuarios.')
+        return filas
+    return list(csv.DictReader(io.StringIO(contenido.lstrip('\ufeff'))))
+
+
+def _validar_fila(fila):
+    if not isinstance(fila, dict):
+        return {'fila': ['Debe ser un objeto con los campos ' + ', '.join(CAMPOS) + '.']}
+
+    errores = {}
+    for campo, maximo in (('dni', 12), ('apel_nomb', 255), ('password', 128)):
+        valor = fila.get(campo)
+        if not isinstance(valor, str) or not valor.strip():
+            errores[campo] = ['Este campo es obligatorio.']
+        elif len(valor) > maximo:
+            errores[campo] = [f'No puede tener más de {maximo} caracteres.']
+    # Obligatorio aquí: el valor por defecto del modelo es Administrador
+    if fila.get('tipo_usuarioapp') not in TIPOS_USUARIO:
+        errores['tipo_usuarioapp'] = ['Debe ser uno de: ' + ', '.join(sorted(TIPOS_USUARIO)) + '.']
+    return errores
+
+
+def validar(filas):
+    # Devuelve las filas válidas como (número de fila, fila) y los errores de las demás
+    validas, errores, vistos = [], [], set()
+    for numero, fila in enumerate(filas, start=1):
+        errores_fila = _validar_fila(fila)
+        dni = fila.get('dni') if isinstance(fila, dict) else None
+        if not errores_fila and dni in vistos:
+            errores_fila = {'dni': ['DNI repetido en el archivo.']}
+        if errores_fila:
+            errores.append({'fila': numero, 'dni': dni, 'errores': errores_fila})
+        else:
+            vistos.add(dni)
+            validas.append((numero, fila))
+
+    # Una consulta por lote para los DNI que ya existen
+    dnis = [fila['dni'] for _, fila in validas]
+    existentes = set()
+    for inicio in range(0, len(dnis), TAMANO_LOTE):
+        existentes.update(CustomUser.objects.filter(dni__in=dnis[inicio:inicio + TAMANO_LOTE])
+                          .values_list('dni', flat=True))
+    if existentes:
+        for numero, fila in validas:
+            if fila['dni'] in existentes:
+                errores.append({'fila': numero, 'dni': fila['dni'], 'errores': {'dni': ['Ya existe un usuario con este DNI.']}})
+        validas = [(numero, fila) for numero, fila in validas if fila['dni'] not in existentes]
+    return validas, errores
+
+
+def _iniciar_proceso():
+    # Con el método 'spawn' los procesos hijos no heredan Django configurado
+    django.setup()
+
+
+def hashear(passwords, procesos=None):
+    procesos = settings.APROVISIONAR_PROCESOS if procesos is None else procesos
+    if procesos <= 1 or len(passwords) <= 1:
+        return [make_password(password) for password in passwords]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (procesos * 4))))
+
+
+def _insertar(lote, errores):
+    try:
+        with transaction.atomic():
+            CustomUser.objects.bulk_create([usuario for _, usuario in lote])
+        return len(lote)
+    except IntegrityError:
+        # Otro proceso creó alguno de estos DNI después de validar: se insertan de a uno
+        creados = 0
+        for numero, usuario in lote:
+            try:
+                with transaction.atomic():
+                    usuario.save(force_insert=True)
+                creados += 1
+            except IntegrityError:
+                errores.append({'fila': numero, 'dni': usuario.dni, 'errores': {'dni': ['Ya existe un usuario con este DNI.']}})
+        return creados
+
+
+def aprovisionar(filas, procesos=None):
+    validas, errores = validar(filas)
+    hashes = hashear([fila['password'] for _, fila in validas], procesos)
+
+    usuarios = [
+        (numero, CustomUser(dni=fila['dni'], apel_nomb=fila['apel_nomb'],
+                            tipo_usuarioapp=fila['tipo_usuarioapp'], password=password))
+        for (numero, fila), password in zip(validas, hashes)
+    ]
+    creados = 0
+    for inicio in range(0, len(usuarios), TAMANO_LOTE):
+        creados += _insertar(usuarios[inicio:inicio + TAMANO_LOTE], errores)
+
+    errores.sort(key=lambda error: error['fila'])
+    return {'creados': creados, 'errores': errores}
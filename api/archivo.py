@@ -0,0 +1,97 @@
+# api/archivo.py
+# Archivo de asistencias de días cerrados.
+# Las tablas ImportarAsistencia e ImportarAsistenciaDetalle solo conservan los días
+# que aún no se archivan; el resto se mueve a las tablas *Historico por periodo (YYYYMM).
+from django.db import transaction
+
+from .cantidades import cantidades
+from .dia import consultar_dias_abiertos
+from .empresas import bases_de_asistencias, en_base
+from .models import (
+    ImportarAsistencia, ImportarAsistenciaDetalle,
+    ImportarAsistenciaHistorico, ImportarAsistenciaDetalleHistorico, Registro,
+)
+from .sucursales import con_sucursal
+
+CAMPOS_CABECERA = ['id', 'idempresa', 'tipo_envio', 'idresponsable', 'idplanilla', 'idemisor',
+                   'idturno', 'fecha', 'idsucursal', 'idespecie']
+CAMPOS_DETALLE = ['item', 'importar_asistencia_id', 'idcodigogeneral', 'idactividad', 'idlabor',
+                  'idconsumidor', 'cantidad']
+TAMANO_LOTE = 1000
+
+
+class CantidadesSinGuardar(Exception):
+    # La tarea se reintenta más tarde, cuando los logs de api/cantidades.py ya se guardaron
+    pass
+
+
+def asistencias_en_rango(fecha_inicio, fecha_fin, archivado=False):
+    # Devuelve los querysets (actual y, si corresponde, histórico) que cubren el rango de fechas
+    consultas = [ImportarAsistencia.objects.filter(fecha__range=(fecha_inicio, fecha_fin))]
+    if archivado:
+        consultas.insert(0, ImportarAsistenciaHistorico.objects.filter(
+            periodo__range=(fecha_inicio[:6], fecha_fin[:6]),
+            fecha__range=(fecha_inicio, fecha_fin)
+        ))
+    return consultas
+
+
+def archivar_dia(registro_id):
+    registro = Registro.objects.get(pk=registro_id)
+    if registro.estado != 'Cerrado' or registro.archivado:
+        return 0
+
+    # Solo las asistencias de la sucursal del día (todas si es el día general)
+    with con_sucursal(registro.idsucursal):
+        # No mover las asistencias de un día que sigue abierto dentro del mismo rango
+        abiertos = consultar_dias_abiertos()
+        abierto = min(dia.FechaAbierto for dia in abiertos) if abiertos else None
+
+        # Cada base de asistencias (api/empresas.py) se archiva en su propia transacción; si una
+        # falla, reintentar la tarea solo mueve lo que quedó en las tablas actuales
+        archivadas = 0
+        for alias in bases_de_asistencias():
+            with en_base(alias):
+                archivadas += _archivar_en_base(alias, registro, abierto)
+
+    registro.archivado = True
+    registro.save(update_fields=['archivado'])
+    return archivadas
+
+
+def _archivar_en_base(alias, registro, abierto):
+    cabeceras = ImportarAsistencia.objects.filter(
+        fecha__range=(registro.FechaAbierto, registro.FechaCerrado)
+    )
+    if abierto:
+        cabeceras = cabeceras.filter(fecha__lt=abierto)
+
+    ids = list(cabeceras.values_list('id', flat=True))
+    if alias == 'default':
+        # Las cantidades diferidas (solo de 'default') de estas asistencias deben estar en la base
+        # antes de moverlas; si no, se guardarían en el histórico al vaciar el log
+        pendientes = cantidades.cabeceras_pendientes().intersection(ids)
+        if pendientes:
+            raise CantidadesSinGuardar(f'{len(pendientes)} asistencias con cantidades diferidas sin guardar')
+    with transaction.atomic(using=alias):
+        for inicio in range(0, len(ids), TAMANO_LOTE):
+            lote = ids[inicio:inicio + TAMANO_LOTE]
+
+            filas = list(ImportarAsistencia.objects.filter(id__in=lote).values(*CAMPOS_CABECERA))
+            periodos = {fila['id']: fila['fecha'][:6] for fila in filas}
+            ImportarAsistenciaHistorico.objects.bulk_create([
+                ImportarAsistenciaHistorico(periodo=periodos[fila['id']], id_original=fila.pop('id'), **fila) for fila in filas
+            ])
+            # bulk_create no devuelve las claves en MySQL: se leen por id original. Si un id ya se
+            # había archivado (el AUTO_INCREMENT se reinició), la clave más nueva es la recién creada
+            claves = dict(ImportarAsistenciaHistorico.objects.filter(id_original__in=lote)
+                          .order_by('clave').values_list('id_original', 'clave'))
+            ImportarAsistenciaDetalleHistorico.objects.bulk_create([
+                ImportarAsistenciaDetalleHistorico(periodo=periodos[fila['importar_asistencia_id']],
+                                                   importar_asistencia_id=claves[fila.pop('importar_asistencia_id')], **fila)
+                for fila in ImportarAsistenciaDetalle.objects.filter(importar_asistencia_id__in=lote).values(*CAMPOS_DETALLE)
+            ], batch_size=TAMANO_LOTE)
+
+            ImportarAsistenciaDetalle.objects.filter(importar_asistencia_id__in=lote).delete()
+            ImportarAsistencia.objects.filter(id__in=lote).delete()
+    return len(ids)
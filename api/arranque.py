@@ -0,0 +1,51 @@
+# api/arranque.py
+# Arranque de los procesos que sirven la API (gunicorn.conf.py).
+# Las vistas y los serializers están separados por área en api/views/ y api/serializers/, y
+# cada módulo se importa la primera vez que se usa: un worker sin preload solo carga los de
+# las rutas que atiende. Con preload, el proceso maestro llama a precargar() antes de crear
+# los workers, que heredan todo ya importado en memoria compartida (copy-on-write).
+from importlib import import_module
+
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+
+def atributos_diferidos(paquete, modulos):
+    # (__getattr__, __all__) de un paquete cuyos nombres viven en los submódulos de `modulos`
+    modulo_de = {nombre: modulo for modulo, nombres in modulos.items() for nombre in nombres}
+
+    def __getattr__(nombre):
+        modulo = modulo_de.get(nombre)
+        if modulo is None:
+            raise AttributeError(f'module {paquete!r} has no attribute {nombre!r}')
+        valor = getattr(import_module(f'{paquete}.{modulo}'), nombre)
+        setattr(import_module(paquete), nombre, valor)  # Las siguientes búsquedas no pasan por aquí
+        return valor
+
+    return __getattr__, sorted(modulo_de)
+
+
+def _patrones(resolver):
+    for patron in resolver.url_patterns:
+        if isinstance(patron, URLResolver):
+            yield from _patrones(patron)
+        else:
+            yield patron
+
+
+def precargar():
+    # Importa todas las vistas, serializers y rutas; devuelve la cantidad de rutas
+    from . import serializers, views
+
+    for paquete in (views, serializers):
+        for modulo in paquete.MODULOS:
+            import_module(f'{paquete.__name__}.{modulo}')
+    resolver = get_resolver()
+    resolver.reverse_dict  # Arma los índices de reverse() de todas las rutas
+    patrones = list(_patrones(resolver))
+    for patron in patrones:
+        if isinstance(patron.callback, views.VistaDiferida):
+            patron.callback.vista
+    # Un proceso hijo no puede usar una conexión abierta por el maestro
+    connections.close_all()
+    return len(patrones)
@@ -0,0 +1,129 @@
+# api/authentication.py
+# Autenticación JWT sin consultar la base de datos en cada petición.
+# Los tokens emitidos con TokenUsuario llevan firmados los datos del usuario
+# (dni, tipo_usuarioapp, is_active, is_staff, is_superuser); la única información que se consulta es la
+# lista de revocaciones, que se recarga en memoria cada JWT_REVOCACIONES_TTL segundos.
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser, RevocacionToken
+
+# Todo lo que leen los permisos (EsAdministrador mira is_staff); un token sin alguno se resuelve con la base
+CLAIMS_USUARIO = ('dni', 'tipo_usuarioapp', 'is_active', 'is_staff', 'is_superuser')
+CLAIM_EMITIDO = 'emitido'  # Momento del login con decimales; 'iat' solo tiene segundos enteros
+
+
+class TokenUsuario(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        # El token de acceso copia estos claims del token de refresco
+        for claim in CLAIMS_USUARIO:
+            token[claim] = getattr(user, claim)
+        token[CLAIM_EMITIDO] = time.time()
+        return token
+
+
+class Revocaciones:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revocados = {}
+        self._cargado = None
+
+    def _recargar(self):
+        # Solo interesan las revocaciones más recientes que la vida de un token de acceso
+        limite = timezone.now() - api_settings.ACCESS_TOKEN_LIFETIME
+        revocados = dict(
+            RevocacionToken.objects.filter(revocado_en__gte=limite).values_list('usuario_id', 'revocado_en')
+        )
+        self._revocados = {usuario_id: fecha.timestamp() for usuario_id, fecha in revocados.items()}
+        self._cargado = time.monotonic()
+
+    def revocado_en(self, usuario_id):
+        if self._cargado is None or time.monotonic() - self._cargado > settings.JWT_REVOCACIONES_TTL:
+            with self._lock:
+                if self._cargado is None or time.monotonic() - self._cargado > settings.JWT_REVOCACIONES_TTL:
+                    self._recargar()
+        return self._revocados.get(usuario_id)
+
+    def revocar(self, usuario_id):
+        # Quedan revocados los tokens emitidos hasta este momento; un login posterior sigue valiendo
+        revocado_en = timezone.now()
+        RevocacionToken.objects.update_or_create(usuario_id=usuario_id, defaults={'revocado_en': revocado_en})
+        self._revocados[usuario_id] = revocado_en.timestamp()
+        usuarios_cache.descartar(usuario_id)
+
+
+class UsuariosCache:
+    # Caché corta de usuarios para los tokens emitidos sin los claims de TokenUsuario
+    def __init__(self):
+        self._usuarios = {}
+
+    def obtener(self, usuario_id):
+        entrada = self._usuarios.get(usuario_id)
+        if entrada and entrada[0] > time.monotonic():
+            return entrada[1]
+        return None
+
+    def guardar(self, usuario_id, usuario):
+        self._usuarios[usuario_id] = (time.monotonic() + settings.JWT_USUARIOS_CACHE_TTL, usuario)
+
+    def descartar(self, usuario_id):
+        self._usuarios.pop(usuario_id, None)
+
+
+revocaciones = Revocaciones()
+usuarios_cache = UsuariosCache()
+
+
+def revocar_tokens(usuario_id):
+    revocaciones.revocar(usuario_id)
+
+
+def token_revocado(validated_token, revocado_en):
+    if revocado_en is None:
+        return False
+    if CLAIM_EMITIDO in validated_token:
+        return validated_token[CLAIM_EMITIDO] <= revocado_en
+    # Tokens sin 'emitido': con segundos enteros, los del mismo segundo de la revocación no se distinguen
+    return validated_token.get('iat', 0) <= int(revocado_en)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if token_revocado(validated_token, revocaciones.revocado_en(user_id)):
+            raise AuthenticationFailed(_("Token revocado"), code="token_revoked")
+
+        if all(claim in validated_token for claim in CLAIMS_USUARIO):
+            if not validated_token['is_active']:
+                raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+            # Usuario armado con los claims firmados; no se debe guardar con save()
+            user = CustomUser(
+                id=user_id,
+                dni=validated_token['dni'],
+                tipo_usuarioapp=validated_token['tipo_usuarioapp'],
+                is_active=True,
+                is_staff=validated_token['is_staff'],
+                is_superuser=validated_token['is_superuser'],
+            )
+            user._state.adding = False
+            return user
+
+        user = usuarios_cache.obtener(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            usuarios_cache.guardar(user_id, user)
+        return user
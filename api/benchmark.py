@@ -0,0 +1,219 @@
+# api/benchmark.py
+# Datos y tráfico de un turno real para el comando `benchmark_turno`.
+# Solo se ejecuta con backend.settings_benchmark (BENCHMARK = True), porque vacía la base de datos.
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.test import Client
+
+from .authentication import TokenUsuario
+from .models import (
+    Consumidor, CustomUser, Emisor, Empresa, Especie, ImportarAsistencia, ImportarAsistenciaDetalle,
+    ImportarAsistenciaDetalleHistorico, ImportarAsistenciaHistorico, Planilla, Registro, Responsable,
+    TipoEnvio, Turno,
+)
+
+PASSWORD = 'turno'
+TAMANO_LOTE = 5000
+
+# Mezcla de peticiones de un turno: (operación, peso)
+MEZCLA_TURNO = [
+    ('login', 3),
+    ('importar-asistencia', 15),
+    ('cantidad', 55),
+    ('ingresos-dia-actual', 5),
+    ('ingresos-trabajador', 22),
+]
+
+
+def _cabecera(rng, contexto, codigo, fecha):
+    return {
+        'idempresa': rng.choice(contexto['empresas']),
+        'tipo_envio': 'A',
+        'idresponsable': rng.choice(contexto['responsables']),
+        'idplanilla': rng.choice(contexto['planillas']),
+        'idemisor': '001',
+        'idturno': rng.choice(contexto['turnos']),
+        'fecha': fecha,
+        'idsucursal': '001',
+        'idespecie': rng.choice(contexto['especies']),
+    }
+
+
+def _detalles(rng, contexto, codigo):
+    return [{
+        'idcodigogeneral': codigo,
+        'idactividad': '001',
+        'idlabor': labor,
+        'idconsumidor': rng.choice(contexto['consumidores']),
+        'cantidad': round(rng.uniform(0, 500), 2),
+    } for labor in rng.sample(contexto['labores'], rng.choice([1, 1, 2]))]
+
+
+def sembrar(trabajadores, dias, especies, turnos, semilla, asistencia=0.85, importados_hoy=0.5):
+    rng = random.Random(semilla)
+    contexto = {
+        'empresas': ['001', '002'],
+        'especies': [f'{i:03d}' for i in range(1, especies + 1)],
+        'turnos': [f'{i:02d}' for i in range(1, turnos + 1)],
+        'responsables': [f'{i:06d}' for i in range(1, 21)],
+        'planillas': ['001', '002', '003'],
+        'consumidores': [f'{i:06d}' for i in range(1, 51)],
+        'labores': [f'L{i:05d}' for i in range(1, 11)],
+        'codigos': [f'{i:08d}' for i in range(1, trabajadores + 1)],
+        'dnis': [f'{40000000 + i}' for i in range(1, trabajadores + 1)],
+    }
+
+    Empresa.objects.bulk_create([Empresa(idempresa=i, nombre=f'Empresa {i}') for i in contexto['empresas']])
+    Especie.objects.bulk_create([Especie(idespecie=i, nombre=f'Especie {i}') for i in contexto['especies']])
+    Turno.objects.bulk_create([Turno(idturno=i, nombre=f'Turno {i}') for i in contexto['turnos']])
+    Responsable.objects.bulk_create([Responsable(idresponsable=i, nombre_apellido=f'Responsable {i}') for i in contexto['responsables']])
+    Planilla.objects.bulk_create([Planilla(idplanilla=i, nombre=f'Planilla {i}') for i in contexto['planillas']])
+    Consumidor.objects.bulk_create([Consumidor(idconsumidor=i, nombre_apellido=f'Consumidor {i}') for i in contexto['consumidores']])
+    Emisor.objects.create(idemisor='001', nombre='Emisor')
+    TipoEnvio.objects.create(nombre='Asistencia')
+
+    password = make_password(PASSWORD)
+    CustomUser.objects.bulk_create([
+        CustomUser(dni=dni, apel_nomb=f'Trabajador {dni}', tipo_usuarioapp='Proceso', password=password)
+        for dni in contexto['dnis']
+    ], batch_size=TAMANO_LOTE)
+    contexto['supervisor'] = CustomUser.objects.create_user('00000001', 'Supervisor', password=PASSWORD,
+                                                           tipo_usuarioapp='Supervisor')
+
+    # Días anteriores: cerrados y ya archivados, como quedan tras las tareas de cierre
+    hoy = date.today()
+    siguiente_id = 1
+    siguiente_item = 1
+    for dia in range(dias, 0, -1):
+        fecha = (hoy - timedelta(days=dia)).strftime('%Y%m%d')
+        Registro.objects.create(FechaAbierto=fecha, HoraAbierto='06:00:00', estado='Cerrado',
+                                FechaCerrado=fecha, HoraCerrado='18:00:00', archivado=True)
+        cabeceras, detalles = [], []
+        for codigo in contexto['codigos']:
+            if rng.random() > asistencia:
+                continue
+            cabeceras.append(ImportarAsistenciaHistorico(clave=siguiente_id, id_original=siguiente_id, periodo=fecha[:6],
+                                                         **_cabecera(rng, contexto, codigo, fecha)))
+            for detalle in _detalles(rng, contexto, codigo):
+                detalles.append(ImportarAsistenciaDetalleHistorico(clave=siguiente_item, item=siguiente_item, periodo=fecha[:6],
+                                                                   importar_asistencia_id=siguiente_id, **detalle))
+                siguiente_item += 1
+            siguiente_id += 1
+        ImportarAsistenciaHistorico.objects.bulk_create(cabeceras, batch_size=TAMANO_LOTE)
+        ImportarAsistenciaDetalleHistorico.objects.bulk_create(detalles, batch_size=TAMANO_LOTE)
+
+    # Día abierto con parte de los trabajadores ya importados
+    fecha = hoy.strftime('%Y%m%d')
+    Registro.objects.create(FechaAbierto=fecha, HoraAbierto='06:00:00', estado='Abierto')
+    importados = rng.sample(contexto['codigos'], int(len(contexto['codigos']) * importados_hoy))
+    cabeceras, detalles = [], []
+    for codigo in importados:
+        cabeceras.append(ImportarAsistencia(id=siguiente_id, **_cabecera(rng, contexto, codigo, fecha)))
+        for detalle in _detalles(rng, contexto, codigo):
+            detalles.append(ImportarAsistenciaDetalle(item=siguiente_item, importar_asistencia_id=siguiente_id, **detalle))
+            siguiente_item += 1
+        siguiente_id += 1
+    ImportarAsistencia.objects.bulk_create(cabeceras, batch_size=TAMANO_LOTE)
+    ImportarAsistenciaDetalle.objects.bulk_create(detalles, batch_size=TAMANO_LOTE)
+
+    # Las secuencias deben continuar después de los ids insertados a mano (PostgreSQL)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [ImportarAsistencia, ImportarAsistenciaDetalle]):
+            cursor.execute(sql)
+
+    contexto['importados'] = [(d.idcodigogeneral, d.idlabor) for d in detalles]
+    contexto['pendientes'] = sorted(set(contexto['codigos']) - set(importados))
+    return contexto
+
+
+def repetir_turno(contexto, peticiones, semilla):
+    rng = random.Random(semilla)
+    cliente = Client()
+    token = str(TokenUsuario.for_user(contexto['supervisor']).access_token)
+    cabeceras = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+    operaciones, pesos = zip(*MEZCLA_TURNO)
+    pendientes = list(contexto['pendientes'])
+    rng.shuffle(pendientes)
+    importados = list(contexto['importados'])
+    latencias = defaultdict(list)
+    errores = defaultdict(int)
+
+    def medir(operacion, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        respuesta = funcion(*args, **kwargs)
+        if respuesta.streaming:
+            # El Client no recorre el cuerpo: las consultas de una respuesta en streaming corren al leerlo
+            b''.join(respuesta.streaming_content)
+        latencias[operacion].append((time.perf_counter() - inicio) * 1000)
+        if respuesta.status_code >= 400:
+            errores[operacion] += 1
+        return respuesta
+
+    inicio_turno = time.perf_counter()
+    for _ in range(peticiones):
+        operacion = rng.choices(operaciones, pesos)[0]
+        if operacion == 'importar-asistencia' and not pendientes:
+            operacion = 'cantidad'
+
+        if operacion == 'login':
+            medir(operacion, cliente.post, '/api/token/',
+                  {'dni': rng.choice(contexto['dnis']), 'password': PASSWORD})
+        elif operacion == 'importar-asistencia':
+            codigo = pendientes.pop()
+            datos = _cabecera(rng, contexto, codigo, None)
+            datos['idcodigogeneral'] = codigo
+            datos['detalle'] = _detalles(rng, contexto, codigo)
+            medir(operacion, cliente.post, '/api/importar-asistencia/', json.dumps(datos),
+                  content_type='application/json', **cabeceras)
+            importados.extend((codigo, detalle['idlabor']) for detalle in datos['detalle'])
+        elif operacion == 'cantidad':
+            codigo, labor = rng.choice(importados)
+            medir(operacion, cliente.put, f'/api/asistencia/{codigo}/{labor}/',
+                  json.dumps({'cantidad': round(rng.uniform(0, 500), 2)}),
+                  content_type='application/json', **cabeceras)
+        elif operacion == 'ingresos-dia-actual':
+            medir(operacion, cliente.get, '/api/ingresos-dia-actual/', **cabeceras)
+        elif operacion == 'ingresos-trabajador':
+            codigo, _ = rng.choice(importados)
+            medir(operacion, cliente.get, f'/api/ingresos-dia-actual/{codigo}/', **cabeceras)
+
+    # El turno termina con el cierre del día
+    medir('cierre-dia', cliente.put, '/api/estado/', **cabeceras)
+    duracion = time.perf_counter() - inicio_turno
+
+    return {
+        operacion: dict(resumir(valores), errores=errores[operacion])
+        for operacion, valores in latencias.items()
+    }, (peticiones + 1) / duracion
+
+
+def percentil(valores_ordenados, p):
+    indice = max(0, int(round(p / 100 * len(valores_ordenados))) - 1)
+    return valores_ordenados[indice]
+
+
+def resumir(latencias):
+    valores = sorted(latencias)
+    return {
+        'peticiones': len(valores),
+        'p50': round(percentil(valores, 50), 2),
+        'p95': round(percentil(valores, 95), 2),
+        'p99': round(percentil(valores, 99), 2),
+    }
+
+
+def comparar(resultados, baseline, tolerancia):
+    # Una operación empeora si su p95 supera el del baseline en más de la tolerancia
+    regresiones = []
+    for operacion, referencia in baseline.items():
+        actual = resultados.get(operacion)
+        if actual and actual['p95'] > referencia['p95'] * (1 + tolerancia):
+            regresiones.append(f"{operacion}: p95 {actual['p95']} ms > {referencia['p95']} ms (+{tolerancia:.0%})")
+    return regresiones
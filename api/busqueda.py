@@ -0,0 +1,245 @@
+# api/busqueda.py
+# Índice en memoria para buscar por nombre_apellido en Consumidor y Responsable (/api/buscar/<modelo>/).
+# Sin distinguir tildes ni mayúsculas: primero por prefijo de cada palabra y, si no alcanza,
+# por similitud de trigramas (tolera errores de tipeo). Se actualiza con las señales de
+# guardado y eliminación (api/signals.py) y se reconstruye cada BUSQUEDA_TTL_RECONSTRUCCION
+# segundos para incorporar los cambios hechos en otros procesos.
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Consumidor, Responsable
+
+SIMILITUD_MINIMA = 0.35
+PUNTAJE_EXACTO = 1.0
+PUNTAJE_PREFIJO = 0.9
+PESO_SIMILITUD = 0.8
+
+
+def normalizar(texto):
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return ' '.join(sin_tildes.lower().split())
+
+
+def trigramas(palabra):
+    # Como pg_trgm: dos espacios al inicio y uno al final
+    relleno = f'  {palabra} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+class _Datos:
+    # Estructuras de un índice; se reemplazan completas al reconstruir.
+    # Cada palabra guarda sus ids ordenados por (largo, nombre normalizado), de modo que los
+    # primeros k de una búsqueda de una palabra salen de mezclar esas listas sin ordenar todo.
+    def __init__(self):
+        self.nombres = {}  # id -> (nombre original, (largo, nombre normalizado))
+        self.ids_por_palabra = {}  # palabra -> [((largo, normalizado), id)] ordenada
+        self.palabras = []  # palabras distintas ordenadas, para buscar por prefijo
+        self.palabras_por_trigrama = {}  # trigrama -> set(palabras)
+
+    def agregar(self, id, nombre):
+        normalizado = normalizar(nombre)
+        orden = (len(normalizado), normalizado)
+        self.nombres[id] = (nombre, orden)
+        for palabra in set(normalizado.split()):
+            ids = self.ids_por_palabra.get(palabra)
+            if ids is None:
+                ids = self.ids_por_palabra[palabra] = []
+                insort(self.palabras, palabra)
+                for trigrama in trigramas(palabra):
+                    self.palabras_por_trigrama.setdefault(trigrama, set()).add(palabra)
+            insort(ids, (orden, id))
+
+    @classmethod
+    def desde_filas(cls, filas):
+        # Carga completa: se ordena una sola vez al final en lugar de insertar ordenado
+        datos = cls()
+        for id, nombre in filas:
+            normalizado = normalizar(nombre)
+            orden = (len(normalizado), normalizado)
+            datos.nombres[id] = (nombre, orden)
+            for palabra in set(normalizado.split()):
+                datos.ids_por_palabra.setdefault(palabra, []).append((orden, id))
+        for palabra, ids in datos.ids_por_palabra.items():
+            ids.sort()
+            for trigrama in trigramas(palabra):
+                datos.palabras_por_trigrama.setdefault(trigrama, set()).add(palabra)
+        datos.palabras = sorted(datos.ids_por_palabra)
+        return datos
+
+    def quitar(self, id):
+        anterior = self.nombres.pop(id, None)
+        if anterior is None:
+            return
+        orden = anterior[1]
+        for palabra in set(orden[1].split()):
+            ids = self.ids_por_palabra[palabra]
+            del ids[bisect_left(ids, (orden, id))]
+            if not ids:
+                del self.ids_por_palabra[palabra]
+                del self.palabras[bisect_left(self.palabras, palabra)]
+                for trigrama in trigramas(palabra):
+                    palabras = self.palabras_por_trigrama[trigrama]
+                    palabras.discard(palabra)
+                    if not palabras:
+                        del self.palabras_por_trigrama[trigrama]
+
+    def palabras_con_prefijo(self, prefijo):
+        inicio = bisect_left(self.palabras, prefijo)
+        fin = bisect_left(self.palabras, prefijo + '\x7f')
+        return self.palabras[inicio:fin]
+
+    def palabras_similares(self, palabra):
+        buscados = trigramas(palabra)
+        comunes = {}
+        for trigrama in buscados:
+            for candidata in self.palabras_por_trigrama.get(trigrama, ()):
+                comunes[candidata] = comunes.get(candidata, 0) + 1
+        for candidata, cantidad in comunes.items():
+            # Similitud de Jaccard entre los trigramas de ambas palabras (len + 1 = trigramas de la candidata)
+            similitud = cantidad / (len(buscados) + len(candidata) + 1 - cantidad)
+            if similitud >= SIMILITUD_MINIMA:
+                yield candidata, similitud
+
+    def grupos(self, palabra_buscada, similares):
+        # [(puntaje, [listas de ids])] de mayor a menor puntaje
+        grupos = {}
+        for palabra in self.palabras_con_prefijo(palabra_buscada):
+            puntaje = PUNTAJE_EXACTO if palabra == palabra_buscada else PUNTAJE_PREFIJO
+            grupos.setdefault(puntaje, []).append(self.ids_por_palabra[palabra])
+        if similares:
+            for palabra, similitud in self.palabras_similares(palabra_buscada):
+                grupos.setdefault(similitud * PESO_SIMILITUD, []).append(self.ids_por_palabra[palabra])
+        return sorted(grupos.items(), reverse=True)
+
+    @staticmethod
+    def puntaje_nombre(palabras_nombre, palabra_buscada, similares):
+        mejor = 0
+        for palabra in palabras_nombre:
+            if palabra == palabra_buscada:
+                return PUNTAJE_EXACTO
+            if palabra.startswith(palabra_buscada):
+                mejor = PUNTAJE_PREFIJO
+            elif similares and mejor < PUNTAJE_PREFIJO:
+                buscados, candidatos = trigramas(palabra_buscada), trigramas(palabra)
+                similitud = len(buscados & candidatos) / len(buscados | candidatos)
+                if similitud >= SIMILITUD_MINIMA:
+                    mejor = max(mejor, similitud * PESO_SIMILITUD)
+        return mejor
+
+    def _una_palabra(self, palabra, k, similares):
+        resultado, vistos = [], set()
+        for _, listas in self.grupos(palabra, similares):
+            for _, id in heapq.merge(*listas):
+                if id not in vistos:
+                    vistos.add(id)
+                    resultado.append(id)
+                    if len(resultado) == k:
+                        return resultado
+        return resultado
+
+    def _varias_palabras(self, palabras, k, similares):
+        # Intersección de los ids de cada palabra; el puntaje se calcula solo sobre esos nombres
+        conjuntos = []
+        for palabra in palabras:
+            ids = set()
+            for _, listas in self.grupos(palabra, similares):
+                for lista in listas:
+                    ids.update(map(itemgetter(1), lista))
+            conjuntos.append(ids)
+        candidatos = set.intersection(*sorted(conjuntos, key=len))
+
+        puntajes = {}
+        for id in candidatos:
+            palabras_nombre = self.nombres[id][1][1].split()
+            puntajes[id] = sum(self.puntaje_nombre(palabras_nombre, palabra, similares) for palabra in palabras)
+        return heapq.nsmallest(k, puntajes, key=lambda id: (-puntajes[id], self.nombres[id][1]))
+
+    def mejores(self, texto, k):
+        # Los k de mayor puntaje; por trigramas solo si por prefijo no se llega a k
+        palabras = normalizar(texto).split()
+        if not palabras:
+            return []
+        buscar = self._una_palabra if len(palabras) == 1 else self._varias_palabras
+        resultado = buscar(palabras[0] if len(palabras) == 1 else palabras, k, False)
+        if len(resultado) < k:
+            resultado = buscar(palabras[0] if len(palabras) == 1 else palabras, k, True)
+        return resultado
+
+
+class IndiceNombres:
+    def __init__(self, modelo, campo_id):
+        self.modelo = modelo
+        self.campo_id = campo_id
+        self._lock = threading.Lock()
+        self._datos = None
+        self._construido = 0.0
+        self._reconstruyendo = False
+        self._cambios_pendientes = []  # Cambios recibidos mientras se reconstruye en segundo plano
+
+    def _cargar(self):
+        filas = self.modelo.objects.values_list(self.campo_id, 'nombre_apellido').iterator(chunk_size=5000)
+        return _Datos.desde_filas(filas)
+
+    def _reconstruir_en_segundo_plano(self):
+        try:
+            datos = self._cargar()
+            with self._lock:
+                for id, nombre in self._cambios_pendientes:
+                    datos.quitar(id)
+                    if nombre is not None:
+                        datos.agregar(id, nombre)
+                self._datos, self._construido = datos, time.monotonic()
+        finally:
+            with self._lock:
+                self._reconstruyendo = False
+                self._cambios_pendientes = []
+            connection.close()
+
+    def _datos_actuales(self):
+        with self._lock:
+            datos = self._datos
+            vencido = time.monotonic() - self._construido > settings.BUSQUEDA_TTL_RECONSTRUCCION
+            if datos is not None and vencido and not self._reconstruyendo:
+                # Se sigue respondiendo con el índice anterior mientras se arma el nuevo
+                self._reconstruyendo = True
+                threading.Thread(target=self._reconstruir_en_segundo_plano, daemon=True).start()
+        if datos is None:
+            datos = self._cargar()
+            with self._lock:
+                if self._datos is None:
+                    self._datos, self._construido = datos, time.monotonic()
+                datos = self._datos
+        return datos
+
+    def actualizar(self, id, nombre):
+        # nombre=None elimina la entrada
+        with self._lock:
+            if self._reconstruyendo:
+                self._cambios_pendientes.append((id, nombre))
+            if self._datos is not None:
+                self._datos.quitar(id)
+                if nombre is not None:
+                    self._datos.agregar(id, nombre)
+
+    def buscar(self, texto, k=10):
+        datos = self._datos_actuales()
+        with self._lock:
+            return [{self.campo_id: id, 'nombre_apellido': datos.nombres[id][0]} for id in datos.mejores(texto, k)]
+
+    def limpiar(self):
+        with self._lock:
+            self._datos = None
+
+
+INDICES = {
+    'consumidor': IndiceNombres(Consumidor, 'idconsumidor'),
+    'responsable': IndiceNombres(Responsable, 'idresponsable'),
+}
+INDICE_POR_MODELO = {indice.modelo: indice for indice in INDICES.values()}
@@ -0,0 +1,79 @@
+# api/cache.py
+# Caché de respuestas por trabajador con claves versionadas: cada escritura sobre los
+# detalles de un trabajador cambia su versión y deja obsoletas todas sus respuestas guardadas.
+# La versión solo cambia con el post_save de ImportarAsistenciaDetalle (api/signals.py):
+# bulk_create, bulk_update y QuerySet.update() no lo envían, así que cada escritura en lote
+# debe llamar ella misma a invalidar_ingresos_trabajador (como api/cantidades.py) o las
+# respuestas en caché seguirán mostrando los valores anteriores hasta que caduquen.
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .empresas import empresa_actual
+from .models import CustomUser
+from .serializers import CAMPOS_RESUMEN_USUARIO
+from .sucursales import sucursal_actual
+
+
+def _clave_version(idcodigogeneral):
+    return f'ingresos-trabajador:version:{idcodigogeneral}'
+
+
+def _version(idcodigogeneral):
+    clave = _clave_version(idcodigogeneral)
+    version = cache.get(clave)
+    if version is None:
+        # Una versión nueva nunca coincide con respuestas guardadas antes de perderse la anterior
+        cache.add(clave, time.time_ns(), None)
+        version = cache.get(clave)
+    return version
+
+
+def _clave(idcodigogeneral, desde, hasta):
+    # La respuesta solo incluye las asistencias visibles en la empresa y sucursal del contexto
+    return (f'ingresos-trabajador:{idcodigogeneral}:{_version(idcodigogeneral)}:'
+            f'{empresa_actual() or ""}:{sucursal_actual() or ""}:{desde}:{hasta}')
+
+
+def ingresos_trabajador_en_cache(idcodigogeneral, desde, hasta):
+    if not settings.INGRESOS_TRABAJADOR_CACHE_TTL:
+        return None
+    return cache.get(_clave(idcodigogeneral, desde, hasta))
+
+
+def guardar_ingresos_trabajador(idcodigogeneral, desde, hasta, data):
+    if settings.INGRESOS_TRABAJADOR_CACHE_TTL:
+        cache.set(_clave(idcodigogeneral, desde, hasta), data, settings.INGRESOS_TRABAJADOR_CACHE_TTL)
+
+
+def invalidar_ingresos_trabajador(idcodigogeneral):
+    cache.set(_clave_version(idcodigogeneral), time.time_ns(), None)
+
+
+# Resúmenes de usuarios por DNI (dni, apel_nomb, tipo_usuarioapp)
+def _clave_usuario(dni):
+    return f'usuario:dni:{dni}'
+
+
+def resumenes_usuarios(dnis):
+    # {dni: resumen} de los DNI existentes; los que no están en caché se cargan en una consulta
+    ttl = settings.USUARIOS_DNI_CACHE_TTL
+    encontrados = {}
+    if ttl:
+        encontrados = {resumen['dni']: resumen for resumen in cache.get_many([_clave_usuario(dni) for dni in dnis]).values()}
+
+    faltantes = [dni for dni in dnis if dni not in encontrados]
+    if faltantes:
+        cargados = {
+            resumen['dni']: resumen
+            for resumen in CustomUser.objects.filter(dni__in=faltantes).values(*CAMPOS_RESUMEN_USUARIO)
+        }
+        if ttl and cargados:
+            cache.set_many({_clave_usuario(dni): resumen for dni, resumen in cargados.items()}, ttl)
+        encontrados.update(cargados)
+    return encontrados
+
+
+def invalidar_usuario(dni):
+    cache.delete(_clave_usuario(dni))
@@ -0,0 +1,45 @@
+# api/cambios.py
+# Log de cambios de asistencias (CambioAsistencia) para nóminas, ERP y otros sistemas que hoy
+# descargan todo: cada alta o cambio de ImportarAsistencia e ImportarAsistenciaDetalle escribe
+# una fila en la misma transacción (models.RegistraCambios y cantidades._guardar), y los
+# consumidores leen desde el último id que procesaron con /api/cambios/?desde=<id> o
+# `python manage.py exportar_cambios`.
+# Los ids se asignan al insertar y no al confirmar: una transacción larga puede confirmar un id
+# menor después de que otro mayor ya se leyó, y un consumidor que ya avanzó lo saltaría para
+# siempre. Por eso cada página se corta en el primer id que falta si el cambio que le sigue tiene
+# menos de CAMBIOS_VENTANA_HUECOS segundos: puede ser una transacción sin confirmar. Un hueco más
+# viejo es una transacción que se deshizo y se salta; mientras tanto el consumidor no avanza, así
+# que una transacción deshecha lo demora como mucho CAMBIOS_VENTANA_HUECOS segundos. Las escrituras
+# que registran cambios duran milisegundos; una que tardara más que la ventana se saltaría. Se lee
+# de la base principal (una réplica atrasada tendría el mismo problema).
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CambioAsistencia
+from .replicas import en_primaria
+
+CAMPOS = ('id', 'creado', 'modelo', 'operacion', 'objeto_id', 'datos')
+
+
+def leer_cambios(desde, limite):
+    # Hasta `limite` cambios con id mayor que `desde`, en orden y sin huecos recientes
+    with en_primaria():
+        cambios = list(CambioAsistencia.objects.filter(id__gt=desde).order_by('id').values(*CAMPOS)[:limite])
+    recientes = timezone.now() - timedelta(seconds=settings.CAMBIOS_VENTANA_HUECOS)
+    # Desde el principio (desde=0) no hay un id anterior del que seguir
+    esperado = desde + 1 if desde else None
+    for posicion, cambio in enumerate(cambios):
+        if esperado is not None and cambio['id'] != esperado and cambio['creado'] > recientes:
+            return cambios[:posicion]
+        esperado = cambio['id'] + 1
+    return cambios
+
+
+def registrar_cambios(instancias, operacion, campos=None):
+    # Para las escrituras en lote (bulk_update no pasa por save()); llamar dentro de su transacción
+    CambioAsistencia.objects.bulk_create(
+        [CambioAsistencia(**CambioAsistencia.datos_de(instancia, operacion, campos)) for instancia in instancias],
+        batch_size=1000,
+    )
@@ -0,0 +1,276 @@
+# api/cantidades.py
+# Escritura diferida de cantidades (PUT de asistencia-merluza y asistencia-pota) con CANTIDADES_DIFERIDAS.
+# Cada cambio se agrega a un log local (un archivo por proceso, con fsync) y se responde sin tocar
+# la base de datos; los cambios de un mismo detalle se combinan y un hilo los guarda con bulk_update
+# cada CANTIDADES_INTERVALO_MS. Los logs de procesos que terminaron sin vaciarlos (el archivo ya no
+# tiene lock) se aplican en cada ciclo del hilo o con `python manage.py vaciar_cantidades`.
+# Cada línea lleva la marca de tiempo del cambio: al recuperar, un cambio más viejo que lo que ya
+# se guardó para ese detalle (su último CambioAsistencia) se descarta. Un detalle que ya se
+# archivó se actualiza en el histórico.
+# Las consultas del día abierto superponen las cantidades pendientes de este proceso para que
+# cada cliente vea lo que acaba de enviar.
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max
+
+from .cache import invalidar_ingresos_trabajador
+from .cambios import registrar_cambios
+from .empresas import con_empresa
+from .metricas import metricas
+from .models import CambioAsistencia, ImportarAsistenciaDetalle, ImportarAsistenciaDetalleHistorico
+from .ranking import ranking
+from .sucursales import con_sucursal
+
+logger = logging.getLogger(__name__)
+
+CAMPO_CANTIDAD = ImportarAsistenciaDetalle._meta.get_field('cantidad')
+TAMANO_LOTE = 500
+
+
+def _leer_log(ruta, pendientes=None):
+    # item -> pendiente; gana la línea con la marca más nueva de cada item (la última si empatan).
+    # Una línea incompleta (corte al escribir) se ignora.
+    pendientes = {} if pendientes is None else pendientes
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            try:
+                pendiente = json.loads(linea)
+            except ValueError:
+                continue
+            anterior = pendientes.get(pendiente['item'])
+            if anterior is None or pendiente.get('marca', 0) >= anterior.get('marca', 0):
+                pendientes[pendiente['item']] = pendiente
+    return pendientes
+
+
+def _sin_cambios_posteriores(pendientes):
+    # Descarta los cambios más viejos que el último guardado del mismo detalle (por otro proceso,
+    # o un PUT sin diferir): un log recuperado tarde no debe pisar un valor más nuevo
+    items = list(pendientes)
+    ultimos = {}
+    for inicio in range(0, len(items), TAMANO_LOTE):
+        ultimos.update(
+            CambioAsistencia.objects.filter(modelo='importarasistenciadetalle', objeto_id__in=items[inicio:inicio + TAMANO_LOTE])
+            .values('objeto_id').annotate(ultimo=Max('creado')).values_list('objeto_id', 'ultimo')
+        )
+    vigentes = {}
+    for item, pendiente in pendientes.items():
+        ultimo, marca = ultimos.get(item), pendiente.get('marca')
+        # Las líneas sin marca son de logs anteriores a ella: se aplican como antes
+        if ultimo is not None and marca is not None and marca < ultimo.timestamp() * 1e9:
+            continue
+        vigentes[item] = pendiente
+    return vigentes
+
+
+def _guardar(pendientes):
+    # Los cambios diferidos son de 'default' y de cualquier empresa o sucursal: se guardan sin el
+    # contexto de la petición que vacía (el cierre del día llega con X-Sucursal)
+    with con_empresa(None), con_sucursal(None):
+        _guardar_sin_contexto(pendientes)
+
+
+def _guardar_sin_contexto(pendientes):
+    detalles = {
+        p['item']: ImportarAsistenciaDetalle(item=p['item'], importar_asistencia_id=p['importar_asistencia_id'],
+                                             idcodigogeneral=p['idcodigogeneral'], idlabor=p['idlabor'],
+                                             cantidad=p['cantidad'])
+        for p in pendientes.values()
+    }
+    with transaction.atomic():
+        actualizados = ImportarAsistenciaDetalle.objects.bulk_update(detalles.values(), ['cantidad'], batch_size=TAMANO_LOTE)
+        guardados = list(detalles.values())
+        if actualizados < len(detalles):
+            # Detalles que ya no están en la tabla actual: el día se archivó antes de guardar el cambio
+            faltantes = set(detalles) - set(
+                ImportarAsistenciaDetalle.objects.filter(item__in=list(detalles)).values_list('item', flat=True)
+            )
+            # Si el item se repitió en el histórico (ver api/models.py), es el archivado más reciente
+            historicos = {historico.item: historico for historico in
+                          ImportarAsistenciaDetalleHistorico.objects.filter(item__in=list(faltantes)).order_by('clave')}
+            for item, historico in historicos.items():
+                historico.cantidad = detalles[item].cantidad
+            ImportarAsistenciaDetalleHistorico.objects.bulk_update(historicos.values(), ['cantidad'], batch_size=TAMANO_LOTE)
+            perdidos = faltantes - set(historicos)
+            if perdidos:
+                logger.error('Cantidades diferidas sin detalle donde guardarlas (se descartan): %s',
+                             [pendientes[item] for item in sorted(perdidos)])
+            guardados = [detalle for item, detalle in detalles.items() if item not in perdidos]
+        registrar_cambios(guardados, 'cambio', ['cantidad'])
+
+    # bulk_update no envía post_save: lo mismo que hacen los receptores de api/signals.py
+    for detalle in guardados:
+        invalidar_ingresos_trabajador(detalle.idcodigogeneral)
+        ranking.detalle_guardado(detalle)
+
+
+class CantidadesDiferidas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendientes = {}  # item -> {'item', 'importar_asistencia_id', 'idcodigogeneral', 'idlabor', 'cantidad'}
+        self._vaciando = {}  # Lo que se está guardando, todavía visible para superponer
+        self._log = None
+        self._segmento = 0
+        self._hilo = None
+
+    def _directorio(self):
+        return str(settings.CANTIDADES_DIRECTORIO)
+
+    def _abrir_log(self):
+        # El lock exclusivo indica que el proceso sigue vivo y que nadie más debe recuperar el archivo
+        os.makedirs(self._directorio(), exist_ok=True)
+        self._segmento += 1
+        ruta = os.path.join(self._directorio(), f'{os.getpid()}-{self._segmento:06d}.log')
+        self._log = open(ruta, 'a', encoding='utf-8')
+        fcntl.flock(self._log, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _escribir(self, pendiente):
+        self._log.write(json.dumps(pendiente) + '\n')
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def registrar(self, detalle, cantidad):
+        # detalle: dict con item, importar_asistencia_id, idcodigogeneral e idlabor
+        # Lanza django.core.exceptions.ValidationError si la cantidad no es un número
+        pendiente = dict(detalle, cantidad=CAMPO_CANTIDAD.to_python(cantidad), marca=time.time_ns())
+        with self._lock:
+            if self._log is None:
+                self._abrir_log()
+            self._escribir(pendiente)
+            self._pendientes[pendiente['item']] = pendiente
+            iniciar = self._hilo is None and settings.CANTIDADES_INTERVALO_MS > 0
+            if iniciar:
+                self._hilo = threading.Thread(target=self._ciclo, name='cantidades', daemon=True)
+        if iniciar:
+            self._hilo.start()
+        return pendiente
+
+    def vaciar(self):
+        # Guarda lo pendiente; el log se cambia por uno nuevo y el anterior se borra al confirmar
+        with self._lock:
+            if not self._pendientes:
+                return 0
+            pendientes, self._pendientes = self._pendientes, {}
+            self._vaciando = pendientes
+            log_anterior = self._log
+            self._abrir_log()
+        try:
+            _guardar(pendientes)
+        except Exception:
+            # Se vuelven a dejar pendientes, salvo los que ya recibieron un valor más nuevo
+            with self._lock:
+                for item, pendiente in pendientes.items():
+                    if item not in self._pendientes:
+                        self._pendientes[item] = pendiente
+                        self._escribir(pendiente)
+            raise
+        finally:
+            with self._lock:
+                self._vaciando = {}
+            os.remove(log_anterior.name)
+            log_anterior.close()
+        return len(pendientes)
+
+    def _logs(self):
+        try:
+            nombres = sorted(os.listdir(self._directorio()))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self._directorio(), nombre) for nombre in nombres if nombre.endswith('.log')]
+
+    def recuperar(self):
+        # Aplica los logs de procesos que ya no existen, todos juntos: de cada detalle gana el
+        # cambio con la marca más nueva, sin importar de qué proceso o segmento sea
+        propios = {self._log.name} if self._log else set()
+        with ExitStack() as stack:
+            rutas = []
+            for ruta in self._logs():
+                if ruta in propios:
+                    continue
+                try:
+                    archivo = stack.enter_context(open(ruta, encoding='utf-8'))
+                except FileNotFoundError:
+                    continue  # Lo recuperó otro proceso
+                try:
+                    fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue  # El proceso dueño sigue vivo (u otro lo está recuperando)
+                if os.path.exists(ruta):
+                    rutas.append(ruta)
+            pendientes = {}
+            for ruta in rutas:
+                _leer_log(ruta, pendientes)
+            if pendientes:
+                _guardar(_sin_cambios_posteriores(pendientes))
+            for ruta in rutas:
+                os.remove(ruta)
+        return len(pendientes)
+
+    def cabeceras_pendientes(self):
+        # importar_asistencia_id con cambios aún sin guardar en algún log, de cualquier proceso
+        # (el lock de los vivos no impide leer). Para no archivar un día con cambios en camino
+        cabeceras = set()
+        for ruta in self._logs():
+            try:
+                cabeceras.update(pendiente['importar_asistencia_id'] for pendiente in _leer_log(ruta).values())
+            except FileNotFoundError:
+                continue
+        return cabeceras
+
+    def _ciclo(self):
+        atexit.register(self.vaciar)
+        while True:
+            self._ejecutar_ciclo()
+            time.sleep(settings.CANTIDADES_INTERVALO_MS / 1000)
+
+    def _ejecutar_ciclo(self):
+        close_old_connections()
+        try:
+            self.recuperar()
+            self.vaciar()
+        except Exception:
+            # Se reintenta en el próximo ciclo; los cambios siguen en el log
+            logger.exception('No se pudieron guardar las cantidades diferidas')
+            metricas.contar('api_cantidades_fallos_total')
+
+    def _cantidades_pendientes(self):
+        # item -> cantidad de lo que aún no está en la base de datos
+        with self._lock:
+            if not self._pendientes and not self._vaciando:
+                return {}
+            return {item: p['cantidad'] for item, p in {**self._vaciando, **self._pendientes}.items()}
+
+    @staticmethod
+    def _aplicar(asistencia, pendientes):
+        for detalle in asistencia.get('detalle', (asistencia,)):
+            if detalle.get('item') in pendientes:
+                detalle['cantidad'] = pendientes[detalle['item']]
+        return asistencia
+
+    def superponer(self, asistencias):
+        # Reemplaza las cantidades pendientes en la salida de asistencias_rapidas (o en filas planas)
+        pendientes = self._cantidades_pendientes()
+        if pendientes:
+            for asistencia in asistencias:
+                self._aplicar(asistencia, pendientes)
+        return asistencias
+
+    def superponer_en_stream(self, asistencias):
+        # Lo mismo sobre un generador (asistencias_en_stream), fila por fila; las cantidades
+        # pendientes son las del momento de la llamada
+        pendientes = self._cantidades_pendientes()
+        if not pendientes:
+            return asistencias
+        return (self._aplicar(asistencia, pendientes) for asistencia in asistencias)
+
+
+cantidades = CantidadesDiferidas()
@@ -0,0 +1,74 @@
+# api/catalogos.py
+# Paquete con todos los catálogos y el día abierto para el inicio de la app (/api/catalogos/).
+# Se arma una vez, se guarda en caché ya serializado y comprimido, y se invalida con cualquier
+# cambio en un catálogo o en los registros de días (ver api/signals.py).
+import gzip
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .dia import consultar_dia_abierto
+from .models import Consumidor, Emisor, Empresa, Planilla, Registro, Responsable, TipoEnvio, Turno
+from .serializers import (
+    ConsumidorSerializer, EmisorSerializer, EmpresaSerializer, PlanillaSerializer, RegistroSerializer,
+    ResponsableSerializer, TipoEnvioSerializer, TurnoSerializer,
+)
+from .sucursales import sucursal_actual
+
+CLAVE_VERSION = 'catalogos:paquete:version'
+
+# Clave en el paquete -> (modelo, serializer), con el mismo contenido que el endpoint de cada catálogo
+CATALOGOS = {
+    'empresas': (Empresa, EmpresaSerializer),
+    'tiposenvio': (TipoEnvio, TipoEnvioSerializer),
+    'responsables': (Responsable, ResponsableSerializer),
+    'planillas': (Planilla, PlanillaSerializer),
+    'emisor': (Emisor, EmisorSerializer),
+    'turno': (Turno, TurnoSerializer),
+    'consumidor': (Consumidor, ConsumidorSerializer),
+}
+MODELOS_PAQUETE = [modelo for modelo, _ in CATALOGOS.values()] + [Registro]
+
+
+def construir_paquete():
+    data = {
+        clave: serializer(modelo.objects.all(), many=True).data
+        for clave, (modelo, serializer) in CATALOGOS.items()
+    }
+    registro_abierto = consultar_dia_abierto()
+    data['dia_abierto'] = RegistroSerializer(registro_abierto).data if registro_abierto else None
+
+    contenido = JSONRenderer().render(data)
+    version = hashlib.sha1(contenido).hexdigest()[:16]
+    # La versión va también en el cuerpo para que la app pueda guardarla junto a los datos
+    contenido = b'{"version":"' + version.encode() + b'",' + contenido[1:]
+    return {
+        'version': version,
+        'json': contenido,
+        'gzip': gzip.compress(contenido, compresslevel=9),
+    }
+
+
+def _clave_cache():
+    # Un paquete por sucursal (cada una tiene su día abierto); invalidar cambia la versión de todos
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, time.time_ns(), None)
+        version = cache.get(CLAVE_VERSION)
+    return f'catalogos:paquete:{version}:{sucursal_actual() or ""}'
+
+
+def paquete_catalogos():
+    clave = _clave_cache()
+    paquete = cache.get(clave)
+    if paquete is None:
+        paquete = construir_paquete()
+        cache.set(clave, paquete, settings.CATALOGOS_CACHE_TTL)
+    return paquete
+
+
+def invalidar_paquete():
+    cache.set(CLAVE_VERSION, time.time_ns(), None)
@@ -0,0 +1,177 @@
+# api/catalogos_lote.py
+# Altas, cambios y bajas en lote de los catálogos (/api/catalogos/<catalogo>/lote/).
+# Todas las filas se validan juntas y, si ninguna tiene errores, se escriben en una sola
+# transacción: los códigos nuevos se asignan de una vez a partir del último existente
+# (sin el bucle de save() de cada modelo) y se insertan con bulk_create.
+from django.db import IntegrityError, transaction
+from rest_framework.validators import UniqueValidator
+
+from .busqueda import INDICE_POR_MODELO
+from .catalogos import invalidar_paquete
+from .models import Consumidor, Emisor, Empresa, Planilla, Responsable, Turno
+from .serializers import (
+    ConsumidorSerializer, EmisorSerializer, EmpresaSerializer, PlanillaSerializer, ResponsableSerializer,
+    TurnoSerializer,
+)
+
+# Catálogo -> (modelo, serializer, campo del código, ancho del código; None si lo envía el cliente)
+CATALOGOS_LOTE = {
+    'empresas': (Empresa, EmpresaSerializer, 'idempresa', 3),
+    'responsables': (Responsable, ResponsableSerializer, 'idresponsable', 6),
+    'planillas': (Planilla, PlanillaSerializer, 'idplanilla', None),
+    'emisor': (Emisor, EmisorSerializer, 'idemisor', 3),
+    'turno': (Turno, TurnoSerializer, 'idturno', 2),
+    'consumidor': (Consumidor, ConsumidorSerializer, 'idconsumidor', 6),
+}
+REINTENTOS = 3
+
+
+class ErroresLote(Exception):
+    def __init__(self, errores):
+        super().__init__(errores)
+        self.errores = errores
+
+
+class ConflictoLote(ErroresLote):
+    # Otra petición escribió los mismos códigos entre la validación y la escritura
+    pass
+
+
+def _sin_validadores_unicos(serializer):
+    # La unicidad del código se comprueba con una sola consulta para todo el lote
+    for campo in serializer.fields.values():
+        campo.validators = [validador for validador in campo.validators if not isinstance(validador, UniqueValidator)]
+    return serializer
+
+
+def siguientes_codigos(modelo, campo, ancho, cantidad):
+    # Los códigos tienen ancho fijo con ceros a la izquierda: el mayor como texto es también el mayor número
+    ultimo = modelo.objects.order_by('-' + campo).values_list(campo, flat=True).first()
+    siguiente = int(ultimo) + 1 if ultimo else 1
+    if siguiente + cantidad - 1 >= 10 ** ancho:
+        raise ErroresLote([{'operacion': 'crear', 'errores': {campo: [f'No quedan códigos de {ancho} dígitos.']}}])
+    return [str(numero).zfill(ancho) for numero in range(siguiente, siguiente + cantidad)]
+
+
+class LoteCatalogo:
+    def __init__(self, catalogo):
+        self.modelo, self.serializer, self.campo, self.ancho = CATALOGOS_LOTE[catalogo]
+        self.campos = [campo for campo in self.serializer.Meta.fields if campo != self.campo]
+
+    def _validar_crear(self, filas, errores):
+        validados = []
+        for numero, fila in enumerate(filas, start=1):
+            serializer = _sin_validadores_unicos(self.serializer(data=fila))
+            if serializer.is_valid():
+                validados.append(serializer.validated_data)
+            else:
+                errores.append({'operacion': 'crear', 'fila': numero, 'errores': serializer.errors})
+
+        if self.ancho is None:
+            # Código enviado por el cliente: repetidos en el lote o ya existentes
+            codigos = [datos[self.campo] for datos in validados]
+            existentes = set(self.modelo.objects.filter(**{self.campo + '__in': codigos}).values_list(self.campo, flat=True))
+            vistos = set()
+            for numero, codigo in enumerate(codigos, start=1):
+                if codigo in existentes or codigo in vistos:
+                    errores.append({'operacion': 'crear', 'fila': numero,
+                                    'errores': {self.campo: ['Ya existe un registro con este código.']}})
+                vistos.add(codigo)
+        return validados
+
+    def _error_codigo(self, operacion, numero, codigo, errores):
+        # Los códigos son texto: cualquier otro valor (lista, objeto, número) no llega a la consulta
+        if isinstance(codigo, str):
+            return False
+        errores.append({'operacion': operacion, 'fila': numero, 'errores': {self.campo: ['El código debe ser un texto.']}})
+        return True
+
+    def _validar_actualizar(self, filas, errores):
+        codigos = [fila.get(self.campo) if isinstance(fila, dict) else None for fila in filas]
+        instancias = self.modelo.objects.in_bulk(
+            [codigo for codigo in codigos if isinstance(codigo, str) and codigo], field_name=self.campo)
+        actualizados = []
+        for numero, (fila, codigo) in enumerate(zip(filas, codigos), start=1):
+            if codigo is not None and self._error_codigo('actualizar', numero, codigo, errores):
+                continue
+            instancia = instancias.get(codigo)
+            if instancia is None:
+                errores.append({'operacion': 'actualizar', 'fila': numero,
+                                'errores': {self.campo: ['No existe un registro con este código.']}})
+                continue
+            serializer = _sin_validadores_unicos(self.serializer(instancia, data=fila))
+            if not serializer.is_valid():
+                errores.append({'operacion': 'actualizar', 'fila': numero, 'errores': serializer.errors})
+                continue
+            for campo in self.campos:
+                setattr(instancia, campo, serializer.validated_data[campo])
+            actualizados.append(instancia)
+        return actualizados
+
+    def _validar_eliminar(self, codigos, errores):
+        validos = [codigo for codigo in codigos if isinstance(codigo, str)]
+        existentes = set(self.modelo.objects.filter(**{self.campo + '__in': validos}).values_list(self.campo, flat=True))
+        for numero, codigo in enumerate(codigos, start=1):
+            if self._error_codigo('eliminar', numero, codigo, errores):
+                continue
+            if codigo not in existentes:
+                errores.append({'operacion': 'eliminar', 'fila': numero,
+                                'errores': {self.campo: ['No existe un registro con este código.']}})
+        return codigos
+
+    def _escribir(self, validados, actualizados, eliminados):
+        creados = [self.modelo(**datos) for datos in validados]
+        with transaction.atomic():
+            if creados and self.ancho is not None:
+                for instancia, codigo in zip(creados, siguientes_codigos(self.modelo, self.campo, self.ancho, len(creados))):
+                    setattr(instancia, self.campo, codigo)
+            self.modelo.objects.bulk_create(creados)
+            self.modelo.objects.bulk_update(actualizados, self.campos)
+            if eliminados:
+                # delete() envía post_delete por fila (paquete de catálogos e índice de búsqueda)
+                self.modelo.objects.filter(**{self.campo + '__in': eliminados}).delete()
+
+            # bulk_create y bulk_update no envían post_save: lo mismo que hacen los receptores de api/signals.py
+            transaction.on_commit(invalidar_paquete)
+            indice = INDICE_POR_MODELO.get(self.modelo)
+            if indice is not None:
+                nombres = [(getattr(instancia, indice.campo_id), instancia.nombre_apellido)
+                           for instancia in creados + actualizados]
+                transaction.on_commit(lambda: [indice.actualizar(id, nombre) for id, nombre in nombres])
+        return creados
+
+    def _conflictos(self, validados):
+        mensaje = 'Otra petición creó un registro con este código; volver a enviar el lote.'
+        if self.ancho is None:
+            codigos = [datos[self.campo] for datos in validados]
+            existentes = set(self.modelo.objects.filter(**{self.campo + '__in': codigos}).values_list(self.campo, flat=True))
+            conflictos = [{'operacion': 'crear', 'fila': numero, 'errores': {self.campo: [mensaje]}}
+                          for numero, codigo in enumerate(codigos, start=1) if codigo in existentes]
+            if conflictos:
+                return conflictos
+        return [{'operacion': 'crear', 'errores': {self.campo: [mensaje]}}]
+
+    def aplicar(self, crear=(), actualizar=(), eliminar=()):
+        # Lanza ErroresLote con los errores de todas las filas; si no hay errores, escribe todo junto.
+        # ConflictoLote si otra petición escribió los mismos códigos mientras tanto
+        errores = []
+        validados = self._validar_crear(crear, errores)
+        actualizados = self._validar_actualizar(actualizar, errores)
+        eliminados = self._validar_eliminar(eliminar, errores)
+        if errores:
+            raise ErroresLote(errores)
+
+        for intento in range(REINTENTOS):
+            try:
+                creados = self._escribir(validados, actualizados, eliminados)
+                break
+            except IntegrityError:
+                # Otra petición tomó los mismos códigos: se vuelven a asignar desde el nuevo último.
+                # Los enviados por el cliente no se pueden reasignar
+                if self.ancho is None or intento == REINTENTOS - 1:
+                    raise ConflictoLote(self._conflictos(validados))
+        return {
+            'creados': self.serializer(creados, many=True).data,
+            'actualizados': self.serializer(actualizados, many=True).data,
+            'eliminados': len(eliminados),
+        }
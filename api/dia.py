@@ -0,0 +1,115 @@
+# api/dia.py
+# Ciclo de vida del día de trabajo (Registro): abrir, cerrar y consultar el día abierto.
+# Cada sucursal puede tener su propio día (api/sucursales.py); las funciones trabajan con la
+# sucursal del contexto. La base de datos garantiza un solo día abierto por sucursal
+# (Registro.clave_abierto es única) y el cierre bloquea la fila con select_for_update, así que
+# dos aperturas o dos cierres simultáneos no pueden tener éxito los dos. Las lecturas usan
+# dia_abierto(), un puntero en caché por sucursal que se invalida al guardar cualquier Registro
+# (api/signals.py); las escrituras (importar, cambiar cantidades) usan consultar_dia_abierto(),
+# porque otro worker puede seguir con el puntero de un día que ya se cerró.
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import CLAVE_DIA_ABIERTO, Registro, clave_dia_abierto
+from .replicas import en_primaria
+from .sucursales import sucursal_actual
+from .tareas import encolar_cierre_dia
+
+CLAVE_VERSION = 'dia:abierto:version'
+_SIN_DIA = 'sin-dia'  # En caché: no hay día abierto (None es "no está en caché")
+
+
+class DiaYaAbierto(Exception):
+    pass
+
+
+class SinDiaAbierto(Exception):
+    pass
+
+
+def consultar_dia_abierto():
+    # Sin caché, para las tareas que no pueden trabajar con un puntero atrasado.
+    # El día de la sucursal o, si no tiene uno abierto, el día general
+    claves = [clave_dia_abierto(sucursal_actual()), CLAVE_DIA_ABIERTO]
+    with en_primaria():
+        abiertos = {registro.clave_abierto: registro for registro in Registro.objects.filter(clave_abierto__in=claves)}
+    return next((abiertos[clave] for clave in claves if clave in abiertos), None)
+
+
+def consultar_dias_abiertos():
+    # Días abiertos que cubren las asistencias visibles: sin sucursal, los de todas
+    if sucursal_actual():
+        registro = consultar_dia_abierto()
+        return [registro] if registro else []
+    with en_primaria():
+        return list(Registro.objects.filter(clave_abierto__isnull=False).order_by('FechaAbierto'))
+
+
+def _clave_cache(tipo):
+    # Versionada como api/cache.py: al abrir o cerrar un día general cambia el de todas las sucursales
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, time.time_ns(), None)
+        version = cache.get(CLAVE_VERSION)
+    return f'dia:{tipo}:{version}:{sucursal_actual() or ""}'
+
+
+def _en_cache(tipo, consultar):
+    if not settings.DIA_ABIERTO_CACHE_TTL:
+        return consultar()
+    clave = _clave_cache(tipo)
+    valor = cache.get(clave)
+    if valor is None:
+        valor = consultar()
+        cache.set(clave, _SIN_DIA if valor is None else valor, settings.DIA_ABIERTO_CACHE_TTL)
+    return None if valor == _SIN_DIA else valor
+
+
+def dia_abierto():
+    # Registro del día abierto o None
+    return _en_cache('abierto', consultar_dia_abierto)
+
+
+def dias_abiertos():
+    return _en_cache('abiertos', consultar_dias_abiertos)
+
+
+def invalidar_dia_abierto():
+    cache.set(CLAVE_VERSION, time.time_ns(), None)
+
+
+def abrir_dia():
+    ahora = datetime.now()
+    try:
+        # Sin punto de guardado, el IntegrityError dejaría inutilizable una transacción exterior
+        with transaction.atomic():
+            return Registro.objects.create(
+                FechaAbierto=ahora.strftime('%Y%m%d'), HoraAbierto=ahora.strftime('%H:%M:%S'), estado='Abierto',
+                idsucursal=sucursal_actual(),
+            )
+    except IntegrityError:
+        raise DiaYaAbierto()
+
+
+def cerrar_dia():
+    # Devuelve (registro, tareas encoladas para después del cierre)
+    ahora = datetime.now()
+    with transaction.atomic():
+        # El segundo de dos cierres simultáneos espera el bloqueo y ya no encuentra el día abierto.
+        # Solo el día propio de la sucursal: el general se cierra sin sucursal
+        clave = clave_dia_abierto(sucursal_actual())
+        registro = Registro.objects.select_for_update().filter(clave_abierto=clave).first()
+        if registro is None:
+            raise SinDiaAbierto()
+        registro.FechaCerrado = ahora.strftime('%Y%m%d')
+        registro.HoraCerrado = ahora.strftime('%H:%M:%S')
+        registro.estado = 'Cerrado'
+        registro.save()
+
+        # El trabajo posterior al cierre se encola y lo ejecuta `procesar_tareas`
+        tareas = encolar_cierre_dia(registro)
+    return registro, tareas
@@ -0,0 +1,97 @@
+# api/empresas.py
+# Asistencias separadas por empresa (idempresa).
+# Una petición con la cabecera X-Empresa solo ve las asistencias de esa empresa (el manager
+# de los modelos de asistencia filtra por ella) y, si la empresa tiene su propio alias en
+# EMPRESA_BASES_DE_DATOS, las lee y escribe en esa base. Las empresas sin alias comparten
+# 'default', donde el índice (idempresa, fecha) separa sus filas.
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+MODELOS_ASISTENCIA = {
+    'importarasistencia', 'importarasistenciadetalle',
+    'importarasistenciahistorico', 'importarasistenciadetallehistorico', 'cambioasistencia',
+}
+
+_empresa = ContextVar('empresa', default=None)
+_base = ContextVar('base_asistencias', default=None)  # Alias fijo para las tareas que recorren todas las bases
+
+
+def empresa_actual():
+    return _empresa.get()
+
+
+def base_de_empresa(idempresa):
+    return settings.EMPRESA_BASES_DE_DATOS.get(idempresa, 'default')
+
+
+def base_actual():
+    return _base.get() or base_de_empresa(_empresa.get())
+
+
+def bases_de_asistencias():
+    return ['default'] + sorted(set(settings.EMPRESA_BASES_DE_DATOS.values()) - {'default'})
+
+
+@contextmanager
+def con_empresa(idempresa):
+    token = _empresa.set(idempresa or None)
+    try:
+        yield
+    finally:
+        _empresa.reset(token)
+
+
+@contextmanager
+def en_base(alias):
+    token = _base.set(alias)
+    try:
+        yield
+    finally:
+        _base.reset(token)
+
+
+class EmpresaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with con_empresa(request.headers.get('X-Empresa')):
+            return self.get_response(request)
+
+
+def _es_asistencia(app_label, model_name):
+    return app_label == 'api' and model_name in MODELOS_ASISTENCIA
+
+
+class EmpresaRouter:
+    # Va antes de ReplicaRouter; devuelve None (sigue el siguiente router) para todo lo que vive en 'default'
+    def _base_para(self, model, instance):
+        if not _es_asistencia(model._meta.app_label, model._meta.model_name):
+            return None
+        alias = _base.get()
+        if alias is None and instance is not None:
+            if instance._state.db:
+                return instance._state.db
+            # Un detalle nuevo va a la base de su cabecera
+            cabecera = instance._state.fields_cache.get('importar_asistencia', instance)
+            if cabecera is not instance and cabecera._state.db:
+                return cabecera._state.db
+            if getattr(cabecera, 'idempresa', None):
+                alias = base_de_empresa(cabecera.idempresa)
+        if alias is None and _empresa.get():
+            alias = base_de_empresa(_empresa.get())
+        return None if alias == 'default' else alias
+
+    def db_for_read(self, model, **hints):
+        return self._base_para(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._base_para(model, hints.get('instance'))
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las bases de empresa solo tienen las tablas de asistencia
+        if db in settings.EMPRESA_BASES_DE_DATOS.values() and db != 'default':
+            return _es_asistencia(app_label, model_name)
+        return None
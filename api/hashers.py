@@ -0,0 +1,12 @@
+# api/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PBKDF2CostoConfigurableHasher(PBKDF2PasswordHasher):
+    # Mismo algoritmo ('pbkdf2_sha256') que el hasher de Django, con las iteraciones
+    # tomadas de LOGIN_PBKDF2_ITERACIONES. Las contraseñas guardadas con otra cantidad
+    # de iteraciones se vuelven a generar al iniciar sesión (ver check_password).
+    @property
+    def iterations(self):
+        return settings.LOGIN_PBKDF2_ITERACIONES
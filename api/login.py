@@ -0,0 +1,77 @@
+# api/login.py
+# Ejecuta los inicios de sesión (hash de contraseñas) en un pool de hilos acotado,
+# para que los picos de login al inicio del turno no dejen sin CPU al resto de la API.
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as LoginTimeout
+
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LoginSaturado(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Demasiados inicios de sesión en curso, intente nuevamente.'
+    default_code = 'login_saturado'
+    wait = 1  # Segundos para la cabecera Retry-After
+
+
+# Los throttles cuentan en CACHES['default']; solo limitan entre workers si esa caché es compartida
+
+class LoginDniThrottle(SimpleRateThrottle):
+    scope = 'login_dni'
+
+    def get_cache_key(self, request, view):
+        dni = request.data.get('dni')
+        if not dni:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': dni}
+
+
+class LoginIpThrottle(SimpleRateThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+_pool = None
+_cupos = None
+_lock = threading.Lock()
+
+
+def _iniciar_pool():
+    global _pool, _cupos
+    with _lock:
+        if _pool is None:
+            _cupos = threading.BoundedSemaphore(settings.LOGIN_MAX_HILOS + settings.LOGIN_MAX_EN_ESPERA)
+            _pool = ThreadPoolExecutor(max_workers=settings.LOGIN_MAX_HILOS, thread_name_prefix='login')
+
+
+def _en_hilo(funcion, args, kwargs):
+    close_old_connections()
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def ejecutar_login(funcion, *args, **kwargs):
+    # Con LOGIN_MAX_HILOS = 0 el login se ejecuta en el mismo hilo de la petición
+    if settings.LOGIN_MAX_HILOS == 0:
+        return funcion(*args, **kwargs)
+
+    if _pool is None:
+        _iniciar_pool()
+    if not _cupos.acquire(blocking=False):
+        raise LoginSaturado()
+
+    futuro = _pool.submit(_en_hilo, funcion, args, kwargs)
+    # El cupo se libera cuando el hash termina, aunque la petición ya haya expirado
+    futuro.add_done_callback(lambda _: _cupos.release())
+    try:
+        return futuro.result(timeout=settings.LOGIN_TIEMPO_ESPERA)
+    except LoginTimeout:
+        raise LoginSaturado()
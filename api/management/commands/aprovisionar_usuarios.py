@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.aprovisionamiento import aprovisionar, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Crea usuarios en lote desde un archivo CSV o JSON (dni, apel_nomb, tipo_usuarioapp, password)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='Procesos para hashear contraseñas (por defecto APROVISIONAR_PROCESOS)')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['archivo'], encoding='utf-8') as archivo:
+                filas = leer_filas(archivo.read(), options['archivo'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        inicio = time.perf_counter()
+        resultado = aprovisionar(filas, options['procesos'])
+        duracion = time.perf_counter() - inicio
+
+        for error in resultado['errores']:
+            detalle = '; '.join(f'{campo}: {" ".join(mensajes)}' for campo, mensajes in error['errores'].items())
+            self.stderr.write(f"Fila {error['fila']} ({error['dni']}): {detalle}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['creados']} usuarios creados, {len(resultado['errores'])} filas con errores en {duracion:.1f} s"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.archivo import CantidadesSinGuardar, archivar_dia
+from api.models import Registro
+
+
+class Command(BaseCommand):
+    help = 'Mueve al histórico las asistencias de los días cerrados que aún no se archivan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasta', help='Archivar solo días abiertos hasta esta fecha (YYYYMMdd)')
+
+    def handle(self, *args, **options):
+        registros = Registro.objects.filter(estado='Cerrado', archivado=False).order_by('FechaAbierto')
+        if options['hasta']:
+            registros = registros.filter(FechaAbierto__lte=options['hasta'])
+
+        for registro in registros:
+            try:
+                cantidad = archivar_dia(registro.pk)
+            except CantidadesSinGuardar as e:
+                raise CommandError(f'{registro.FechaAbierto}: {e}; ejecutar antes `vaciar_cantidades`')
+            self.stdout.write(f'{registro.FechaAbierto}: {cantidad} asistencias archivadas')
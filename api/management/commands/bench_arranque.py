@@ -0,0 +1,118 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Se ejecuta en un proceso nuevo por medición, para medir el arranque desde cero.
+# modo 'arranque': tiempos de carga y memoria de un proceso.
+# modo 'workers' / 'precarga': crea N workers con fork, sin o con Django cargado en el maestro,
+# y cada uno informa su memoria después de importar todas las vistas.
+SCRIPT = r'''
+import gc, json, os, sys, time
+
+modo, workers = sys.argv[1], int(sys.argv[2])
+
+
+def memoria():
+    # kB; 'privada' son las páginas que el proceso no comparte con nadie (USS)
+    try:
+        with open('/proc/self/smaps_rollup') as archivo:
+            campos = {linea.split(':')[0]: int(linea.split()[1]) for linea in archivo if linea.endswith('kB\n')}
+        return {'rss': campos['Rss'], 'privada': campos['Private_Clean'] + campos['Private_Dirty']}
+    except OSError:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss': rss, 'privada': rss}
+
+
+def cargar():
+    inicio = time.perf_counter()
+    import django
+    django.setup()
+    setup = time.perf_counter()
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    rutas = time.perf_counter()
+    from api.arranque import precargar
+    precargar()
+    fin = time.perf_counter()
+    return {'setup_ms': (setup - inicio) * 1000, 'rutas_ms': (rutas - setup) * 1000,
+            'precarga_ms': (fin - rutas) * 1000}
+
+
+if modo == 'arranque':
+    tiempos = cargar()
+    print(json.dumps(dict(tiempos, modulos=len(sys.modules), **memoria())))
+else:
+    if modo == 'precarga':
+        cargar()
+        gc.collect()
+        gc.freeze()
+    lectura, escritura = os.pipe()
+    hijos = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(lectura)
+            if modo == 'workers':
+                cargar()
+            gc.collect()  # Lo que hace el recolector durante las peticiones
+            os.write(escritura, (json.dumps(memoria()) + '\n').encode())
+            os._exit(0)
+        hijos.append(pid)
+    os.close(escritura)
+    with os.fdopen(lectura) as archivo:
+        print(json.dumps([json.loads(linea) for linea in archivo]))
+    for pid in hijos:
+        os.waitpid(pid, 0)
+'''
+
+
+class Command(BaseCommand):
+    help = ('Mide el arranque de un worker (django.setup, rutas e importación de todas las vistas) y '
+            'la memoria propia de cada worker de gunicorn con y sin preload_app, para cada configuración. '
+            'Uso: python manage.py bench_arranque --configuraciones backend.settings backend.settings_produccion')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--configuraciones', nargs='+',
+                            default=['backend.settings', 'backend.settings_produccion'])
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--workers', type=int, default=4)
+
+    def ejecutar(self, configuracion, modo, workers=0):
+        resultado = subprocess.run(
+            [sys.executable, '-c', SCRIPT, modo, str(workers)],
+            cwd=settings.BASE_DIR, env=dict(os.environ, DJANGO_SETTINGS_MODULE=configuracion),
+            capture_output=True, text=True,
+        )
+        if resultado.returncode != 0:
+            raise CommandError(f'{configuracion}: {resultado.stderr.strip().splitlines()[-1]}')
+        return json.loads(resultado.stdout)
+
+    def handle(self, *args, **options):
+        if not sys.platform.startswith('linux'):
+            self.stderr.write('Sin /proc/self/smaps_rollup: la memoria privada se reporta como el RSS máximo')
+
+        self.stdout.write(f"{'configuración':<32}{'setup ms':>10}{'rutas ms':>10}{'vistas ms':>11}"
+                          f"{'módulos':>9}{'RSS MB':>8}")
+        for configuracion in options['configuraciones']:
+            # Mediana de varios procesos nuevos
+            medidas = [self.ejecutar(configuracion, 'arranque') for _ in range(options['repeticiones'])]
+            mediana = {campo: statistics.median(medida[campo] for medida in medidas) for campo in medidas[0]}
+            self.stdout.write(
+                f"{configuracion:<32}{mediana['setup_ms']:>10.1f}{mediana['rutas_ms']:>10.1f}"
+                f"{mediana['precarga_ms']:>11.1f}{mediana['modulos']:>9.0f}{mediana['rss'] / 1024:>8.1f}"
+            )
+
+        self.stdout.write(f"\nMemoria por worker, {options['workers']} workers (MB, mediana)")
+        self.stdout.write(f"{'configuración':<32}{'modo':<14}{'privada':>9}{'RSS':>8}")
+        for configuracion in options['configuraciones']:
+            for modo, nombre in (('workers', 'sin preload'), ('precarga', 'preload_app')):
+                workers = self.ejecutar(configuracion, modo, options['workers'])
+                privada = statistics.median(worker['privada'] for worker in workers) / 1024
+                rss = statistics.median(worker['rss'] for worker in workers) / 1024
+                self.stdout.write(f'{configuracion:<32}{nombre:<14}{privada:>9.1f}{rss:>8.1f}')
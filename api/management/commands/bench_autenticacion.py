@@ -0,0 +1,52 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.authentication import ClaimsJWTAuthentication, TokenUsuario
+from api.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Compara la latencia por petición de JWTAuthentication y ClaimsJWTAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=2000)
+
+    def medir(self, autenticacion, request, iteraciones):
+        autenticacion.authenticate(request)  # Calentar cachés
+        tiempos = []
+        with CaptureQueriesContext(connection) as consultas:
+            for _ in range(iteraciones):
+                inicio = time.perf_counter()
+                autenticacion.authenticate(request)
+                tiempos.append((time.perf_counter() - inicio) * 1e6)
+        tiempos.sort()
+        return {
+            'p50': statistics.median(tiempos),
+            'p95': tiempos[int(len(tiempos) * 0.95) - 1],
+            'consultas': len(consultas) / iteraciones,
+        }
+
+    def handle(self, *args, **options):
+        iteraciones = options['iteraciones']
+        # El usuario de prueba se descarta al final con el rollback
+        with transaction.atomic():
+            usuario = CustomUser.objects.create_user('99999999', 'Benchmark', password=None)
+            token = str(TokenUsuario.for_user(usuario).access_token)
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            for nombre, autenticacion in [
+                ('JWTAuthentication', JWTAuthentication()),
+                ('ClaimsJWTAuthentication', ClaimsJWTAuthentication()),
+            ]:
+                resultado = self.medir(autenticacion, request, iteraciones)
+                self.stdout.write(
+                    f"{nombre:<25} p50={resultado['p50']:8.1f} µs  p95={resultado['p95']:8.1f} µs  "
+                    f"consultas/petición={resultado['consultas']:.2f}"
+                )
+            transaction.set_rollback(True)
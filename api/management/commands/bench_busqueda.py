@@ -0,0 +1,56 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.busqueda import _Datos
+
+NOMBRES = ['José', 'María', 'Luis', 'Ana', 'Jesús', 'Rosa', 'Juan', 'Carmen', 'Víctor', 'Lucía',
+           'Ángel', 'Sofía', 'César', 'Inés', 'Raúl', 'Martín', 'Julián', 'Begoña', 'Ramón', 'Nélida']
+APELLIDOS = ['Quispe', 'Flores', 'Sánchez', 'Rodríguez', 'García', 'Huamán', 'Chávez', 'Ramírez', 'Mamani',
+             'Vásquez', 'Castillo', 'Gutiérrez', 'Pérez', 'Díaz', 'Mendoza', 'Torres', 'Rojas', 'Núñez',
+             'Espinoza', 'Cóndor', 'Ccahuana', 'Yupanqui', 'Ñañez', 'Zúñiga', 'Paucar']
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia del índice de búsqueda por nombre con datos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entradas', type=int, default=100000)
+        parser.add_argument('--consultas', type=int, default=2000)
+        parser.add_argument('--semilla', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['semilla'])
+        filas = []
+        for i in range(options['entradas']):
+            # Algunos apellidos con un sufijo para que haya muchas palabras distintas
+            apellido = rng.choice(APELLIDOS) + (str(rng.randrange(500)) if rng.random() < 0.3 else '')
+            filas.append((f'{i:06d}', f'{apellido} {rng.choice(APELLIDOS)} {rng.choice(NOMBRES)}'))
+        inicio = time.perf_counter()
+        datos = _Datos.desde_filas(filas)
+        self.stdout.write(f"Índice de {options['entradas']:,} entradas en {time.perf_counter() - inicio:.1f} s")
+
+        consultas = {
+            'prefijo': lambda: rng.choice(APELLIDOS)[:rng.randint(2, 5)],
+            'dos palabras': lambda: f'{rng.choice(APELLIDOS)} {rng.choice(NOMBRES)[:3]}',
+            'con error': lambda: rng.choice(APELLIDOS)[:-1] + 'x',
+        }
+        # Altas y bajas incrementales, como las que llegan por las señales
+        inicio = time.perf_counter()
+        for i in range(1000):
+            datos.quitar(f'{i:06d}')
+            datos.agregar(f'{i:06d}', f'{rng.choice(APELLIDOS)} {rng.choice(NOMBRES)}')
+        self.stdout.write(f'Actualización incremental: {(time.perf_counter() - inicio):.3f} ms por cambio')
+
+        for nombre, generar in consultas.items():
+            tiempos = []
+            for _ in range(options['consultas']):
+                texto = generar()
+                inicio = time.perf_counter()
+                datos.mejores(texto, 10)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            tiempos.sort()
+            self.stdout.write(f'{nombre:<14} p50={statistics.median(tiempos):6.2f} ms  '
+                              f'p95={tiempos[int(len(tiempos) * 0.95) - 1]:6.2f} ms')
@@ -0,0 +1,55 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client
+
+from api.models import CustomUser
+
+PREFIJO_DNI = 'BENCH'
+
+
+class Command(BaseCommand):
+    help = 'Mide el rendimiento de /api/token/ con muchos inicios de sesión simultáneos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=200)
+        parser.add_argument('--concurrencia', type=int, default=32)
+        parser.add_argument('--ips', type=int, default=1,
+                            help='Cantidad de IPs de origen simuladas (una planta suele salir por una sola)')
+
+    def login(self, indice, ips):
+        close_old_connections()
+        cliente = Client(REMOTE_ADDR=f'10.0.{indice % ips // 250}.{indice % ips % 250 + 1}')
+        inicio = time.perf_counter()
+        respuesta = cliente.post('/api/token/', {'dni': f'{PREFIJO_DNI}{indice:07d}', 'password': 'turno'})
+        return respuesta.status_code, time.perf_counter() - inicio
+
+    def handle(self, *args, **options):
+        usuarios = options['usuarios']
+        CustomUser.objects.filter(dni__startswith=PREFIJO_DNI).delete()
+        # Un solo hash para todos los usuarios de prueba
+        password = make_password('turno')
+        CustomUser.objects.bulk_create([
+            CustomUser(dni=f'{PREFIJO_DNI}{i:07d}', apel_nomb=f'Trabajador {i}', password=password)
+            for i in range(usuarios)
+        ])
+
+        try:
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrencia']) as pool:
+                resultados = list(pool.map(lambda i: self.login(i, options['ips']), range(usuarios)))
+            total = time.perf_counter() - inicio
+        finally:
+            CustomUser.objects.filter(dni__startswith=PREFIJO_DNI).delete()
+
+        estados = Counter(codigo for codigo, _ in resultados)
+        tiempos = sorted(duracion * 1000 for codigo, duracion in resultados if codigo == 200)
+        self.stdout.write(f'{usuarios} logins en {total:.2f} s ({estados[200] / total:.1f} logins exitosos/s)')
+        self.stdout.write('Respuestas: ' + ', '.join(f'{codigo}={cantidad}' for codigo, cantidad in sorted(estados.items())))
+        if tiempos:
+            self.stdout.write(f'Latencia p50={statistics.median(tiempos):.0f} ms  p95={tiempos[int(len(tiempos) * 0.95) - 1]:.0f} ms')
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.models import ImportarAsistencia, ImportarAsistenciaDetalle
+from api.serializers import ImportarAsistenciaSerializer, asistencias_rapidas
+
+
+class Command(BaseCommand):
+    help = 'Compara filas por segundo de ImportarAsistenciaSerializer y asistencias_rapidas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cabeceras', type=int, default=5000)
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def medir(self, serializar, repeticiones):
+        # Mejor tiempo de varias repeticiones, incluyendo las consultas y el renderizado a JSON
+        mejor = None
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            contenido = JSONRenderer().render(serializar())
+            duracion = time.perf_counter() - inicio
+            mejor = duracion if mejor is None else min(mejor, duracion)
+        return mejor, contenido
+
+    def handle(self, *args, **options):
+        cabeceras = options['cabeceras']
+        # Los datos de prueba se descartan al final con el rollback
+        with transaction.atomic():
+            ultimo = ImportarAsistencia.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            ImportarAsistencia.objects.bulk_create([
+                ImportarAsistencia(id=ultimo + i, idempresa='001', tipo_envio='A', idresponsable='000001',
+                                   idplanilla='001', idemisor='001', idturno='01', fecha='BENCH',
+                                   idsucursal='001', idespecie='001')
+                for i in range(1, cabeceras + 1)
+            ], batch_size=5000)
+            ImportarAsistenciaDetalle.objects.bulk_create([
+                ImportarAsistenciaDetalle(importar_asistencia_id=ultimo + i, idcodigogeneral=f'{i:08d}',
+                                          idactividad='001', idlabor=f'L{labor:05d}', idconsumidor='000001',
+                                          cantidad=i * 1.5)
+                for i in range(1, cabeceras + 1) for labor in (1, 2)
+            ], batch_size=5000)
+            importar_asistencias = ImportarAsistencia.objects.filter(fecha='BENCH')
+
+            filas = cabeceras * 3  # Cabecera más dos detalles
+            resultados = {}
+            for nombre, serializar in [
+                ('ImportarAsistenciaSerializer', lambda: ImportarAsistenciaSerializer(
+                    importar_asistencias.prefetch_related('detalle'), many=True).data),
+                ('asistencias_rapidas', lambda: asistencias_rapidas(importar_asistencias)),
+            ]:
+                duracion, contenido = self.medir(serializar, options['repeticiones'])
+                resultados[nombre] = contenido
+                self.stdout.write(
+                    f'{nombre:<30} {duracion * 1000:9.1f} ms  {filas / duracion:12,.0f} filas/s  {len(contenido):,} bytes'
+                )
+            transaction.set_rollback(True)
+
+        if len(set(resultados.values())) != 1:
+            raise CommandError('La serialización rápida no produce el mismo JSON que los ModelSerializer')
+        self.stdout.write(self.style.SUCCESS('JSON idéntico byte a byte'))
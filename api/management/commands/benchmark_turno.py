@@ -0,0 +1,67 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import comparar, repetir_turno, sembrar
+
+BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = ('Siembra una base de datos local con el volumen de una planta y repite el tráfico '
+            'de un turno, reportando p50/p95/p99 por operación. '
+            'Uso: python manage.py benchmark_turno --settings=backend.settings_benchmark')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trabajadores', type=int, default=2000)
+        parser.add_argument('--dias', type=int, default=60, help='Días cerrados anteriores al turno')
+        parser.add_argument('--especies', type=int, default=4)
+        parser.add_argument('--turnos', type=int, default=3)
+        parser.add_argument('--peticiones', type=int, default=1000)
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--baseline', default=str(BASELINE))
+        parser.add_argument('--tolerancia', type=float, default=0.5,
+                            help='Aumento máximo permitido del p95 respecto al baseline (0.5 = 50%%)')
+        parser.add_argument('--guardar-baseline', action='store_true',
+                            help='Guardar los resultados como nuevo baseline en lugar de comparar')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BENCHMARK', False):
+            raise CommandError('El benchmark vacía la base de datos; ejecútelo con --settings=backend.settings_benchmark')
+
+        call_command('migrate', verbosity=0)
+        call_command('flush', interactive=False, verbosity=0)
+
+        inicio = time.perf_counter()
+        contexto = sembrar(options['trabajadores'], options['dias'], options['especies'],
+                           options['turnos'], options['semilla'])
+        self.stdout.write(f'Base de datos sembrada en {time.perf_counter() - inicio:.1f} s')
+
+        resultados, rendimiento = repetir_turno(contexto, options['peticiones'], options['semilla'])
+
+        self.stdout.write(f"{'operación':<22}{'peticiones':>11}{'errores':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for operacion, resumen in sorted(resultados.items()):
+            self.stdout.write(
+                f"{operacion:<22}{resumen['peticiones']:>11}{resumen['errores']:>9}"
+                f"{resumen['p50']:>10.1f}{resumen['p95']:>10.1f}{resumen['p99']:>10.1f}"
+            )
+        self.stdout.write(f'Rendimiento: {rendimiento:.1f} peticiones/s')
+
+        ruta = Path(options['baseline'])
+        if options['guardar_baseline']:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(json.dumps(resultados, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f'Baseline guardado en {ruta}')
+            return
+
+        if not ruta.exists():
+            self.stdout.write(f'No existe el baseline {ruta}; use --guardar-baseline para crearlo')
+            return
+        regresiones = comparar(resultados, json.loads(ruta.read_text()), options['tolerancia'])
+        if regresiones:
+            raise CommandError('Regresiones de rendimiento:\n' + '\n'.join(regresiones))
+        self.stdout.write(self.style.SUCCESS('Sin regresiones respecto al baseline'))
@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+
+from api.cambios import leer_cambios
+from api.empresas import en_base
+
+
+def leer_cursor(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as archivo:
+            return int(archivo.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def guardar_cursor(ruta, ultimo):
+    # Se reemplaza de una vez: un corte deja el cursor anterior, nunca uno a medias
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        archivo.write(str(ultimo))
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+def escribir_cambios(directorio, cambios):
+    # Un archivo JSONL por día de creación; el cursor se guarda después del fsync, así que un corte
+    # a lo sumo repite cambios ya escritos (el consumidor los descarta por id)
+    por_dia = {}
+    for cambio in cambios:
+        por_dia.setdefault(timezone.localtime(cambio['creado']).strftime('%Y%m%d'), []).append(cambio)
+    for dia, lineas in por_dia.items():
+        with open(os.path.join(directorio, f'cambios-{dia}.jsonl'), 'a', encoding='utf-8') as archivo:
+            archivo.writelines(json.dumps(cambio, cls=DjangoJSONEncoder) + '\n' for cambio in lineas)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+
+class Command(BaseCommand):
+    help = ('Sigue el log de cambios de asistencias (CambioAsistencia) y lo agrega a archivos JSONL, '
+            'uno por día, en el directorio indicado; continúa desde el id guardado en <directorio>/cursor')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directorio')
+        parser.add_argument('--base', default='default',
+                            help='Alias de la base de asistencias a exportar (ver EMPRESA_BASES_DE_DATOS)')
+        parser.add_argument('--lote', type=int, default=settings.CAMBIOS_LIMITE_MAXIMO)
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera cuando no hay cambios nuevos')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Exportar los cambios disponibles y terminar')
+
+    def handle(self, *args, **options):
+        directorio = options['directorio']
+        os.makedirs(directorio, exist_ok=True)
+        ruta_cursor = os.path.join(directorio, 'cursor')
+        desde = leer_cursor(ruta_cursor)
+        exportados = 0
+
+        while True:
+            close_old_connections()
+            with en_base(options['base']):
+                cambios = leer_cambios(desde, options['lote'])
+            if cambios:
+                escribir_cambios(directorio, cambios)
+                desde = cambios[-1]['id']
+                guardar_cursor(ruta_cursor, desde)
+                exportados += len(cambios)
+            if len(cambios) < options['lote']:
+                if options['una_vez']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS(f'{exportados} cambios exportados hasta el id {desde}'))
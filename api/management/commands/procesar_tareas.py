@@ -0,0 +1,62 @@
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from api.tareas import ejecutar_tarea, liberar_tareas_colgadas, reclamar_tarea
+
+
+def bucle_trabajador(una_vez, intervalo):
+    while True:
+        close_old_connections()
+        tarea = reclamar_tarea()
+        if tarea is None:
+            if una_vez:
+                break
+            liberar_tareas_colgadas()
+            time.sleep(intervalo)
+            continue
+        ejecutar_tarea(tarea)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas en segundo plano encoladas en la tabla Tarea'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=settings.TAREAS_PROCESOS,
+                            help='Cantidad de procesos trabajadores en paralelo')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera cuando no hay tareas pendientes')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesar las tareas pendientes y terminar')
+
+    def handle(self, *args, **options):
+        procesos = max(1, options['procesos'])
+        una_vez = options['una_vez']
+        intervalo = options['intervalo']
+
+        liberadas = liberar_tareas_colgadas()
+        if liberadas:
+            self.stdout.write(f'{liberadas} tareas colgadas fueron liberadas')
+
+        if procesos == 1:
+            bucle_trabajador(una_vez, intervalo)
+            return
+
+        # Cada proceso hijo debe abrir su propia conexión a la base de datos
+        connections.close_all()
+        trabajadores = [
+            multiprocessing.Process(target=bucle_trabajador, args=(una_vez, intervalo), daemon=True)
+            for _ in range(procesos)
+        ]
+        for trabajador in trabajadores:
+            trabajador.start()
+        try:
+            for trabajador in trabajadores:
+                trabajador.join()
+        except KeyboardInterrupt:
+            for trabajador in trabajadores:
+                trabajador.terminate()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.cantidades import cantidades
+
+
+class Command(BaseCommand):
+    help = 'Guarda las cantidades diferidas que quedaron en los logs de procesos que ya no existen'
+
+    def handle(self, *args, **options):
+        recuperadas = cantidades.recuperar()
+        self.stdout.write(self.style.SUCCESS(f'{recuperadas} cantidades guardadas'))
@@ -0,0 +1,96 @@
+# api/metricas.py
+# Histogramas por ruta de la API, exportados en formato de texto de Prometheus.
+# Cada proceso de gunicorn acumula sus propias métricas.
+import threading
+from bisect import bisect_left
+
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+LIMITES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+SERIES = {
+    'api_peticion_duracion_segundos': (LIMITES_SEGUNDOS, 'Tiempo total de la petición'),
+    'api_bd_consultas': (LIMITES_CONSULTAS, 'Consultas SQL por petición'),
+    'api_bd_duracion_segundos': (LIMITES_SEGUNDOS, 'Tiempo en la base de datos por petición'),
+    'api_serializacion_duracion_segundos': (LIMITES_SEGUNDOS, 'Tiempo de renderizado de la respuesta'),
+    'api_respuesta_bytes': (LIMITES_BYTES, 'Tamaño del cuerpo de la respuesta'),
+}
+
+# Contadores de procesos en segundo plano (no ligados a una ruta)
+CONTADORES = {
+    'api_cantidades_fallos_total': 'Ciclos del guardado diferido de cantidades que fallaron',
+}
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.suma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _etiquetas(**valores):
+    escapados = (
+        '{}="{}"'.format(clave, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for clave, valor in valores.items()
+    )
+    return '{' + ','.join(escapados) + '}'
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}  # (serie, ruta, metodo) -> Histograma
+        self._peticiones = {}  # (ruta, metodo, estado) -> cantidad
+        self._contadores = dict.fromkeys(CONTADORES, 0)
+
+    def registrar(self, ruta, metodo, estado, valores):
+        with self._lock:
+            clave = (ruta, metodo, estado)
+            self._peticiones[clave] = self._peticiones.get(clave, 0) + 1
+            for serie, valor in valores.items():
+                histograma = self._histogramas.get((serie, ruta, metodo))
+                if histograma is None:
+                    histograma = self._histogramas[(serie, ruta, metodo)] = Histograma(SERIES[serie][0])
+                histograma.observar(valor)
+
+    def contar(self, serie):
+        with self._lock:
+            self._contadores[serie] += 1
+
+    def exportar(self):
+        lineas = [
+            '# HELP api_peticiones_total Peticiones atendidas',
+            '# TYPE api_peticiones_total counter',
+        ]
+        with self._lock:
+            for (ruta, metodo, estado), cantidad in sorted(self._peticiones.items()):
+                lineas.append(f'api_peticiones_total{_etiquetas(ruta=ruta, metodo=metodo, estado=estado)} {cantidad}')
+
+            for serie, (limites, ayuda) in SERIES.items():
+                lineas.append(f'# HELP {serie} {ayuda}')
+                lineas.append(f'# TYPE {serie} histogram')
+                for (nombre, ruta, metodo), histograma in sorted(self._histogramas.items()):
+                    if nombre != serie:
+                        continue
+                    acumulado = 0
+                    for limite, cuenta in zip(limites + ('+Inf',), histograma.cuentas):
+                        acumulado += cuenta
+                        lineas.append(f'{serie}_bucket{_etiquetas(ruta=ruta, metodo=metodo, le=limite)} {acumulado}')
+                    lineas.append(f'{serie}_sum{_etiquetas(ruta=ruta, metodo=metodo)} {histograma.suma}')
+                    lineas.append(f'{serie}_count{_etiquetas(ruta=ruta, metodo=metodo)} {histograma.total}')
+
+            for serie, ayuda in CONTADORES.items():
+                lineas.append(f'# HELP {serie} {ayuda}')
+                lineas.append(f'# TYPE {serie} counter')
+                lineas.append(f'{serie} {self._contadores[serie]}')
+        return '\n'.join(lineas) + '\n'
+
+
+metricas = Metricas()
@@ -0,0 +1,85 @@
+# api/middleware.py
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metricas import metricas
+
+logger = logging.getLogger('api.lentas')
+
+
+class Medicion:
+    def __init__(self, guardar_sql):
+        self.guardar_sql = guardar_sql
+        self.consultas = 0
+        self.tiempo_bd = 0.0
+        self.tiempo_serializacion = 0.0
+        self.sql = []  # (duración, sql) si se registran las peticiones lentas
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.tiempo_bd += duracion
+            if self.guardar_sql:
+                self.sql.append((duracion, sql))
+
+
+class MetricasMiddleware:
+    # Registra por ruta el tiempo total, las consultas y el tiempo en la base de datos,
+    # el tiempo de renderizado y el tamaño de cada respuesta (ver api/metricas.py)
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        medicion = Medicion(settings.METRICAS_REGISTRAR_LENTAS)
+        request.medicion = medicion
+
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(medicion))
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        # Las respuestas en streaming no tienen un tamaño conocido de antemano
+        tamano = 0 if response.streaming else len(response.content)
+        ruta = request.resolver_match.route if request.resolver_match else 'sin_ruta'
+        metricas.registrar(ruta, request.method, response.status_code, {
+            'api_peticion_duracion_segundos': duracion,
+            'api_bd_consultas': medicion.consultas,
+            'api_bd_duracion_segundos': medicion.tiempo_bd,
+            'api_serializacion_duracion_segundos': medicion.tiempo_serializacion,
+            'api_respuesta_bytes': tamano,
+        })
+
+        if medicion.guardar_sql and duracion * 1000 >= settings.METRICAS_UMBRAL_LENTO_MS:
+            mas_lentas = sorted(medicion.sql, reverse=True)[:5]
+            logger.warning(
+                'Petición lenta %s %s (%s): %.0f ms, %s consultas, %.0f ms en BD, %.0f ms renderizando\n%s',
+                request.method, request.path, response.status_code, duracion * 1000,
+                medicion.consultas, medicion.tiempo_bd * 1000, medicion.tiempo_serializacion * 1000,
+                '\n'.join(f'  {tiempo * 1000:.1f} ms: {sql}' for tiempo, sql in mas_lentas)
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Las respuestas de DRF se renderizan (serializan a JSON) después de la vista
+        render = response.render
+        medicion = request.medicion
+
+        def render_medido():
+            inicio = time.perf_counter()
+            try:
+                return render()
+            finally:
+                medicion.tiempo_serializacion += time.perf_counter() - inicio
+
+        response.render = render_medido
+        return response
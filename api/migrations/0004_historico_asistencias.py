@@ -0,0 +1,68 @@
+# Generated by Django 4.0 on 2026-10-19 14:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_tarea'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportarAsistenciaDetalleHistorico',
+            fields=[
+                ('item', models.IntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.CharField(max_length=6)),
+                ('idcodigogeneral', models.CharField(max_length=8, null=True)),
+                ('idactividad', models.CharField(max_length=3, null=True)),
+                ('idlabor', models.CharField(max_length=6, null=True)),
+                ('idconsumidor', models.CharField(max_length=6, null=True)),
+                ('cantidad', models.FloatField(null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportarAsistenciaHistorico',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('periodo', models.CharField(max_length=6)),
+                ('idempresa', models.CharField(max_length=6, null=True)),
+                ('tipo_envio', models.CharField(max_length=1, null=True)),
+                ('idresponsable', models.CharField(max_length=6, null=True)),
+                ('idplanilla', models.CharField(max_length=3, null=True)),
+                ('idemisor', models.CharField(max_length=3, null=True)),
+                ('idturno', models.CharField(max_length=2, null=True)),
+                ('fecha', models.CharField(blank=True, max_length=8, null=True)),
+                ('idsucursal', models.CharField(max_length=3, null=True)),
+                ('idespecie', models.CharField(max_length=3, null=True)),
+            ],
+            options={
+                'verbose_name': 'Importar Asistencia Histórico',
+                'verbose_name_plural': 'Importar Asistencias Histórico',
+            },
+        ),
+        migrations.AddField(
+            model_name='registro',
+            name='archivado',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistencia',
+            index=models.Index(fields=['fecha'], name='asistencia_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistenciahistorico',
+            index=models.Index(fields=['periodo', 'fecha'], name='historico_periodo_fecha_idx'),
+        ),
+        migrations.AddField(
+            model_name='importarasistenciadetallehistorico',
+            name='importar_asistencia',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detalle', to='api.importarasistenciahistorico'),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistenciadetallehistorico',
+            index=models.Index(fields=['periodo', 'idcodigogeneral'], name='historico_periodo_codigo_idx'),
+        ),
+    ]
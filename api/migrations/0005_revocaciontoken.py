@@ -0,0 +1,22 @@
+# Generated by Django 4.0 on 2026-10-19 14:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_historico_asistencias'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevocacionToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('usuario_id', models.BigIntegerField(unique=True)),
+                ('revocado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
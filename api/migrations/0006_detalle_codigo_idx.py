@@ -0,0 +1,17 @@
+# Generated by Django 4.0 on 2026-10-19 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_revocaciontoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='importarasistenciadetalle',
+            index=models.Index(fields=['idcodigogeneral'], name='detalle_codigo_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0 on 2026-10-19 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_detalle_codigo_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['apel_nomb'], name='usuario_apel_nomb_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_usuario_apel_nomb_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='importarasistencia',
+            index=models.Index(fields=['idempresa', 'fecha'], name='asistencia_empresa_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistenciahistorico',
+            index=models.Index(fields=['periodo', 'idempresa', 'fecha'], name='historico_periodo_empresa_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.0 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+def marcar_dia_abierto(apps, schema_editor):
+    # Si dos aperturas simultáneas dejaron varios días abiertos, la clave queda en el más reciente
+    # (el que usaba la importación de asistencias); los demás ya no cuentan como día actual
+    Registro = apps.get_model('api', 'Registro')
+    abierto = Registro.objects.filter(estado='Abierto').order_by('-FechaAbierto', '-id').first()
+    if abierto:
+        Registro.objects.filter(pk=abierto.pk).update(clave_abierto='dia')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_asistencia_empresa_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registro',
+            name='clave_abierto',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, unique=True),
+        ),
+        migrations.RunPython(marcar_dia_abierto, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.0 on 2026-10-19 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_registro_clave_abierto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registro',
+            name='idsucursal',
+            field=models.CharField(blank=True, max_length=3, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistencia',
+            index=models.Index(fields=['idsucursal', 'fecha'], name='asistencia_sucursal_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importarasistenciahistorico',
+            index=models.Index(fields=['periodo', 'idsucursal', 'fecha'], name='historico_periodo_sucursal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registro',
+            index=models.Index(fields=['idsucursal', 'FechaAbierto'], name='registro_sucursal_fecha_idx'),
+        ),
+    ]
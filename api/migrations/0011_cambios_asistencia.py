@@ -0,0 +1,24 @@
+# Generated by Django 4.0 on 2026-10-19 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_dias_por_sucursal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioAsistencia',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('modelo', models.CharField(max_length=30)),
+                ('operacion', models.CharField(choices=[('alta', 'alta'), ('cambio', 'cambio')], max_length=6)),
+                ('objeto_id', models.BigIntegerField()),
+                ('datos', models.JSONField()),
+            ],
+        ),
+    ]
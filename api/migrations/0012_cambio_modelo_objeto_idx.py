@@ -0,0 +1,17 @@
+# Generated by Django 4.0 on 2026-10-19 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_cambios_asistencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cambioasistencia',
+            index=models.Index(fields=['modelo', 'objeto_id'], name='cambio_modelo_objeto_idx'),
+        ),
+    ]
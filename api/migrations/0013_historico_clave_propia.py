@@ -0,0 +1,63 @@
+# Generated by Django 4.0 on 2026-10-19 18:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copiar_ids_originales(apps, schema_editor):
+    # Las filas ya archivadas conservan su id como clave y también como id original
+    alias = schema_editor.connection.alias
+    apps.get_model('api', 'ImportarAsistenciaHistorico').objects.using(alias).update(id_original=F('clave'))
+    apps.get_model('api', 'ImportarAsistenciaDetalleHistorico').objects.using(alias).update(item=F('clave'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_cambio_modelo_objeto_idx'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='importarasistenciahistorico',
+            old_name='id',
+            new_name='clave',
+        ),
+        migrations.AlterField(
+            model_name='importarasistenciahistorico',
+            name='clave',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AddField(
+            model_name='importarasistenciahistorico',
+            name='id_original',
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RenameField(
+            model_name='importarasistenciadetallehistorico',
+            old_name='item',
+            new_name='clave',
+        ),
+        migrations.AlterField(
+            model_name='importarasistenciadetallehistorico',
+            name='clave',
+            field=models.BigAutoField(primary_key=True, serialize=False),
+        ),
+        migrations.AddField(
+            model_name='importarasistenciadetallehistorico',
+            name='item',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.RunPython(copiar_ids_originales, migrations.RunPython.noop,
+                             hints={'model_name': 'importarasistenciahistorico'}),
+        migrations.AlterField(
+            model_name='importarasistenciahistorico',
+            name='id_original',
+            field=models.BigIntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='importarasistenciadetallehistorico',
+            name='item',
+            field=models.IntegerField(db_index=True),
+        ),
+    ]
@@ -63,8 +63,23 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'dni'
     REQUIRED_FIELDS = ['apel_nomb', 'tipo_usuarioapp']
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['apel_nomb'], name='usuario_apel_nomb_idx'),
+        ]
+
     def __str__(self):
         return f'{self.apel_nomb} ({self.dni})'
+
+
+class RevocacionToken(models.Model):
+    # Los tokens de este usuario emitidos antes de `revocado_en` dejan de ser válidos.
+    # No es una ForeignKey para que la revocación sobreviva a la eliminación del usuario.
+    usuario_id = models.BigIntegerField(unique=True)
+    revocado_en = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f'{self.usuario_id} - {self.revocado_en}'
     
 
 from django.db import models
@@ -275,8 +290,51 @@ class Consumidor(models.Model):
 
 
 # ------------------------------------------------------------------------------------
+from django.db import router, transaction
+
+from .empresas import empresa_actual
+from .sucursales import sucursal_actual
+
+
+class AsistenciaManager(models.Manager):
+    # Con una empresa o una sucursal en el contexto de la petición (cabeceras X-Empresa y
+    # X-Sucursal, ver api/empresas.py y api/sucursales.py) solo se ven sus asistencias
+    campo_empresa = 'idempresa'
+    campo_sucursal = 'idsucursal'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        empresa = empresa_actual()
+        if empresa:
+            queryset = queryset.filter(**{self.campo_empresa: empresa})
+        sucursal = sucursal_actual()
+        if sucursal:
+            queryset = queryset.filter(**{self.campo_sucursal: sucursal})
+        return queryset
 
-class ImportarAsistencia(models.Model):
+
+class DetalleAsistenciaManager(AsistenciaManager):
+    campo_empresa = 'importar_asistencia__idempresa'
+    campo_sucursal = 'importar_asistencia__idsucursal'
+
+
+class RegistraCambios(models.Model):
+    # Cada save() escribe su CambioAsistencia en la misma transacción que la fila (api/cambios.py)
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        operacion = 'alta' if self._state.adding else 'cambio'
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        # Sin punto de guardado: dentro de una transacción exterior no agrega consultas
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+            CambioAsistencia.objects.using(self._state.db).create(
+                **CambioAsistencia.datos_de(self, operacion, kwargs.get('update_fields'))
+            )
+
+
+class ImportarAsistencia(RegistraCambios):
     idempresa = models.CharField(max_length=6, null=True)
     tipo_envio = models.CharField(max_length=1, null=True)
     idresponsable = models.CharField(max_length=6, null=True)
@@ -287,15 +345,22 @@ class ImportarAsistencia(models.Model):
     idsucursal = models.CharField(max_length=3, null=True)
     idespecie = models.CharField(max_length=3, null=True)
 
+    objects = AsistenciaManager()
+
     class Meta:
         verbose_name = 'Importar Asistencia'
         verbose_name_plural = 'Importar Asistencias'
+        indexes = [
+            models.Index(fields=['fecha'], name='asistencia_fecha_idx'),
+            models.Index(fields=['idempresa', 'fecha'], name='asistencia_empresa_fecha_idx'),
+            models.Index(fields=['idsucursal', 'fecha'], name='asistencia_sucursal_fecha_idx'),
+        ]
 
     def __str__(self):
         return self.idempresa + ' - ' + self.fecha
     
 
-class ImportarAsistenciaDetalle(models.Model):
+class ImportarAsistenciaDetalle(RegistraCambios):
     importar_asistencia = models.ForeignKey('ImportarAsistencia', related_name='detalle', on_delete=models.CASCADE)
     item = models.AutoField(primary_key=True)
     idcodigogeneral = models.CharField(max_length=8, null=True)
@@ -304,8 +369,13 @@ class ImportarAsistenciaDetalle(models.Model):
     idconsumidor = models.CharField(max_length=6, null=True)
     cantidad = models.FloatField(null=True)
 
+    objects = DetalleAsistenciaManager()
+
     class Meta:
         unique_together = (('importar_asistencia', 'item'),)
+        indexes = [
+            models.Index(fields=['idcodigogeneral'], name='detalle_codigo_idx'),
+        ]
 
     @staticmethod
     def generar_item(importar_asistencia):
@@ -318,11 +388,108 @@ class ImportarAsistenciaDetalle(models.Model):
         return item
 
 
+# Histórico de asistencias de días cerrados (ver api/archivo.py).
+# Conserva los ids originales (id_original, item) con una clave propia: con MySQL < 8 el
+# AUTO_INCREMENT de las tablas actuales vuelve a MAX(id) + 1 al reiniciar y un id ya archivado
+# se puede repetir. Agrega el periodo (YYYYMM) como primera columna de los índices, de modo
+# que cada consulta solo recorre el mes que le corresponde.
+
+class ImportarAsistenciaHistorico(models.Model):
+    clave = models.BigAutoField(primary_key=True)
+    id_original = models.BigIntegerField(db_index=True)
+    periodo = models.CharField(max_length=6)  # YYYYMM
+    idempresa = models.CharField(max_length=6, null=True)
+    tipo_envio = models.CharField(max_length=1, null=True)
+    idresponsable = models.CharField(max_length=6, null=True)
+    idplanilla = models.CharField(max_length=3, null=True)
+    idemisor = models.CharField(max_length=3, null=True)
+    idturno = models.CharField(max_length=2, null=True)
+    fecha = models.CharField(max_length=8, blank=True, null=True)
+    idsucursal = models.CharField(max_length=3, null=True)
+    idespecie = models.CharField(max_length=3, null=True)
+
+    objects = AsistenciaManager()
+
+    class Meta:
+        verbose_name = 'Importar Asistencia Histórico'
+        verbose_name_plural = 'Importar Asistencias Histórico'
+        indexes = [
+            models.Index(fields=['periodo', 'fecha'], name='historico_periodo_fecha_idx'),
+            models.Index(fields=['periodo', 'idempresa', 'fecha'], name='historico_periodo_empresa_idx'),
+            models.Index(fields=['periodo', 'idsucursal', 'fecha'], name='historico_periodo_sucursal_idx'),
+        ]
+
+    def __str__(self):
+        return self.idempresa + ' - ' + self.fecha
+
+
+class ImportarAsistenciaDetalleHistorico(models.Model):
+    clave = models.BigAutoField(primary_key=True)
+    importar_asistencia = models.ForeignKey('ImportarAsistenciaHistorico', related_name='detalle', on_delete=models.CASCADE)
+    item = models.IntegerField(db_index=True)
+    periodo = models.CharField(max_length=6)  # YYYYMM
+    idcodigogeneral = models.CharField(max_length=8, null=True)
+    idactividad = models.CharField(max_length=3, null=True)
+    idlabor = models.CharField(max_length=6, null=True)
+    idconsumidor = models.CharField(max_length=6, null=True)
+    cantidad = models.FloatField(null=True)
+
+    objects = DetalleAsistenciaManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['periodo', 'idcodigogeneral'], name='historico_periodo_codigo_idx'),
+        ]
+
+
+# Log de solo inserción con cada alta o cambio de ImportarAsistencia e ImportarAsistenciaDetalle,
+# para los sistemas que los leen en orden desde /api/cambios/ o `exportar_cambios` (api/cambios.py).
+# Vive en la misma base que las asistencias (api/empresas.py); el id es el cursor.
+
+class CambioAsistencia(models.Model):
+    OPERACION_CHOICES = [
+        ('alta', 'alta'),
+        ('cambio', 'cambio'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    modelo = models.CharField(max_length=30)  # importarasistencia o importarasistenciadetalle
+    operacion = models.CharField(max_length=6, choices=OPERACION_CHOICES)
+    objeto_id = models.BigIntegerField()
+    datos = models.JSONField()  # La clave primaria y los campos guardados
+
+    class Meta:
+        indexes = [
+            # Último cambio de un detalle (api/cantidades.py, al recuperar logs)
+            models.Index(fields=['modelo', 'objeto_id'], name='cambio_modelo_objeto_idx'),
+        ]
+
+    @staticmethod
+    def datos_de(instancia, operacion, campos=None):
+        # Argumentos para crear el cambio de `instancia`; `campos` = solo los que se guardaron
+        datos = {
+            campo.attname: campo.value_from_object(instancia)
+            for campo in instancia._meta.concrete_fields
+            if campos is None or campo.primary_key or campo.name in campos
+        }
+        return {'modelo': instancia._meta.model_name, 'operacion': operacion,
+                'objeto_id': instancia.pk, 'datos': datos}
+
+
 
 #-------------------------------------------------------------------------------------
 
 from django.db import models
 
+CLAVE_DIA_ABIERTO = 'dia'
+
+
+def clave_dia_abierto(idsucursal):
+    # Un día abierto general (sin sucursal) y uno por sucursal
+    return f'{CLAVE_DIA_ABIERTO}:{idsucursal}' if idsucursal else CLAVE_DIA_ABIERTO
+
+
 class Registro(models.Model):
     ESTADO_CHOICES = [
         ('Abierto', 'Abierto'),
@@ -334,9 +501,52 @@ class Registro(models.Model):
     estado = models.CharField(max_length=7, choices=ESTADO_CHOICES)
     FechaCerrado = models.CharField(max_length=8, blank=True, null=True)  # YYYYMMdd
     HoraCerrado = models.TimeField(blank=True, null=True)
+    archivado = models.BooleanField(default=False)  # Sus asistencias ya están en el histórico
+    idsucursal = models.CharField(max_length=3, blank=True, null=True)  # NULL = día general (api/sucursales.py)
+    # clave_dia_abierto() mientras está abierto y NULL al cerrarse: la restricción única hace que la
+    # base de datos rechace un segundo día abierto de la misma sucursal (las filas con NULL no chocan)
+    clave_abierto = models.CharField(max_length=20, unique=True, null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['idsucursal', 'FechaAbierto'], name='registro_sucursal_fecha_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.clave_abierto = clave_dia_abierto(self.idsucursal) if self.estado == 'Abierto' else None
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'{self.estado} - {self.FechaAbierto} - {self.HoraAbierto}'
 
 
 #----------------------------------------------------------------
+
+
+class Tarea(models.Model):
+    ESTADO_CHOICES = [
+        ('Pendiente', 'Pendiente'),
+        ('En proceso', 'En proceso'),
+        ('Completada', 'Completada'),
+        ('Fallida', 'Fallida'),
+    ]
+
+    nombre = models.CharField(max_length=255)  # Ruta de la función, p. ej. 'api.tareas.mi_tarea'
+    argumentos = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='Pendiente')
+    registro = models.ForeignKey('Registro', related_name='tareas', on_delete=models.SET_NULL, null=True, blank=True)
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=3)
+    error = models.TextField(blank=True, null=True)
+    creado = models.DateTimeField(default=timezone.now)
+    ejecutar_desde = models.DateTimeField(default=timezone.now)  # Se posterga en cada reintento
+    iniciado = models.DateTimeField(blank=True, null=True)
+    terminado = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'ejecutar_desde'], name='tarea_estado_ejecutar_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.nombre} - {self.estado}'
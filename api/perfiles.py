@@ -0,0 +1,222 @@
+# api/perfiles.py
+# Perfiles de peticiones bajo demanda, con el SQL ejecutado (/api/perfiles/).
+# Se activan por petición con la cabecera X-Perfilar: cprofile|muestreo (solo administradores)
+# o por ruta con PERFILES_RUTAS. 'cprofile' mide cada llamada a función; 'muestreo' toma la pila
+# del hilo cada PERFILES_INTERVALO_MUESTREO_MS y casi no agrega tiempo a la petición. Se guardan
+# en PERFILES_DIRECTORIO, conservando los últimos PERFILES_MAX_ARCHIVOS de hasta PERFILES_MAX_DIAS.
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import BasePermission
+
+from .authentication import ClaimsJWTAuthentication
+from .models import CustomUser
+
+MODOS = ('cprofile', 'muestreo')
+MAX_SQL = 500
+MAX_FUNCIONES = 60  # Funciones del informe de cProfile, por tiempo acumulado
+PATRON_ID = re.compile(r'\d{8}-\d{6}-\d{6}-[0-9a-f]{4}')  # Fecha con microsegundos: ordenan por antigüedad
+
+
+def es_administrador(usuario):
+    return bool(usuario and usuario.is_authenticated and (
+        usuario.is_staff or usuario.tipo_usuarioapp == CustomUser.TipoUsuario.ADMINISTRADOR))
+
+
+class EsAdministrador(BasePermission):
+    def has_permission(self, request, view):
+        return es_administrador(request.user)
+
+
+class Muestreador:
+    # Cuenta las pilas del hilo de la petición en formato "plegado" (función;función;... cuenta),
+    # el que usan flamegraph.pl y speedscope
+    def __init__(self, hilo_id, intervalo):
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self._fin = threading.Event()
+        self._hilo = threading.Thread(target=self._ciclo, name='perfil-muestreo', daemon=True)
+
+    def _ciclo(self):
+        while not self._fin.wait(self.intervalo):
+            frame = sys._current_frames().get(self.hilo_id)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                pila.append(f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})')
+                frame = frame.f_back
+            if pila:
+                self.pilas[';'.join(reversed(pila))] += 1
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._hilo.join()
+
+    def plegado(self):
+        return [f'{pila} {cuenta}' for pila, cuenta in self.pilas.most_common()]
+
+
+class ConsultasSQL:
+    def __init__(self):
+        self.consultas = []
+        self.total = 0
+        self.tiempo = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.total += 1
+            self.tiempo += duracion
+            if len(self.consultas) < MAX_SQL:
+                self.consultas.append({'ms': round(duracion * 1000, 3), 'alias': context['connection'].alias, 'sql': sql})
+
+
+def _directorio():
+    return str(settings.PERFILES_DIRECTORIO)
+
+
+def ruta_perfil(perfil, extension='.json'):
+    # None si el id no tiene el formato esperado o el archivo no existe (evita rutas arbitrarias)
+    if not PATRON_ID.fullmatch(perfil):
+        return None
+    ruta = os.path.join(_directorio(), perfil + extension)
+    return ruta if os.path.exists(ruta) else None
+
+
+def _purgar():
+    archivos = sorted(nombre for nombre in os.listdir(_directorio()) if nombre.endswith('.json'))
+    limite = time.time() - settings.PERFILES_MAX_DIAS * 86400
+    sobrantes = len(archivos) - settings.PERFILES_MAX_ARCHIVOS
+    for posicion, nombre in enumerate(archivos):
+        ruta = os.path.join(_directorio(), nombre)
+        if posicion < sobrantes or os.path.getmtime(ruta) < limite:
+            for extension in ('.json', '.prof'):
+                try:
+                    os.remove(ruta[:-len('.json')] + extension)
+                except FileNotFoundError:
+                    pass
+
+
+def guardar_perfil(datos, perfil_cprofile=None):
+    os.makedirs(_directorio(), exist_ok=True)
+    ruta = os.path.join(_directorio(), datos['id'])
+    if perfil_cprofile is not None:
+        perfil_cprofile.dump_stats(ruta + '.prof')
+    # Se escribe con otro nombre y se renombra para que la lista nunca lea un archivo a medias
+    with open(ruta + '.tmp', 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo, ensure_ascii=False)
+    os.replace(ruta + '.tmp', ruta + '.json')
+    _purgar()
+
+
+def listar_perfiles():
+    try:
+        nombres = sorted((nombre for nombre in os.listdir(_directorio()) if nombre.endswith('.json')), reverse=True)
+    except FileNotFoundError:
+        return []
+    perfiles = []
+    for nombre in nombres:
+        try:
+            with open(os.path.join(_directorio(), nombre), encoding='utf-8') as archivo:
+                datos = json.load(archivo)
+        except (OSError, ValueError):
+            continue  # Purgado mientras se listaba
+        perfiles.append({campo: datos[campo] for campo in (
+            'id', 'fecha', 'modo', 'metodo', 'ruta', 'path', 'estado', 'duracion_ms', 'consultas', 'bd_ms')})
+    return perfiles
+
+
+class PerfilMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _modo(self, request):
+        modo = request.headers.get('X-Perfilar')
+        if modo:
+            # La autenticación de DRF todavía no corrió: se valida el token solo si viene la cabecera
+            try:
+                autenticado = ClaimsJWTAuthentication().authenticate(request)
+            except APIException:
+                autenticado = None
+            if modo in MODOS and autenticado and es_administrador(autenticado[0]):
+                return modo
+        if settings.PERFILES_RUTAS:
+            try:
+                configuracion = settings.PERFILES_RUTAS.get(resolve(request.path_info).route)
+            except Resolver404:
+                configuracion = None
+            if configuracion and random.random() < configuracion[1]:
+                return configuracion[0]
+        return None
+
+    def __call__(self, request):
+        modo = self._modo(request)
+        if modo is None:
+            return self.get_response(request)
+
+        sql = ConsultasSQL()
+        perfil = cProfile.Profile() if modo == 'cprofile' else None
+        fecha = datetime.now()
+        inicio = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(sql))
+            if perfil is None:
+                muestreador = stack.enter_context(Muestreador(threading.get_ident(), settings.PERFILES_INTERVALO_MUESTREO_MS / 1000))
+                response = self.get_response(request)
+            else:
+                perfil.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    perfil.disable()
+        duracion = time.perf_counter() - inicio
+
+        if perfil is None:
+            resultado = muestreador.plegado()
+        else:
+            texto = io.StringIO()
+            pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(MAX_FUNCIONES)
+            resultado = texto.getvalue()
+
+        datos = {
+            'id': f'{fecha:%Y%m%d-%H%M%S-%f}-{secrets.token_hex(2)}',
+            'fecha': fecha.isoformat(timespec='milliseconds'),
+            'modo': modo,
+            'metodo': request.method,
+            'ruta': request.resolver_match.route if request.resolver_match else None,
+            'path': request.get_full_path(),
+            'estado': response.status_code,
+            'duracion_ms': round(duracion * 1000, 1),
+            'consultas': sql.total,
+            'bd_ms': round(sql.tiempo * 1000, 1),
+            'sql': sql.consultas,
+            'perfil': resultado,
+        }
+        guardar_perfil(datos, perfil)
+        response['X-Perfil'] = datos['id']
+        return response
@@ -0,0 +1,199 @@
+# api/ranking.py
+# Totales de cantidad del día abierto por (idcodigogeneral, idlabor, idespecie), ordenados para
+# responder el top N y la posición de cada trabajador en O(log n) (/api/ranking/).
+# Se arma desde la base de datos la primera vez que se consulta (al reiniciar el proceso), se
+# actualiza con cada detalle guardado en este proceso (api/signals.py) y se reconstruye en
+# segundo plano cada RANKING_TTL_RECONSTRUCCION segundos para sumar lo guardado por otros
+# procesos, como el índice de api/busqueda.py: mientras tanto se responde con los totales anteriores.
+# Cada sucursal (api/sucursales.py) tiene su propio ranking, del día abierto que ve.
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from sortedcontainers import SortedList
+
+from .dia import dia_abierto
+from .models import ImportarAsistenciaDetalle
+from .sucursales import sucursal_actual
+
+
+class _Totales:
+    def __init__(self, fecha, sucursal=None):
+        self.fecha = fecha
+        self.sucursal = sucursal  # None: todas las sucursales
+        self.detalles = {}  # item -> (clave, cantidad)
+        self.cantidades = {}  # clave -> {item: cantidad}
+        self.totales = {}  # clave -> total
+        self.claves_por_trabajador = {}  # idcodigogeneral -> set(claves)
+        # (-total, clave) ordenados: global, por labor, por especie y por labor y especie
+        self.ordenados = {}
+
+    def _listas(self, clave):
+        _, idlabor, idespecie = clave
+        for filtro in ((None, None), (idlabor, None), (None, idespecie), (idlabor, idespecie)):
+            lista = self.ordenados.get(filtro)
+            if lista is None:
+                lista = self.ordenados[filtro] = SortedList()
+            yield lista
+
+    def aplicar(self, item, clave, cantidad):
+        anterior = self.detalles.get(item)
+        if anterior is not None and anterior[0] != clave:
+            self._cambiar(anterior[0], item, None)
+        self.detalles[item] = (clave, cantidad or 0)
+        self._cambiar(clave, item, cantidad or 0)
+
+    def _cambiar(self, clave, item, cantidad):
+        # El total se vuelve a sumar desde los detalles de la clave para no acumular errores de redondeo
+        cantidades = self.cantidades.setdefault(clave, {})
+        if cantidad is None:
+            cantidades.pop(item, None)
+        else:
+            cantidades[item] = cantidad
+
+        total_anterior = self.totales.get(clave)
+        if total_anterior is not None:
+            for lista in self._listas(clave):
+                lista.remove((-total_anterior, clave))
+        if cantidades:
+            total = sum(cantidades.values())
+            self.totales[clave] = total
+            self.claves_por_trabajador.setdefault(clave[0], set()).add(clave)
+            for lista in self._listas(clave):
+                lista.add((-total, clave))
+        else:
+            self.totales.pop(clave, None)
+            del self.cantidades[clave]
+            claves = self.claves_por_trabajador[clave[0]]
+            claves.discard(clave)
+            if not claves:
+                del self.claves_por_trabajador[clave[0]]
+
+    def top(self, n, idlabor=None, idespecie=None):
+        lista = self.ordenados.get((idlabor, idespecie), ())
+        return [self._fila(posicion, clave, -total)
+                for posicion, (total, clave) in enumerate(lista[:n], start=1)]
+
+    def trabajador(self, idcodigogeneral, idlabor=None, idespecie=None):
+        lista = self.ordenados.get((idlabor, idespecie), SortedList())
+        claves = sorted(clave for clave in self.claves_por_trabajador.get(idcodigogeneral, ())
+                        if idlabor in (None, clave[1]) and idespecie in (None, clave[2]))
+        return [self._fila(lista.index((-self.totales[clave], clave)) + 1, clave, self.totales[clave])
+                for clave in claves]
+
+    @staticmethod
+    def _fila(posicion, clave, total):
+        idcodigogeneral, idlabor, idespecie = clave
+        return {'posicion': posicion, 'idcodigogeneral': idcodigogeneral, 'idlabor': idlabor,
+                'idespecie': idespecie, 'total': total}
+
+
+class Ranking:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_sucursal = {}  # sucursal -> (totales, construido)
+        self._reconstruyendo = {}  # sucursal -> [(detalle, cabecera)] guardados mientras se reconstruye
+
+    def _cargar(self, sucursal):
+        # El manager ya filtra los detalles por la sucursal del contexto
+        registro_abierto = dia_abierto()
+        if registro_abierto is None:
+            return _Totales(None, sucursal)
+        totales = _Totales(registro_abierto.FechaAbierto, sucursal)
+        detalles = ImportarAsistenciaDetalle.objects.filter(
+            importar_asistencia__fecha=registro_abierto.FechaAbierto
+        ).values_list('item', 'idcodigogeneral', 'idlabor', 'importar_asistencia__idespecie', 'cantidad')
+        for item, idcodigogeneral, idlabor, idespecie, cantidad in detalles.iterator(chunk_size=5000):
+            totales.aplicar(item, (idcodigogeneral, idlabor, idespecie), cantidad)
+        return totales
+
+    def _reconstruir_en_segundo_plano(self, sucursal, pendientes):
+        try:
+            totales = self._cargar(sucursal)
+            with self._lock:
+                if self._reconstruyendo.get(sucursal) is not pendientes:
+                    return  # limpiar() durante la reconstrucción: el día cambió
+                # Los detalles guardados mientras se leía la base de datos, en el orden en que llegaron
+                for detalle, cabecera in pendientes:
+                    self._aplicar(totales, detalle, cabecera)
+                self._por_sucursal[sucursal] = (totales, time.monotonic())
+        finally:
+            with self._lock:
+                if self._reconstruyendo.get(sucursal) is pendientes:
+                    del self._reconstruyendo[sucursal]
+            connections.close_all()
+
+    def _totales_actuales(self):
+        sucursal = sucursal_actual()
+        with self._lock:
+            totales, construido = self._por_sucursal.get(sucursal, (None, 0.0))
+            vencido = time.monotonic() - construido > settings.RANKING_TTL_RECONSTRUCCION
+            if totales is not None and vencido and sucursal not in self._reconstruyendo:
+                # Se sigue respondiendo con los totales anteriores mientras se arman los nuevos;
+                # el hilo trabaja con la empresa y la sucursal de esta petición
+                pendientes = self._reconstruyendo[sucursal] = []
+                threading.Thread(target=contextvars.copy_context().run,
+                                 args=(self._reconstruir_en_segundo_plano, sucursal, pendientes), daemon=True).start()
+        if totales is None:
+            totales = self._cargar(sucursal)
+            with self._lock:
+                if sucursal not in self._por_sucursal:
+                    self._por_sucursal[sucursal] = (totales, time.monotonic())
+                totales = self._por_sucursal[sucursal][0]
+        return totales
+
+    def top(self, n, idlabor=None, idespecie=None):
+        totales = self._totales_actuales()
+        with self._lock:
+            return totales.fecha, totales.top(n, idlabor, idespecie)
+
+    def trabajador(self, idcodigogeneral, idlabor=None, idespecie=None):
+        totales = self._totales_actuales()
+        with self._lock:
+            return totales.fecha, totales.trabajador(idcodigogeneral, idlabor, idespecie)
+
+    @staticmethod
+    def _aplicar(totales, detalle, cabecera):
+        conocido = totales.detalles.get(detalle.item)
+        if conocido is not None:
+            # Los detalles no cambian de cabecera: la especie ya se conoce
+            clave = (detalle.idcodigogeneral, detalle.idlabor, conocido[0][2])
+            totales.aplicar(detalle.item, clave, detalle.cantidad)
+        elif cabecera.fecha == totales.fecha and totales.sucursal in (None, cabecera.idsucursal):
+            totales.aplicar(detalle.item, (detalle.idcodigogeneral, detalle.idlabor, cabecera.idespecie),
+                            detalle.cantidad)
+
+    def detalle_guardado(self, detalle):
+        # Se aplica a cada ranking armado que incluye el detalle; los que no están armados se
+        # arman completos en la próxima consulta
+        with self._lock:
+            nuevos = []
+            for totales, _ in self._por_sucursal.values():
+                if totales.fecha is None:
+                    continue
+                if detalle.item in totales.detalles:
+                    self._aplicar(totales, detalle, None)
+                else:
+                    nuevos.append(totales)
+            reconstruyendo = bool(self._reconstruyendo)
+        if not nuevos and not reconstruyendo:
+            return
+        # Detalle nuevo: la cabecera ya está en caché cuando se crea desde importar-asistencia
+        cabecera = detalle.importar_asistencia
+        with self._lock:
+            for pendientes in self._reconstruyendo.values():
+                pendientes.append((detalle, cabecera))
+            armados = [totales for totales, _ in self._por_sucursal.values()]
+            for totales in nuevos:
+                if totales in armados:
+                    self._aplicar(totales, detalle, cabecera)
+
+    def limpiar(self):
+        with self._lock:
+            self._por_sucursal = {}
+            self._reconstruyendo = {}
+
+
+ranking = Ranking()
@@ -0,0 +1,49 @@
+# api/replicas.py
+# Lecturas de reportes en una réplica de solo lectura (DATABASE_REPLICA).
+# Las vistas marcadas con @lectura_en_replica leen de la réplica; dentro de `en_primaria()`
+# (datos del día abierto, que la réplica puede tener atrasados) y fuera de esas vistas todo
+# va a 'default'. Las escrituras siempre van a 'default'.
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+# Alias de lectura de la petición actual; None = el de Django ('default')
+_alias_lectura = ContextVar('alias_lectura', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _alias_lectura.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplica tiene los mismos datos que 'default'
+        return True
+
+
+def lectura_en_replica(vista):
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        token = _alias_lectura.set(settings.DATABASE_REPLICA)
+        try:
+            return vista(*args, **kwargs)
+        finally:
+            _alias_lectura.reset(token)
+    return envoltura
+
+
+@contextmanager
+def en_primaria():
+    token = _alias_lectura.set(None)
+    try:
+        yield
+    finally:
+        _alias_lectura.reset(token)
+
+
+def en_replica():
+    return _alias_lectura.get() is not None
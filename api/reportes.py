@@ -0,0 +1,145 @@
+# api/reportes.py
+# Reporte de cantidades y asistencias en un rango de fechas (/api/reportes/rango/).
+# El rango se divide por mes; cada mes se agrega en la base de datos (tablas actuales e
+# históricas) en un pool de hilos, y los meses ya cerrados se guardan en caché.
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import copy_context
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Count, F, Sum
+
+from .dia import dias_abiertos
+from .empresas import empresa_actual
+from .models import ImportarAsistenciaDetalle, ImportarAsistenciaDetalleHistorico
+from .replicas import en_primaria
+from .sucursales import sucursal_actual
+
+# Dimensión -> campo desde el detalle
+DIMENSIONES = {
+    'fecha': 'importar_asistencia__fecha',
+    'idcodigogeneral': 'idcodigogeneral',
+    'idlabor': 'idlabor',
+    'idactividad': 'idactividad',
+    'idconsumidor': 'idconsumidor',
+    'idempresa': 'importar_asistencia__idempresa',
+    'idsucursal': 'importar_asistencia__idsucursal',
+    'idespecie': 'importar_asistencia__idespecie',
+    'idturno': 'importar_asistencia__idturno',
+    'idplanilla': 'importar_asistencia__idplanilla',
+    'idresponsable': 'importar_asistencia__idresponsable',
+}
+MAX_DIAS = 366
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _obtener_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.REPORTES_HILOS, thread_name_prefix='reportes')
+    return _pool
+
+
+def meses(desde, hasta):
+    # [(desde, hasta)] de cada mes del rango, recortados a sus extremos
+    tramos = []
+    inicio = desde
+    while inicio <= hasta:
+        siguiente_mes = (inicio.replace(day=1) + timedelta(days=32)).replace(day=1)
+        fin = min(hasta, siguiente_mes - timedelta(days=1))
+        tramos.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return tramos
+
+
+def _agregar_tramo(dimensiones, desde, hasta):
+    desde, hasta = desde.strftime('%Y%m%d'), hasta.strftime('%Y%m%d')
+    valores = {dimension: F(DIMENSIONES[dimension]) for dimension in dimensiones
+               if DIMENSIONES[dimension] != dimension}
+    filas = []
+    for modelo, filtro in (
+        (ImportarAsistenciaDetalleHistorico, {'periodo': desde[:6]}),
+        (ImportarAsistenciaDetalle, {}),
+    ):
+        consulta = modelo.objects.filter(importar_asistencia__fecha__range=(desde, hasta), **filtro)
+        totales = {
+            'cantidad': Sum('cantidad'),
+            'registros': Count('item'),
+            'asistencias': Count('importar_asistencia', distinct=True),
+        }
+        if not dimensiones:
+            # values() sin campos agruparía por todas las columnas: un solo total
+            fila = consulta.aggregate(**totales)
+            if fila['registros']:
+                filas.append(fila)
+            continue
+        filas.extend(consulta.values(*[d for d in dimensiones if d not in valores], **valores)
+                     .annotate(**totales).order_by())
+    return filas
+
+
+def _tramo(dimensiones, desde, hasta, cerrado):
+    # El manager de asistencias filtra por la empresa y la sucursal del contexto
+    clave = (f"reporte:{empresa_actual() or ''}:{sucursal_actual() or ''}:"
+             f"{','.join(dimensiones)}:{desde:%Y%m%d}:{hasta:%Y%m%d}")
+    if cerrado:
+        filas = cache.get(clave)
+        if filas is not None:
+            return filas
+    # Con réplica (api/replicas.py), el mes del día abierto se lee de la base principal
+    with nullcontext() if cerrado else en_primaria():
+        filas = _agregar_tramo(dimensiones, desde, hasta)
+    if cerrado:
+        cache.set(clave, filas, settings.REPORTES_CACHE_TTL)
+    return filas
+
+
+def _tramo_en_hilo(*args):
+    close_old_connections()
+    try:
+        return _tramo(*args)
+    finally:
+        close_old_connections()
+
+
+def primer_dia_abierto():
+    # Desde este día los datos todavía pueden cambiar; sin sucursal, el primero de todas
+    abiertos = dias_abiertos()
+    if abiertos:
+        return min(datetime.strptime(registro.FechaAbierto, '%Y%m%d').date() for registro in abiertos)
+    return date.today()
+
+
+def reporte_rango(desde, hasta, dimensiones):
+    abierto = primer_dia_abierto()
+    tramos = [(dimensiones, inicio, fin, fin < abierto) for inicio, fin in meses(desde, hasta)]
+
+    # Con REPORTES_HILOS = 0 los meses se agregan en el hilo de la petición
+    if settings.REPORTES_HILOS == 0 or len(tramos) == 1:
+        resultados = [_tramo(*tramo) for tramo in tramos]
+    else:
+        # Cada hilo recibe una copia del contexto para leer de la misma base que la petición
+        pool = _obtener_pool()
+        futuros = [pool.submit(copy_context().run, _tramo_en_hilo, *tramo) for tramo in tramos]
+        resultados = [futuro.result() for futuro in futuros]
+
+    # Los meses no comparten días, así que los totales de cada grupo se suman
+    totales = {}
+    for filas in resultados:
+        for fila in filas:
+            grupo = tuple(fila[dimension] for dimension in dimensiones)
+            total = totales.get(grupo)
+            if total is None:
+                totales[grupo] = dict(fila, cantidad=fila['cantidad'] or 0)
+            else:
+                total['cantidad'] += fila['cantidad'] or 0
+                total['registros'] += fila['registros']
+                total['asistencias'] += fila['asistencias']
+    return [totales[grupo] for grupo in sorted(totales, key=lambda grupo: tuple(valor or '' for valor in grupo))]
@@ -0,0 +1,23 @@
+# api/serializers/__init__.py
+# Serializers separados por área; cada módulo se importa la primera vez que se usa uno de
+# sus nombres (`from api.serializers import X` sigue funcionando, ver api/arranque.py).
+from ..arranque import atributos_diferidos
+
+MODULOS = {
+    'usuarios': (
+        'CustomUserSerializer', 'CAMPOS_RESUMEN_USUARIO', 'TokenUsuarioObtainPairSerializer', 'TipoUsuarioSerializer',
+    ),
+    'maestros': (
+        'EmpresaSerializer', 'TipoEnvioSerializer', 'ResponsableSerializer', 'PlanillaSerializer',
+        'EmisorSerializer', 'EspecieSerializer', 'TurnoSerializer', 'ConsumidorSerializer',
+    ),
+    'asistencias': (
+        'ImportarAsistenciaDetalleSerializer', 'AsistenciaSerializer', 'ImportarAsistenciaSerializer',
+        'AsistenciaDetalleSerializer', 'CAMPOS_ASISTENCIA', 'CAMPOS_DETALLE', 'CAMPOS_DETALLE_CON_CABECERA',
+        'COLUMNAS_DETALLE', 'detalles_rapidos', 'asistencias_rapidas', 'asistencias_en_stream',
+        'json_en_stream', 'CAMPOS_INGRESO_TRABAJADOR', 'ingresos_trabajador_rapidos',
+    ),
+    'dia': ('RegistroSerializer', 'TareaSerializer'),
+}
+
+__getattr__, __all__ = atributos_diferidos(__name__, MODULOS)
@@ -0,0 +1,181 @@
+# api/serializers/asistencias.py
+# ImportarAsistenciaDetalleSerializer
+from rest_framework import serializers
+from ..models import ImportarAsistenciaDetalle
+
+class ImportarAsistenciaDetalleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportarAsistenciaDetalle
+        fields = '__all__'
+
+    def create(self, validated_data):
+        # Crear y devolver la instancia del modelo ImportarAsistenciaDetalle
+        return ImportarAsistenciaDetalle.objects.create(**validated_data)
+
+    def update(self, instance, validated_data):
+        # Actualizar y devolver la instancia del modelo ImportarAsistenciaDetalle
+        instance.idcodigogeneral = validated_data.get('idcodigogeneral', instance.idcodigogeneral)
+        instance.idactividad = validated_data.get('idactividad', instance.idactividad)
+        instance.idlabor = validated_data.get('idlabor', instance.idlabor)
+        instance.idconsumidor = validated_data.get('idconsumidor', instance.idconsumidor)
+        instance.cantidad = validated_data.get('cantidad', instance.cantidad)
+        instance.save()
+        return instance
+
+
+# ------------------------------------------------------------------------------------
+from rest_framework import serializers
+from ..models import ImportarAsistencia
+
+class AsistenciaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportarAsistencia
+        fields = '__all__'
+
+#---------------------------------------------------
+from rest_framework import serializers
+from ..models import ImportarAsistencia, ImportarAsistenciaDetalle
+from datetime import datetime
+
+class ImportarAsistenciaSerializer(serializers.ModelSerializer):
+    detalle = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportarAsistencia
+        fields = ['id', 'idempresa', 'tipo_envio', 'idresponsable', 'idplanilla', 'idemisor', 'idturno', 'fecha', 'idsucursal', 'idespecie', 'detalle']
+
+    def get_detalle(self, obj):
+        detalle_queryset = obj.detalle.all()
+        return AsistenciaDetalleSerializer(detalle_queryset, many=True).data
+
+    def create(self, validated_data):
+        # Obtener la fecha actual en formato YYYYMMdd
+        fecha_actual = datetime.now().strftime('%Y%m%d')
+        # Asignar la fecha actual al campo 'fecha' en los datos validados
+        validated_data['fecha'] = fecha_actual
+        
+        # Crear y devolver la instancia del modelo ImportarAsistencia
+        return ImportarAsistencia.objects.create(**validated_data)
+
+
+class AsistenciaDetalleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportarAsistenciaDetalle
+        fields = ['item', 'idcodigogeneral', 'idactividad', 'idlabor', 'idconsumidor', 'cantidad', 'importar_asistencia']
+
+
+#--------------------------------------------------------------------------------
+# Serialización rápida de solo lectura para los listados de asistencias.
+# Arma las filas directamente desde .values_list(), sin instanciar un ModelSerializer
+# por fila, con los mismos campos, orden y valores que ImportarAsistenciaSerializer
+# y AsistenciaDetalleSerializer (el JSON resultante es idéntico byte a byte).
+from collections import defaultdict
+
+from rest_framework.renderers import JSONRenderer
+
+from ..models import ImportarAsistenciaDetalleHistorico, ImportarAsistenciaHistorico
+
+CAMPOS_ASISTENCIA = tuple(campo for campo in ImportarAsistenciaSerializer.Meta.fields if campo != 'detalle')
+CAMPOS_DETALLE = ('item', 'idcodigogeneral', 'idactividad', 'idlabor', 'idconsumidor', 'cantidad')
+CAMPOS_DETALLE_CON_CABECERA = CAMPOS_DETALLE + ('importar_asistencia',)
+
+# Columnas a leer de la base de datos para cada conjunto de campos
+COLUMNAS_DETALLE = {
+    CAMPOS_DETALLE: CAMPOS_DETALLE,
+    CAMPOS_DETALLE_CON_CABECERA: CAMPOS_DETALLE + ('importar_asistencia_id',),
+}
+
+# Los históricos tienen clave propia y guardan aparte los ids originales, que son los que se muestran
+COLUMNAS_HISTORICO = {'id': 'id_original', 'importar_asistencia_id': 'importar_asistencia__id_original'}
+
+
+def _columnas(modelo, columnas):
+    if modelo in (ImportarAsistenciaHistorico, ImportarAsistenciaDetalleHistorico):
+        return tuple(COLUMNAS_HISTORICO.get(columna, columna) for columna in columnas)
+    return columnas
+
+
+def detalles_rapidos(detalles, campos=CAMPOS_DETALLE_CON_CABECERA):
+    # Agrupa por cabecera las filas de un queryset de detalles
+    agrupados = defaultdict(list)
+    for fila in detalles.order_by('item').values_list('importar_asistencia_id', *_columnas(detalles.model, COLUMNAS_DETALLE[campos])):
+        agrupados[fila[0]].append(dict(zip(campos, fila[1:])))
+    return agrupados
+
+
+def asistencias_rapidas(importar_asistencias, campos_detalle=CAMPOS_DETALLE_CON_CABECERA):
+    # Dos consultas en total: cabeceras y detalles (del modelo actual o del histórico)
+    modelo_detalle = importar_asistencias.model._meta.get_field('detalle').related_model
+    detalles = detalles_rapidos(
+        modelo_detalle.objects.filter(importar_asistencia__in=importar_asistencias.values('pk')),
+        campos_detalle
+    )
+
+    data = []
+    existing_ids = set()  # Un filtro por detalle puede repetir cabeceras
+    for fila in importar_asistencias.values_list('pk', *_columnas(importar_asistencias.model, CAMPOS_ASISTENCIA)):
+        if fila[0] not in existing_ids:
+            existing_ids.add(fila[0])
+            data.append(dict(zip(CAMPOS_ASISTENCIA, fila[1:]), detalle=detalles.get(fila[0], [])))
+    return data
+
+
+def asistencias_en_stream(importar_asistencias, campos_detalle=CAMPOS_DETALLE_CON_CABECERA, tamano_lote=2000):
+    # Las mismas filas que asistencias_rapidas, ordenadas por id, de a una: se leen páginas de
+    # tamano_lote cabeceras (id > la última vista) y los detalles de cada página en una consulta,
+    # así que la memoria no depende del tamaño del día. No se usa .iterator(): con MySQL el cursor
+    # del cliente trae igual todo el resultado a memoria.
+    # La base se fija aquí: el generador se recorre después de que la vista devolvió la respuesta,
+    # fuera del contexto de empresa y réplica de la petición
+    cabeceras = importar_asistencias.order_by('id')
+    cabeceras = cabeceras.using(cabeceras.db).values_list(*CAMPOS_ASISTENCIA)
+    modelo_detalle = cabeceras.model._meta.get_field('detalle').related_model
+    detalles = modelo_detalle.objects.using(cabeceras.db).order_by('importar_asistencia_id', 'item').values_list(
+        'importar_asistencia_id', *COLUMNAS_DETALLE[campos_detalle]
+    )
+
+    def filas():
+        ultimo = None
+        while True:
+            pagina = list((cabeceras if ultimo is None else cabeceras.filter(id__gt=ultimo))[:tamano_lote])
+            if not pagina:
+                return
+            por_cabecera = {}
+            for detalle in detalles.filter(importar_asistencia_id__in=sorted({fila[0] for fila in pagina})):
+                por_cabecera.setdefault(detalle[0], []).append(dict(zip(campos_detalle, detalle[1:])))
+            for fila in pagina:
+                if fila[0] == ultimo:
+                    continue  # Un filtro por detalle repite la cabecera en filas seguidas
+                ultimo = fila[0]
+                yield dict(zip(CAMPOS_ASISTENCIA, fila), detalle=por_cabecera.get(fila[0], []))
+            if len(pagina) < tamano_lote:
+                return
+
+    return filas()
+
+
+def json_en_stream(filas, tamano_parte=64 * 1024):
+    # Los mismos bytes que JSONRenderer().render(list(filas)), en partes de ~tamano_parte bytes
+    renderer = JSONRenderer()
+    parte = bytearray(b'[')
+    separador = b''
+    for fila in filas:
+        parte += separador + renderer.render(fila)
+        separador = b','
+        if len(parte) >= tamano_parte:
+            yield bytes(parte)
+            parte = bytearray()
+    parte += b']'
+    yield bytes(parte)
+
+
+# Detalles de un trabajador con la fecha de su cabecera, sin anidar
+CAMPOS_INGRESO_TRABAJADOR = CAMPOS_DETALLE_CON_CABECERA + ('fecha',)
+
+
+def ingresos_trabajador_rapidos(detalles):
+    columnas = _columnas(detalles.model, COLUMNAS_DETALLE[CAMPOS_DETALLE_CON_CABECERA]) + ('importar_asistencia__fecha',)
+    return [
+        dict(zip(CAMPOS_INGRESO_TRABAJADOR, fila))
+        for fila in detalles.order_by('importar_asistencia__fecha', 'item').values_list(*columnas)
+    ]
@@ -0,0 +1,17 @@
+# api/serializers/dia.py
+from rest_framework import serializers
+from ..models import Registro
+
+class RegistroSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Registro
+        fields = ['id', 'FechaAbierto', 'HoraAbierto', 'estado', 'FechaCerrado', 'HoraCerrado', 'idsucursal']
+
+
+from ..models import Tarea
+
+class TareaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tarea
+        fields = ['id', 'nombre', 'argumentos', 'estado', 'registro', 'intentos', 'max_intentos',
+                  'error', 'creado', 'ejecutar_desde', 'iniciado', 'terminado']
@@ -0,0 +1,90 @@
+# api/serializers/maestros.py
+from rest_framework import serializers
+from ..models import Empresa
+
+class EmpresaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Empresa
+        fields = ('idempresa', 'nombre')
+        read_only_fields = ('idempresa',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Empresa.objects.create(**validated_data)
+
+
+from rest_framework import serializers
+from ..models import TipoEnvio
+
+class TipoEnvioSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TipoEnvio
+        fields = '__all__'
+
+
+from ..models import Responsable
+class ResponsableSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Responsable
+        fields = ('idresponsable', 'nombre_apellido')
+        read_only_fields = ('idresponsable',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Responsable.objects.create(**validated_data)
+
+from rest_framework import serializers
+from ..models import Planilla
+
+class PlanillaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Planilla
+        fields = ['idplanilla', 'nombre']
+
+from rest_framework import serializers
+from ..models import Emisor
+
+class EmisorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Emisor
+        fields = ('idemisor', 'nombre')
+        read_only_fields = ('idemisor',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Emisor.objects.create(**validated_data)
+    
+
+    from rest_framework import serializers
+from ..models import Especie
+
+class EspecieSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Especie
+        fields = ('idespecie', 'nombre')
+        read_only_fields = ('idespecie',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Especie.objects.create(**validated_data)
+
+from ..models import Turno
+
+class TurnoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Turno
+        fields = ('idturno', 'nombre')
+        read_only_fields = ('idturno',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Turno.objects.create(**validated_data)
+
+
+
+    
+
+from ..models import Consumidor
+class ConsumidorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Consumidor
+        fields = ('idconsumidor', 'nombre_apellido')
+        read_only_fields = ('idconsumidor',)  # Esto hace que idempresa no sea requerido en la solicitud
+
+    def create(self, validated_data):
+        return Consumidor.objects.create(**validated_data)
@@ -0,0 +1,39 @@
+# api/serializers/usuarios.py
+from rest_framework import serializers
+from django.utils import timezone
+from ..models import CustomUser
+
+
+class CustomUserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ('dni', 'apel_nomb', 'tipo_usuarioapp', 'password')
+        extra_kwargs = {'password': {'write_only': True}}
+
+    def create(self, validated_data):
+        user = CustomUser.objects.create_user(**validated_data)
+        return user
+
+    def update(self, instance, validated_data):
+        instance.apel_nomb = validated_data.get('apel_nomb', instance.apel_nomb)
+        instance.tipo_usuarioapp = validated_data.get('tipo_usuarioapp', instance.tipo_usuarioapp)
+        instance.save()
+        return instance
+
+
+# Campos de lectura de CustomUserSerializer, para armar resúmenes con .values()
+CAMPOS_RESUMEN_USUARIO = ('dni', 'apel_nomb', 'tipo_usuarioapp')
+
+
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from ..authentication import TokenUsuario
+
+class TokenUsuarioObtainPairSerializer(TokenObtainPairSerializer):
+    # Usado por TokenObtainPairView (SIMPLE_JWT['TOKEN_OBTAIN_SERIALIZER'])
+    token_class = TokenUsuario
+
+
+from rest_framework import serializers
+
+class TipoUsuarioSerializer(serializers.Serializer):
+    tipo_usuarioapp = serializers.CharField()
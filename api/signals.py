@@ -0,0 +1,71 @@
+# api/signals.py
+# Invalidación de cachés ante escrituras en los modelos (conectado en ApiConfig.ready)
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .busqueda import INDICE_POR_MODELO
+from .cache import invalidar_ingresos_trabajador, invalidar_usuario
+from .catalogos import MODELOS_PAQUETE, invalidar_paquete
+from .dia import invalidar_dia_abierto
+from .models import CustomUser, ImportarAsistenciaDetalle, Registro
+from .ranking import ranking
+
+
+# Solo post_save: los detalles no se eliminan desde la API, y el archivo de días cerrados
+# (api/archivo.py) los mueve al histórico sin cambiar su contenido. Conectar post_delete
+# obligaría además a Django a cargar cada fila antes de borrarla al archivar.
+@receiver(post_save, sender=ImportarAsistenciaDetalle)
+def invalidar_cache_trabajador(sender, instance, **kwargs):
+    # Al confirmar la transacción, para no volver a guardar en caché datos sin confirmar
+    idcodigogeneral = instance.idcodigogeneral
+    transaction.on_commit(lambda: invalidar_ingresos_trabajador(idcodigogeneral))
+
+
+@receiver(post_save, sender=ImportarAsistenciaDetalle)
+def actualizar_ranking(sender, instance, **kwargs):
+    transaction.on_commit(lambda: ranking.detalle_guardado(instance))
+
+
+# Conectado antes que los demás receptores de Registro: el ranking y el paquete de catálogos
+# se vuelven a armar con el puntero ya invalidado. También se invalida en el momento, para
+# que el resto de la transacción que abre o cierra el día no lea el anterior.
+@receiver(post_save, sender=Registro)
+def invalidar_puntero_dia(sender, **kwargs):
+    invalidar_dia_abierto()
+    transaction.on_commit(invalidar_dia_abierto)
+
+
+# Al abrir o cerrar un día el ranking se vuelve a armar para el nuevo día abierto
+@receiver(post_save, sender=Registro)
+def reiniciar_ranking(sender, **kwargs):
+    transaction.on_commit(ranking.limpiar)
+
+
+# Cubre actualizar_usuario, eliminar_usuario y el update/destroy de CustomUserViewSet
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidar_cache_usuario(sender, instance, **kwargs):
+    dni = instance.dni
+    transaction.on_commit(lambda: invalidar_usuario(dni))
+
+
+def invalidar_cache_catalogos(sender, **kwargs):
+    transaction.on_commit(invalidar_paquete)
+
+
+for modelo in MODELOS_PAQUETE:
+    post_save.connect(invalidar_cache_catalogos, sender=modelo)
+    post_delete.connect(invalidar_cache_catalogos, sender=modelo)
+
+
+# Índices de búsqueda por nombre (api/busqueda.py)
+def actualizar_indice_busqueda(sender, instance, **kwargs):
+    indice = INDICE_POR_MODELO[sender]
+    id = getattr(instance, indice.campo_id)
+    nombre = None if kwargs['signal'] is post_delete else instance.nombre_apellido
+    transaction.on_commit(lambda: indice.actualizar(id, nombre))
+
+
+for modelo in INDICE_POR_MODELO:
+    post_save.connect(actualizar_indice_busqueda, sender=modelo)
+    post_delete.connect(actualizar_indice_busqueda, sender=modelo)
@@ -0,0 +1,32 @@
+# api/sucursales.py
+# Días de trabajo por sucursal (planta).
+# Una petición con la cabecera X-Sucursal trabaja con el día abierto de esa sucursal y solo ve
+# sus asistencias (el manager de los modelos de asistencia filtra por ella); sus cachés (día
+# abierto, ranking, paquete de catálogos, ingresos) son propias de la sucursal. Una sucursal
+# sin día propio usa el día general, el que se abre sin sucursal, que abarca a todas.
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_sucursal = ContextVar('sucursal', default=None)
+
+
+def sucursal_actual():
+    return _sucursal.get()
+
+
+@contextmanager
+def con_sucursal(idsucursal):
+    token = _sucursal.set(idsucursal or None)
+    try:
+        yield
+    finally:
+        _sucursal.reset(token)
+
+
+class SucursalMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with con_sucursal(request.headers.get('X-Sucursal')):
+            return self.get_response(request)
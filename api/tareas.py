@@ -0,0 +1,101 @@
+# api/tareas.py
+# Cola de tareas en segundo plano respaldada por la base de datos.
+# No necesita un broker externo: las tareas se guardan en la tabla Tarea y
+# el comando `python manage.py procesar_tareas` las ejecuta en varios procesos.
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Tarea
+
+logger = logging.getLogger(__name__)
+
+
+def encolar(nombre, registro=None, max_intentos=None, **argumentos):
+    # `nombre` es la ruta de la función a ejecutar, p. ej. 'api.tareas.mi_tarea'
+    return Tarea.objects.create(
+        nombre=nombre,
+        argumentos=argumentos,
+        registro=registro,
+        max_intentos=max_intentos or settings.TAREAS_MAX_INTENTOS,
+    )
+
+
+def encolar_cierre_dia(registro):
+    # Encolar las tareas configuradas para ejecutarse después de cerrar un día
+    return [
+        encolar(nombre, registro=registro, registro_id=registro.pk)
+        for nombre in settings.TAREAS_CIERRE_DIA
+    ]
+
+
+def reclamar_tarea():
+    ahora = timezone.now()
+    candidatas = Tarea.objects.filter(
+        estado='Pendiente',
+        ejecutar_desde__lte=ahora
+    ).order_by('ejecutar_desde', 'id').values_list('id', flat=True)[:10]
+
+    for tarea_id in candidatas:
+        # El UPDATE condicional garantiza que solo un proceso se quede con la tarea
+        reclamada = Tarea.objects.filter(pk=tarea_id, estado='Pendiente').update(
+            estado='En proceso',
+            iniciado=ahora,
+            intentos=F('intentos') + 1
+        )
+        if reclamada:
+            return Tarea.objects.get(pk=tarea_id)
+    return None
+
+
+def ejecutar_tarea(tarea):
+    try:
+        funcion = import_string(tarea.nombre)
+        funcion(**tarea.argumentos)
+    except Exception:
+        logger.exception('La tarea %s (%s) falló en el intento %s', tarea.pk, tarea.nombre, tarea.intentos)
+        tarea.error = traceback.format_exc()
+        if tarea.intentos < tarea.max_intentos:
+            # Reintentar más tarde, duplicando la espera en cada intento
+            espera = settings.TAREAS_ESPERA_REINTENTO * 2 ** (tarea.intentos - 1)
+            tarea.estado = 'Pendiente'
+            tarea.ejecutar_desde = timezone.now() + timedelta(seconds=espera)
+        else:
+            tarea.estado = 'Fallida'
+            tarea.terminado = timezone.now()
+    else:
+        tarea.estado = 'Completada'
+        tarea.error = None
+        tarea.terminado = timezone.now()
+
+    # Solo si sigue siendo nuestra: liberar_tareas_colgadas() pudo devolverla a 'Pendiente' (y otro
+    # proceso reclamarla, con un intento más) mientras se ejecutaba
+    actualizada = Tarea.objects.filter(pk=tarea.pk, estado='En proceso', intentos=tarea.intentos).update(
+        estado=tarea.estado, error=tarea.error, ejecutar_desde=tarea.ejecutar_desde, terminado=tarea.terminado
+    )
+    if not actualizada:
+        logger.warning('La tarea %s (%s) fue liberada durante el intento %s; se conserva su estado actual',
+                       tarea.pk, tarea.nombre, tarea.intentos)
+        tarea.refresh_from_db()
+    return tarea
+
+
+def liberar_tareas_colgadas():
+    # Tareas que quedaron 'En proceso' porque su proceso murió a mitad de la ejecución
+    limite = timezone.now() - timedelta(seconds=settings.TAREAS_TIEMPO_MAXIMO)
+    colgadas = Tarea.objects.filter(estado='En proceso', iniciado__lt=limite)
+    reintentables = colgadas.filter(intentos__lt=F('max_intentos')).update(
+        estado='Pendiente',
+        ejecutar_desde=timezone.now()
+    )
+    fallidas = colgadas.update(
+        estado='Fallida',
+        error='Tiempo máximo de ejecución excedido',
+        terminado=timezone.now()
+    )
+    return reintentables + fallidas
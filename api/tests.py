@@ -1,3 +1,1528 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.connection import ConnectionDoesNotExist
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from . import serializers, urls, views
+from .arranque import precargar
+from .aprovisionamiento import aprovisionar, leer_filas
+from .archivo import CantidadesSinGuardar, archivar_dia, asistencias_en_rango
+from .dia import dia_abierto, dias_abiertos
+from .busqueda import INDICES
+from .catalogos_lote import LoteCatalogo
+from .cantidades import cantidades
+from .ranking import ranking
+from .replicas import en_primaria, lectura_en_replica
+from .empresas import EmpresaRouter, con_empresa
+from .metricas import Metricas
+from .reportes import reporte_rango
+from .sucursales import con_sucursal
+from .tareas import ejecutar_tarea, encolar, liberar_tareas_colgadas, reclamar_tarea
+from . import login
+from .authentication import ClaimsJWTAuthentication, TokenUsuario, revocaciones, token_revocado
+from .models import (
+    CambioAsistencia, Consumidor, CustomUser, Emisor, Empresa, ImportarAsistencia, ImportarAsistenciaDetalle,
+    ImportarAsistenciaDetalleHistorico, ImportarAsistenciaHistorico, Planilla,
+    Registro, Responsable, Tarea, TipoEnvio, Turno,
+)
+from .serializers import (
+    CAMPOS_DETALLE, ImportarAsistenciaSerializer, asistencias_en_stream, asistencias_rapidas, json_en_stream,
+)
+
+# Cantidad de detalles del día sembrado en cada corrida; para incluir el caso grande:
+# API_TESTS_TAMANOS=10,1000,100000 python manage.py test api
+TAMANOS = [int(tamano) for tamano in os.environ.get('API_TESTS_TAMANOS', '10,1000').split(',')]
+
+HOY = date.today().strftime('%Y%m%d')
+AYER = (date.today() - timedelta(days=1)).strftime('%Y%m%d')
+ANTEAYER = (date.today() - timedelta(days=2)).strftime('%Y%m%d')
+
+
+class Caso:
+    # Petición a una ruta con su máximo de consultas SQL y su presupuesto de tiempo.
+    # El máximo de consultas no depende del tamaño: si crece con los datos hay un N+1.
+    def __init__(self, metodo, url, estado, max_consultas, ms_base, ms_por_mil=0, datos=None):
+        self.metodo = metodo
+        self.url = url
+        self.estado = estado
+        self.max_consultas = max_consultas
+        self.ms_base = ms_base
+        self.ms_por_mil = ms_por_mil
+        self.datos = datos
+
+    def presupuesto_ms(self, tamano):
+        return self.ms_base + self.ms_por_mil * tamano / 1000
+
+
+CASOS = {
+    r'^$': Caso('get', '/api/', 200, 0, 100),
+    r'^usuarios/$': Caso('get', '/api/usuarios/', 200, 2, 100),
+    r'^usuarios/(?P<pk>[^/.]+)/$': Caso('get', '/api/usuarios/{usuario}/', 200, 2, 100),
+    'token/': Caso('post', '/api/token/', 200, 3, 2000, datos={'dni': '00000001', 'password': 'clave'}),
+    'usuarios/': Caso('post', '/api/usuarios/', 201, 3, 2000,
+                      datos={'dni': '00000003', 'apel_nomb': 'Nuevo', 'tipo_usuarioapp': 'Proceso', 'password': 'clave'}),
+    'usuarios/lote/': Caso('post', '/api/usuarios/lote/', 403, 0, 100, datos={'usuarios': [
+        {'dni': '00000010', 'apel_nomb': 'Nuevo', 'tipo_usuarioapp': 'Proceso', 'password': 'clave'},
+    ]}),
+    'usuarios/eliminar/<str:dni>/': Caso('delete', '/api/usuarios/eliminar/00000002/', 204, 12, 200),
+    'usuarios/actualizar/<str:dni>/': Caso('put', '/api/usuarios/actualizar/00000002/', 200, 8, 200,
+                                           datos={'apel_nomb': 'Actualizado'}),
+    'usuarios/dni/lote/': Caso('post', '/api/usuarios/dni/lote/', 200, 1, 100,
+                               datos={'dnis': ['00000001', '00000002', '99999999']}),
+    'usuarios/dni/<str:dni>/': Caso('get', '/api/usuarios/dni/00000002/', 200, 2, 100),
+    'empresas/': Caso('get', '/api/empresas/', 200, 1, 100),
+    'tipoUsuarios/': Caso('get', '/api/tipoUsuarios/', 200, 1, 100),
+    'tiposenvio/': Caso('get', '/api/tiposenvio/', 200, 1, 100),
+    'responsables/': Caso('get', '/api/responsables/', 200, 1, 100),
+    'responsables/<str:pk>/': Caso('get', '/api/responsables/000001/', 200, 1, 100),
+    'planillas/': Caso('get', '/api/planillas/', 200, 1, 100),
+    'planillas/<str:id>/': Caso('put', '/api/planillas/001/', 200, 3, 100,
+                                datos={'idplanilla': '001', 'nombre': 'Planilla'}),
+    'emisor/': Caso('get', '/api/emisor/', 200, 1, 100),
+    'turno/': Caso('get', '/api/turno/', 200, 1, 100),
+    'consumidor/': Caso('get', '/api/consumidor/', 200, 1, 100),
+    'estado/': Caso('put', '/api/estado/', 200, 6, 200),
+    'registros/': Caso('get', '/api/registros/', 200, 1, 100),
+    'catalogos/': Caso('get', '/api/catalogos/', 200, 8, 200),
+    'catalogos/<str:catalogo>/lote/': Caso('post', '/api/catalogos/consumidor/lote/', 200, 8, 200, datos={
+        'crear': [{'nombre_apellido': 'Nuevo Consumidor'}],
+        'actualizar': [{'idconsumidor': '000001', 'nombre_apellido': 'Consumidor Cambiado'}],
+    }),
+    'buscar/<str:modelo>/': Caso('get', '/api/buscar/consumidor/?q=cons', 200, 1, 100),
+    'importar-asistencia/': Caso('post', '/api/importar-asistencia/', 201, 12, 300, datos={
+        'idempresa': '001', 'idsucursal': '001', 'idespecie': '001', 'idcodigogeneral': 'NUEVO001',
+        'detalle': [{'idcodigogeneral': 'NUEVO001', 'idlabor': 'L00001', 'cantidad': 1.0},
+                    {'idcodigogeneral': 'NUEVO001', 'idlabor': 'L00002', 'cantidad': 2.0}],
+    }),
+    'importar-asistencia-detalle/': Caso('get', '/api/importar-asistencia-detalle/', 200, 4, 200, 300),
+    'asistencia/<str:idcodigogeneral>/<str:idlabor>/': Caso('put', '/api/asistencia/00000001/L00001/', 200, 6, 200,
+                                                            datos={'cantidad': 9.5}),
+    'pota/importarasistencia/': Caso('get', '/api/pota/importarasistencia/', 200, 3, 200, 300),
+    'pota/importarasistencia/<str:idcodigogeneral>/': Caso('put', '/api/pota/importarasistencia/00000001/', 200, 6, 200,
+                                                           datos={'cantidad': 9.5}),
+    'ingresos-dia-actual/': Caso('get', '/api/ingresos-dia-actual/', 200, 3, 200, 300),
+    'ingresos-dia-actual/<str:idcodigogeneral>/': Caso('get', '/api/ingresos-dia-actual/00000001/', 200, 4, 200, 100),
+    'trabajadores/<str:idcodigogeneral>/ingresos/': Caso('get', '/api/trabajadores/00000001/ingresos/', 200, 2, 100),
+    'ranking/': Caso('get', '/api/ranking/?n=50', 200, 2, 100, 100),
+    'ranking/<str:idcodigogeneral>/': Caso('get', '/api/ranking/00000001/', 200, 2, 100, 100),
+    'importaciones-fechas/<str:fecha_abierto>/': Caso('get', f'/api/importaciones-fechas/{AYER}/', 200, 3, 200, 300),
+    'reportes/rango/': Caso('get', f'/api/reportes/rango/?desde={AYER}&hasta={HOY}&agrupar=fecha,idlabor',
+                            200, 5, 200, 100),
+    'tareas/': Caso('get', '/api/tareas/', 200, 2, 100),
+    'tareas/<int:pk>/': Caso('get', '/api/tareas/{tarea}/', 200, 2, 100),
+    'cambios/': Caso('get', '/api/cambios/?desde=0&limite=100', 200, 2, 100),
+    'metricas/': Caso('get', '/api/metricas/', 200, 0, 100),
+    # Solo administradores: el usuario de estas pruebas es Supervisor
+    'perfiles/': Caso('get', '/api/perfiles/', 403, 0, 100),
+    'perfiles/<str:perfil>/': Caso('get', '/api/perfiles/20240101-000000-000000-abcd/', 403, 0, 100),
+}
+
+
+def rutas_api(patrones, prefijo=''):
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from rutas_api(patron.url_patterns, prefijo + str(patron.pattern))
+        elif '(?P<format>' not in str(patron.pattern):
+            yield prefijo + str(patron.pattern)
+
+
+def sembrar_dia(fecha, detalles):
+    # Una cabecera por trabajador con dos labores cada una
+    ultimo = ImportarAsistencia.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    cabeceras = max(1, detalles // 2)
+    ImportarAsistencia.objects.bulk_create([
+        ImportarAsistencia(id=ultimo + i, idempresa='001', idsucursal='001', idespecie='001', fecha=fecha)
+        for i in range(1, cabeceras + 1)
+    ], batch_size=5000)
+    ImportarAsistenciaDetalle.objects.bulk_create([
+        ImportarAsistenciaDetalle(importar_asistencia_id=ultimo + i, idcodigogeneral=f'{i:08d}',
+                                  idlabor=f'L{labor:05d}', cantidad=float(i))
+        for i in range(1, cabeceras + 1) for labor in (1, 2)
+    ][:detalles], batch_size=5000)
+
+
+def leer(respuesta):
+    # Contenido completo, también de las respuestas en streaming (ingresos-dia-actual)
+    return b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+
+
+class RutasApiMixin:
+    tamano = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.supervisor = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave',
+                                                        tipo_usuarioapp='Supervisor')
+        CustomUser.objects.create_user('00000002', 'Trabajador', password='clave', tipo_usuarioapp='Proceso')
+        Empresa.objects.create(idempresa='001', nombre='Empresa')
+        TipoEnvio.objects.create(nombre='Asistencia')
+        Responsable.objects.create(idresponsable='000001', nombre_apellido='Responsable')
+        Planilla.objects.create(idplanilla='001', nombre='Planilla')
+        Emisor.objects.create(idemisor='001', nombre='Emisor')
+        Turno.objects.create(idturno='01', nombre='Turno')
+        Consumidor.objects.create(idconsumidor='000001', nombre_apellido='Consumidor')
+
+        Registro.objects.create(FechaAbierto=AYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                FechaCerrado=AYER, HoraCerrado='18:00:00')
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(AYER, cls.tamano)
+        sembrar_dia(HOY, cls.tamano)
+        cls.tarea = Tarea.objects.create(nombre='api.archivo.archivar_dia')
+
+    def setUp(self):
+        cache.clear()
+        for indice in INDICES.values():
+            indice.limpiar()
+        ranking.limpiar()
+        token = TokenUsuario.for_user(self.supervisor).access_token
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        # La lista de revocaciones se carga una vez por proceso; no debe contar en cada caso
+        self.client.get('/api/tipoUsuarios/')
+
+    def probar(self, caso):
+        url = caso.url.format(usuario=self.supervisor.pk, tarea=self.tarea.pk)
+        datos = json.dumps(caso.datos) if caso.datos is not None else None
+
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            respuesta = getattr(self.client, caso.metodo)(url, datos, content_type='application/json')
+            contenido = leer(respuesta)
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+
+        self.assertEqual(respuesta.status_code, caso.estado, contenido[:500])
+        self.assertLessEqual(
+            len(consultas), caso.max_consultas,
+            '\n'.join(consulta['sql'] for consulta in consultas.captured_queries)
+        )
+        self.assertLessEqual(duracion_ms, caso.presupuesto_ms(self.tamano))
+
+
+def _crear_prueba(caso):
+    return lambda self: self.probar(caso)
+
+
+for _tamano in TAMANOS:
+    _atributos = {'tamano': _tamano}
+    for _indice, (_ruta, _caso) in enumerate(CASOS.items()):
+        _nombre = re.sub(r'\W+', '_', _ruta.replace('(?P<pk>[^/.]+)', 'pk')).strip('_') or 'raiz'
+        _atributos[f'test_{_indice:02d}_{_caso.metodo}_{_nombre}'] = _crear_prueba(_caso)
+    # Login y reportes en el hilo de la petición: los hilos de los pools no ven la transacción de la prueba
+    globals()[f'RutasApi{_tamano}Tests'] = override_settings(LOGIN_MAX_HILOS=0, REPORTES_HILOS=0, METRICAS_REGISTRAR_LENTAS=False)(
+        type(f'RutasApi{_tamano}Tests', (RutasApiMixin, TestCase), _atributos)
+    )
+
+
+class CoberturaRutasTests(TestCase):
+    def test_todas_las_rutas_tienen_caso(self):
+        sin_caso = set(rutas_api(urls.urlpatterns)) - set(CASOS)
+        self.assertFalse(sin_caso, f'Rutas sin límite de consultas ni presupuesto: {sorted(sin_caso)}')
+
+
+class SerializacionRapidaTests(TestCase):
+    def test_mismo_json_que_los_model_serializer(self):
+        sembrar_dia(HOY, 20)
+        ImportarAsistenciaDetalle.objects.filter(item=3).update(cantidad=None, idconsumidor=None)
+        importar_asistencias = ImportarAsistencia.objects.all()
+        esperado = ImportarAsistenciaSerializer(importar_asistencias.prefetch_related('detalle'), many=True).data
+        self.assertEqual(JSONRenderer().render(asistencias_rapidas(importar_asistencias)), JSONRenderer().render(esperado))
+
+    def test_stream_con_los_mismos_bytes(self):
+        sembrar_dia(HOY, 20)
+        ImportarAsistenciaDetalle.objects.filter(item=3).update(cantidad=None, idconsumidor=None)
+        ImportarAsistencia.objects.create(idempresa='001', fecha=HOY)  # Sin detalles
+        # Todas y filtradas por detalle (que repite cabeceras), con lotes y partes pequeñas
+        for importar_asistencias in (ImportarAsistencia.objects.all(),
+                                     ImportarAsistencia.objects.filter(detalle__idlabor__in=['L00001', 'L00002'])):
+            esperado = JSONRenderer().render(asistencias_rapidas(importar_asistencias, CAMPOS_DETALLE))
+            partes = list(json_en_stream(asistencias_en_stream(importar_asistencias, CAMPOS_DETALLE, tamano_lote=3),
+                                         tamano_parte=256))
+            self.assertGreater(len(partes), 1)
+            self.assertEqual(b''.join(partes), esperado)
+        self.assertEqual(b''.join(json_en_stream(iter(()))), b'[]')
+
+    def test_stream_por_paginas(self):
+        sembrar_dia(HOY, 20)  # 10 cabeceras
+        with CaptureQueriesContext(connection) as consultas:
+            filas = asistencias_en_stream(ImportarAsistencia.objects.all(), CAMPOS_DETALLE, tamano_lote=3)
+            self.assertEqual(len(consultas), 0)
+            next(filas)
+            self.assertEqual(len(consultas), 2)  # Solo la primera página y sus detalles
+            self.assertEqual(len(list(filas)), 9)
+        # Páginas de 3, 3, 3 y 1 cabeceras, cada una con una consulta de detalles; ninguna lee todo
+        self.assertEqual(len(consultas), 8)
+        paginas = [consulta['sql'] for consulta in consultas if 'importarasistenciadetalle' not in consulta['sql']]
+        self.assertEqual(len(paginas), 4)
+        self.assertTrue(all('LIMIT 3' in sql for sql in paginas))
+
+    @override_settings(EMPRESA_BASES_DE_DATOS={'002': 'empresa_002'})
+    def test_stream_conserva_la_base_de_la_peticion(self):
+        # El generador se recorre fuera del contexto de la empresa y sigue leyendo de su base
+        with con_empresa('002'):
+            filas = asistencias_en_stream(ImportarAsistencia.objects.all())
+        with self.assertRaises(ConnectionDoesNotExist):
+            next(filas)
+
+
+@override_settings(INGRESOS_TRABAJADOR_CACHE_TTL=60)
+class IngresosTrabajadorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(AYER, 10)
+        sembrar_dia(HOY, 10)
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        self.client.get('/api/tipoUsuarios/')
+
+    def test_solo_los_detalles_del_trabajador(self):
+        respuesta = self.client.get('/api/trabajadores/00000001/ingresos/')
+        self.assertEqual([(fila['idlabor'], fila['fecha']) for fila in respuesta.json()],
+                         [('L00001', HOY), ('L00002', HOY)])
+
+        respuesta = self.client.get(f'/api/trabajadores/00000001/ingresos/?desde={AYER}&hasta={HOY}')
+        self.assertEqual([fila['fecha'] for fila in respuesta.json()], [AYER, AYER, HOY, HOY])
+
+    def test_invalida_la_cache_al_guardar(self):
+        url = '/api/trabajadores/00000001/ingresos/'
+        self.client.get(url)
+        with self.assertNumQueries(0):  # El día abierto y los ingresos, desde la caché
+            self.client.get(url)
+
+        detalle = ImportarAsistenciaDetalle.objects.filter(idcodigogeneral='00000001', importar_asistencia__fecha=HOY).first()
+        detalle.cantidad = 99.0
+        with self.captureOnCommitCallbacks(execute=True):
+            detalle.save()
+        self.assertIn(99.0, [fila['cantidad'] for fila in self.client.get(url).json()])
+
+    def test_rango_invalido(self):
+        self.assertEqual(self.client.get('/api/trabajadores/00000001/ingresos/?hasta=20240101').status_code, 400)
+        self.assertEqual(self.client.get('/api/trabajadores/00000001/ingresos/?desde=2024').status_code, 400)
+
+
+class DirectorioUsuariosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        CustomUser.objects.bulk_create([
+            CustomUser(dni=f'{40000000 + i}', apel_nomb=f'Trabajador {i:03d}', tipo_usuarioapp='Proceso')
+            for i in range(120)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        self.client.get('/api/tipoUsuarios/')
+
+    def test_listado_paginado_y_busqueda_por_prefijo(self):
+        pagina = self.client.get('/api/usuarios/').json()
+        self.assertEqual(pagina['count'], 121)
+        self.assertEqual(len(pagina['results']), 50)
+        self.assertEqual(pagina['results'][0]['dni'], '00000001')
+
+        self.assertEqual(self.client.get('/api/usuarios/?buscar=trabajador 11').json()['count'], 10)
+        self.assertEqual(self.client.get('/api/usuarios/?buscar=4000002').json()['count'], 10)
+
+    def test_lote_usa_la_cache_y_se_invalida_al_actualizar(self):
+        datos = json.dumps({'dnis': ['40000001', '00000000', '40000001']})
+        respuesta = self.client.post('/api/usuarios/dni/lote/', datos, content_type='application/json').json()
+        self.assertEqual(respuesta['usuarios'], [{'dni': '40000001', 'apel_nomb': 'Trabajador 001', 'tipo_usuarioapp': 'Proceso'}])
+        self.assertEqual(respuesta['no_encontrados'], ['00000000'])
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/usuarios/dni/40000001/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put('/api/usuarios/actualizar/40000001/', json.dumps({'apel_nomb': 'Renombrado'}),
+                            content_type='application/json')
+        self.assertEqual(self.client.get('/api/usuarios/dni/40000001/').json()['apel_nomb'], 'Renombrado')
+
+
+@override_settings(LOGIN_PBKDF2_ITERACIONES=1000)
+class AprovisionamientoTests(TestCase):
+    def test_crea_validos_e_informa_errores_por_fila(self):
+        CustomUser.objects.create_user('40000000', 'Existente', password='clave', tipo_usuarioapp='Proceso')
+        filas = [
+            {'dni': f'{40000000 + i}', 'apel_nomb': f'Trabajador {i}', 'tipo_usuarioapp': 'Proceso', 'password': f'clave{i}'}
+            for i in range(20)
+        ]
+        filas += [
+            {'dni': '40000001', 'apel_nomb': 'Repetido', 'tipo_usuarioapp': 'Proceso', 'password': 'clave'},
+            {'dni': '50000000', 'apel_nomb': '', 'tipo_usuarioapp': 'Jefe', 'password': 'clave'},
+        ]
+
+        resultado = aprovisionar(filas, procesos=2)
+
+        self.assertEqual(resultado['creados'], 19)
+        self.assertEqual([(error['fila'], sorted(error['errores'])) for error in resultado['errores']],
+                         [(1, ['dni']), (21, ['dni']), (22, ['apel_nomb', 'tipo_usuarioapp'])])
+        self.assertTrue(authenticate(dni='40000007', password='clave7'))
+
+    @mock.patch('api.aprovisionamiento.ProcessPoolExecutor')
+    def test_endpoint_hashea_en_el_mismo_proceso(self, pool):
+        usuario = CustomUser.objects.create_user('00000009', 'Admin', password='clave', tipo_usuarioapp='Administrador')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        filas = [{'dni': f'{40000000 + i}', 'apel_nomb': f'Trabajador {i}', 'tipo_usuarioapp': 'Proceso',
+                  'password': f'clave{i}'} for i in range(3)]
+        respuesta = self.client.post('/api/usuarios/lote/', {'usuarios': filas}, content_type='application/json')
+        self.assertEqual(respuesta.json()['creados'], 3)
+        pool.assert_not_called()
+
+    def test_endpoint_solo_para_administradores(self):
+        usuario = CustomUser.objects.create_user('00000009', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        fila = {'dni': '40000000', 'apel_nomb': 'Trabajador', 'tipo_usuarioapp': 'Proceso', 'password': 'clave'}
+        respuesta = self.client.post('/api/usuarios/lote/', {'usuarios': [fila]}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertFalse(CustomUser.objects.filter(dni='40000000').exists())
+
+    @override_settings(APROVISIONAR_MAX_FILAS=2)
+    def test_endpoint_limita_filas(self):
+        usuario = CustomUser.objects.create_user('00000009', 'Admin', password='clave', tipo_usuarioapp='Administrador')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        filas = [{'dni': f'{40000000 + i}', 'apel_nomb': f'Trabajador {i}', 'tipo_usuarioapp': 'Proceso',
+                  'password': 'clave'} for i in range(3)]
+        respuesta = self.client.post('/api/usuarios/lote/', {'usuarios': filas}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertFalse(CustomUser.objects.filter(dni__startswith='4000000').exists())
+
+    def test_lee_csv(self):
+        filas = leer_filas('\ufeffdni,apel_nomb,tipo_usuarioapp,password\n40000001,Trabajador,Proceso,clave\n')
+        self.assertEqual(filas, [{'dni': '40000001', 'apel_nomb': 'Trabajador', 'tipo_usuarioapp': 'Proceso', 'password': 'clave'}])
+
+
+class CatalogosTests(TestCase):
+    def test_paquete_con_etag_gzip_e_invalidacion(self):
+        cache.clear()
+        Empresa.objects.create(idempresa='001', nombre='Empresa')
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+
+        respuesta = self.client.get('/api/catalogos/')
+        paquete = respuesta.json()
+        self.assertEqual(paquete['empresas'], [{'idempresa': '001', 'nombre': 'Empresa'}])
+        self.assertEqual(paquete['dia_abierto']['FechaAbierto'], HOY)
+        self.assertEqual(respuesta['ETag'], f'W/"{paquete["version"]}"')
+
+        with self.assertNumQueries(0):
+            comprimida = self.client.get('/api/catalogos/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(comprimida['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(comprimida.content)), paquete)
+        self.assertEqual(self.client.get('/api/catalogos/', HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Empresa.objects.create(idempresa='002', nombre='Otra')
+        nueva = self.client.get('/api/catalogos/', HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(nueva.status_code, 200)
+        self.assertEqual(len(nueva.json()['empresas']), 2)
+
+
+@override_settings(BUSQUEDA_TTL_RECONSTRUCCION=3600)
+class BusquedaNombresTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Consumidor.objects.bulk_create([
+            Consumidor(idconsumidor='000001', nombre_apellido='Núñez Quispe José'),
+            Consumidor(idconsumidor='000002', nombre_apellido='Nuñez Ramírez Ana'),
+            Consumidor(idconsumidor='000003', nombre_apellido='Quispe Mamani Raúl'),
+            Consumidor(idconsumidor='000004', nombre_apellido='Ramírez Torres Inés'),
+        ])
+
+    def setUp(self):
+        INDICES['consumidor'].limpiar()
+
+    def buscar(self, texto, k=10):
+        respuesta = self.client.get('/api/buscar/consumidor/', {'q': texto, 'k': k})
+        return [fila['idconsumidor'] for fila in respuesta.json()]
+
+    def test_prefijo_sin_tildes_y_varias_palabras(self):
+        self.assertEqual(self.buscar('nunez'), ['000001', '000002'])
+        self.assertEqual(self.buscar('QUIS'), ['000001', '000003'])
+        self.assertEqual(self.buscar('ram nu'), ['000002'])
+        self.assertEqual(self.buscar('quispe', k=1), ['000001'])
+
+    def test_similitud_por_trigramas(self):
+        self.assertEqual(self.buscar('ramires'), ['000002', '000004'])
+
+    def test_actualiza_el_indice_al_guardar_y_eliminar(self):
+        self.buscar('a')
+        with self.captureOnCommitCallbacks(execute=True):
+            Consumidor.objects.create(idconsumidor='000005', nombre_apellido='Zúñiga Paucar Lucía')
+            Consumidor.objects.get(pk='000003').delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buscar('zuniga'), ['000005'])
+            self.assertEqual(self.buscar('mamani'), [])
+
+    def test_modelo_desconocido(self):
+        self.assertEqual(self.client.get('/api/buscar/empresa/?q=a').status_code, 404)
+
+
+@override_settings(RANKING_TTL_RECONSTRUCCION=3600)
+class RankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(AYER, 10)
+        sembrar_dia(HOY, 10)  # Trabajador i con cantidad i en las labores L00001 y L00002
+
+    def setUp(self):
+        ranking.limpiar()
+
+    def test_top_y_posicion_incrementales(self):
+        fecha, top = ranking.top(3, idlabor='L00001')
+        self.assertEqual(fecha, HOY)
+        self.assertEqual([(fila['idcodigogeneral'], fila['total']) for fila in top],
+                         [('00000005', 5.0), ('00000004', 4.0), ('00000003', 3.0)])
+
+        detalle = ImportarAsistenciaDetalle.objects.get(
+            idcodigogeneral='00000001', idlabor='L00001', importar_asistencia__fecha=HOY)
+        detalle.cantidad = 10.5
+        with self.assertNumQueries(2), self.captureOnCommitCallbacks(execute=True):
+            detalle.save()  # UPDATE y su CambioAsistencia
+        with self.assertNumQueries(0):
+            _, filas = ranking.trabajador('00000001')
+        self.assertEqual([(fila['idlabor'], fila['posicion'], fila['total']) for fila in filas],
+                         [('L00001', 1, 10.5), ('L00002', 10, 1.0)])
+
+    def test_detalles_nuevos_y_cambio_de_dia(self):
+        ranking.top(1)
+        cabecera = ImportarAsistencia.objects.create(idespecie='002', fecha=HOY)
+        with self.captureOnCommitCallbacks(execute=True):
+            ImportarAsistenciaDetalle.objects.create(importar_asistencia=cabecera, idcodigogeneral='00000099',
+                                                     idlabor='L00001', cantidad=50)
+        self.assertEqual(ranking.top(1)[1][0]['idcodigogeneral'], '00000099')
+        self.assertEqual(ranking.top(5, idespecie='002')[1][0]['idespecie'], '002')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Registro.objects.filter(estado='Abierto').get().save()
+        with self.assertNumQueries(2):
+            ranking.top(1)
+
+    @override_settings(RANKING_TTL_RECONSTRUCCION=0)
+    @mock.patch('api.ranking.threading.Thread')
+    def test_reconstruye_en_segundo_plano(self, hilo):
+        ranking.top(1)
+        # Lo guarda otro proceso: este solo lo ve al reconstruir
+        ImportarAsistenciaDetalle.objects.filter(idcodigogeneral='00000001', importar_asistencia__fecha=HOY,
+                                                 idlabor='L00001').update(cantidad=30)
+        with self.assertNumQueries(0):
+            self.assertEqual(ranking.top(1)[1][0]['idcodigogeneral'], '00000005')  # Los totales anteriores
+            ranking.top(1)  # Una sola reconstrucción a la vez
+        hilo.assert_called_once()
+
+        # Guardado en este proceso mientras se reconstruye: se aplica a los totales nuevos
+        detalle = ImportarAsistenciaDetalle.objects.get(idcodigogeneral='00000002', idlabor='L00001',
+                                                         importar_asistencia__fecha=HOY)
+        detalle.cantidad = 40
+        with self.captureOnCommitCallbacks(execute=True):
+            detalle.save()
+        self.assertEqual(ranking.top(1)[1][0]['idcodigogeneral'], '00000002')
+
+        _, kwargs = hilo.call_args
+        kwargs['target'](*kwargs['args'])
+        self.assertEqual([fila['idcodigogeneral'] for fila in ranking.top(2)[1]], ['00000002', '00000001'])
+        self.assertEqual(hilo.call_count, 2)  # Vencido otra vez (TTL 0)
+
+
+@override_settings(REPORTES_HILOS=0)
+class ReporteRangoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar_dia('20240131', 4)  # Trabajadores 1 y 2, dos labores cada uno
+        sembrar_dia('20240201', 2)  # Trabajador 1
+        registro = Registro.objects.create(FechaAbierto='20240131', HoraAbierto='06:00:00', estado='Cerrado',
+                                           FechaCerrado='20240131', HoraCerrado='18:00:00')
+        archivar_dia(registro.pk)
+        Registro.objects.create(FechaAbierto='20240201', HoraAbierto='06:00:00', estado='Abierto')
+
+    def setUp(self):
+        cache.clear()
+
+    def reporte(self, agrupar):
+        return self.client.get('/api/reportes/rango/', {'desde': '20240101', 'hasta': '20240229', 'agrupar': agrupar})
+
+    def test_agrupa_meses_actuales_e_historicos(self):
+        filas = self.reporte('idcodigogeneral').json()['filas']
+        self.assertEqual(filas, [
+            {'idcodigogeneral': '00000001', 'cantidad': 4.0, 'registros': 4, 'asistencias': 2},
+            {'idcodigogeneral': '00000002', 'cantidad': 4.0, 'registros': 2, 'asistencias': 1},
+        ])
+        self.assertEqual(self.reporte('').json()['filas'], [{'cantidad': 8.0, 'registros': 6, 'asistencias': 3}])
+
+    def test_cachea_solo_los_meses_cerrados(self):
+        self.reporte('fecha,idlabor')
+        # Día abierto y enero desde la caché: febrero, con el día abierto, se vuelve a agregar
+        with self.assertNumQueries(2):
+            filas = self.reporte('fecha,idlabor').json()['filas']
+        self.assertEqual([(fila['fecha'], fila['idlabor']) for fila in filas],
+                         [('20240131', 'L00001'), ('20240131', 'L00002'), ('20240201', 'L00001'), ('20240201', 'L00002')])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.reporte('idlabor,idlabor').status_code, 400)
+        self.assertEqual(self.reporte('password').status_code, 400)
+        self.assertEqual(self.client.get('/api/reportes/rango/?desde=20240101&hasta=20250201').status_code, 400)
+
+
+class CantidadesDiferidasTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directorio = tempfile.mkdtemp()
+        cls.configuracion = override_settings(CANTIDADES_DIFERIDAS=True, CANTIDADES_INTERVALO_MS=0,
+                                              CANTIDADES_DIRECTORIO=cls.directorio)
+        cls.configuracion.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.configuracion.disable()
+        shutil.rmtree(cls.directorio)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(HOY, 4)
+
+    def setUp(self):
+        cache.clear()
+        ranking.limpiar()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        self.detalle = ImportarAsistenciaDetalle.objects.get(idcodigogeneral='00000001', idlabor='L00002')
+
+    def tearDown(self):
+        cantidades.vaciar()
+
+    def cantidad_guardada(self):
+        return ImportarAsistenciaDetalle.objects.get(pk=self.detalle.pk).cantidad
+
+    def test_responde_sin_escribir_y_las_lecturas_ven_el_cambio(self):
+        self.client.get('/api/tipoUsuarios/')
+        with self.assertNumQueries(2):  # Registro abierto y detalle; ninguna escritura
+            respuesta = self.client.put('/api/asistencia/00000001/L00002/', {'cantidad': 7.5}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 202)
+        self.assertEqual(respuesta.json()['item'], self.detalle.pk)
+        self.client.put('/api/asistencia/00000001/L00002/', {'cantidad': '8.25'}, content_type='application/json')
+        self.assertEqual(self.cantidad_guardada(), 1.0)
+
+        detalles = json.loads(leer(self.client.get('/api/ingresos-dia-actual/00000001/')))[0]['detalle']
+        self.assertEqual([detalle['cantidad'] for detalle in detalles], [1.0, 8.25])
+        filas = self.client.get('/api/trabajadores/00000001/ingresos/').json()
+        self.assertEqual([fila['cantidad'] for fila in filas], [1.0, 8.25])
+
+        # Los dos cambios se combinan en una sola escritura, que invalida caché y ranking
+        ranking.top(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(cantidades.vaciar(), 1)
+        self.assertEqual(self.cantidad_guardada(), 8.25)
+        self.assertEqual(CambioAsistencia.objects.get().datos, {'item': self.detalle.pk, 'cantidad': 8.25})
+        self.assertEqual(ranking.trabajador('00000001', idlabor='L00002')[1][0]['total'], 8.25)
+        self.assertEqual(os.listdir(self.directorio), [os.path.basename(cantidades._log.name)])
+
+    def test_cantidad_invalida_o_detalle_inexistente(self):
+        respuesta = self.client.put('/api/pota/importarasistencia/00000001/', {'cantidad': 'mucho'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        respuesta = self.client.put('/api/pota/importarasistencia/00000099/', {'cantidad': 1}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_recupera_logs_de_procesos_terminados(self):
+        # Log de un proceso que terminó sin vaciarlo, con la última línea cortada
+        with open(os.path.join(self.directorio, '99999-000001.log'), 'w', encoding='utf-8') as log:
+            for cantidad in (3.0, 4.0):
+                log.write(json.dumps({'item': self.detalle.pk, 'importar_asistencia_id': self.detalle.importar_asistencia_id,
+                                      'idcodigogeneral': '00000001', 'idlabor': 'L00002', 'cantidad': cantidad}) + '\n')
+            log.write('{"item": ')
+        self.assertEqual(cantidades.recuperar(), 1)
+        self.assertEqual(self.cantidad_guardada(), 4.0)
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, '99999-000001.log')))
+
+    @mock.patch('api.cantidades.close_old_connections')
+    def test_ciclo_fallido_se_registra_y_reintenta(self, _cerrar):
+        metricas = Metricas()
+        cantidades.registrar({'item': self.detalle.pk, 'importar_asistencia_id': self.detalle.importar_asistencia_id,
+                              'idcodigogeneral': '00000001', 'idlabor': 'L00002'}, 6)
+        with mock.patch('api.cantidades.metricas', metricas), \
+                mock.patch('api.cantidades._guardar', side_effect=OperationalError('sin conexión')), \
+                self.assertLogs('api.cantidades', 'ERROR'):
+            cantidades._ejecutar_ciclo()
+        self.assertIn('api_cantidades_fallos_total 1', metricas.exportar())
+        self.assertEqual(self.cantidad_guardada(), 1.0)
+
+        # El siguiente ciclo guarda lo que quedó pendiente
+        cantidades._ejecutar_ciclo()
+        self.assertEqual(self.cantidad_guardada(), 6.0)
+
+    def escribir_log(self, nombre, *lineas):
+        with open(os.path.join(self.directorio, nombre), 'w', encoding='utf-8') as log:
+            for cantidad, marca in lineas:
+                log.write(json.dumps({'item': self.detalle.pk, 'importar_asistencia_id': self.detalle.importar_asistencia_id,
+                                      'idcodigogeneral': '00000001', 'idlabor': 'L00002', 'cantidad': cantidad,
+                                      'marca': marca}) + '\n')
+
+    def test_recuperar_no_pisa_valores_mas_nuevos(self):
+        # De dos logs de procesos terminados gana la marca más nueva, no el orden de los archivos
+        ahora = time.time_ns()
+        self.escribir_log('99998-000001.log', (6.0, ahora - 10 ** 9))
+        self.escribir_log('99997-000001.log', (5.0, ahora - 3 * 10 ** 9))
+        self.assertEqual(cantidades.recuperar(), 1)
+        self.assertEqual(self.cantidad_guardada(), 6.0)
+
+        # Un cambio guardado después de la marca (otro proceso o un PUT sin diferir) se conserva
+        self.escribir_log('99996-000001.log', (7.0, ahora - 2 * 10 ** 9))
+        self.assertEqual(cantidades.recuperar(), 1)
+        self.assertEqual(self.cantidad_guardada(), 6.0)
+        self.assertFalse([nombre for nombre in os.listdir(self.directorio) if nombre.startswith('9999')])
+
+    def test_detalles_archivados_o_inexistentes(self):
+        registro = Registro.objects.create(FechaAbierto=AYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                           FechaCerrado=AYER, HoraCerrado='18:00:00')
+        sembrar_dia(AYER, 2)
+        ayer = ImportarAsistenciaDetalle.objects.get(importar_asistencia__fecha=AYER, idlabor='L00002')
+        cantidades.registrar({'item': ayer.pk, 'importar_asistencia_id': ayer.importar_asistencia_id,
+                              'idcodigogeneral': ayer.idcodigogeneral, 'idlabor': 'L00002'}, 9)
+
+        # No se archiva un día con cantidades aún en el log
+        with self.assertRaises(CantidadesSinGuardar):
+            archivar_dia(registro.pk)
+        self.assertTrue(ImportarAsistenciaDetalle.objects.filter(pk=ayer.pk).exists())
+
+        # Si se archivó de todas formas, la cantidad va al histórico; la de un detalle que ya no existe se descarta
+        with mock.patch.object(cantidades, 'cabeceras_pendientes', return_value=set()):
+            self.assertEqual(archivar_dia(registro.pk), 1)
+        cantidades.registrar({'item': 999999, 'importar_asistencia_id': 999999,
+                              'idcodigogeneral': '00000001', 'idlabor': 'L00002'}, 3)
+        with self.assertLogs('api.cantidades', 'ERROR'):
+            self.assertEqual(cantidades.vaciar(), 2)
+        self.assertEqual(ImportarAsistenciaDetalleHistorico.objects.get(item=ayer.pk).cantidad, 9.0)
+        self.assertEqual(list(CambioAsistencia.objects.values_list('objeto_id', flat=True)), [ayer.pk])
+
+
+@override_settings(DATABASE_REPLICA='replica_ausente')
+class ReplicasTests(TestCase):
+    # 'replica_ausente' no está en DATABASES: cualquier lectura enviada a la réplica falla con ConnectionDoesNotExist
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Registro.objects.create(FechaAbierto=AYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                FechaCerrado=AYER, HoraCerrado='18:00:00')
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(AYER, 2)
+        sembrar_dia(HOY, 2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+
+    def test_router(self):
+        @lectura_en_replica
+        def vista():
+            with en_primaria():
+                primaria = router.db_for_read(Registro)
+            return router.db_for_read(Registro), primaria, router.db_for_write(Registro)
+
+        self.assertEqual(vista(), ('replica_ausente', 'default', 'default'))
+        self.assertEqual(router.db_for_read(Registro), 'default')
+
+    def test_dia_abierto_en_la_base_principal(self):
+        respuesta = self.client.get(f'/api/importaciones-fechas/{HOY}/')
+        self.assertEqual(respuesta.status_code, 200)
+
+        respuesta = self.client.get(f'/api/importaciones-fechas/{AYER}/')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('replica_ausente', respuesta.json()['error'])
+
+    @override_settings(REPORTES_HILOS=2)
+    def test_los_hilos_del_reporte_usan_la_replica(self):
+        # Dos meses cerrados, agregados en el pool con el contexto de la petición
+        with self.assertRaises(ConnectionDoesNotExist):
+            lectura_en_replica(reporte_rango)(date(2024, 1, 1), date(2024, 2, 29), ['idlabor'])
+
+
+@skipUnless('replica' in connections, "Sin el alias 'replica': usar --settings=backend.settings_benchmark")
+@override_settings(DATABASE_REPLICA='replica')
+class ReplicaEspejoTests(TransactionTestCase):
+    # 'replica' es un espejo de 'default' con su propia conexión: las lecturas son reales, y se
+    # cuentan por separado. TransactionTestCase porque la réplica solo ve datos confirmados
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        Registro.objects.create(FechaAbierto=AYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                FechaCerrado=AYER, HoraCerrado='18:00:00')
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(AYER, 4)
+        sembrar_dia(HOY, 2)
+
+    def test_dia_cerrado_desde_la_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica, CaptureQueriesContext(connection) as primaria:
+            respuesta = self.client.get(f'/api/importaciones-fechas/{AYER}/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(sum(len(fila['detalle']) for fila in respuesta.json()), 4)
+        self.assertTrue(any('importarasistencia' in consulta['sql'] for consulta in replica))
+        # Solo el Registro se lee de la base principal
+        self.assertFalse(any('importarasistencia' in consulta['sql'] for consulta in primaria))
+
+    def test_dia_abierto_desde_la_base_principal(self):
+        with CaptureQueriesContext(connections['replica']) as replica, CaptureQueriesContext(connection) as primaria:
+            respuesta = self.client.get(f'/api/importaciones-fechas/{HOY}/')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse(any('importarasistencia' in consulta['sql'] for consulta in replica))
+        self.assertTrue(any('importarasistencia' in consulta['sql'] for consulta in primaria))
+
+    def test_meses_cerrados_del_reporte_en_la_replica(self):
+        sembrar_dia('20240115', 2)
+        with CaptureQueriesContext(connections['replica']) as replica:
+            filas = lectura_en_replica(reporte_rango)(date(2024, 1, 1), date(2024, 1, 31), ['fecha'])
+        self.assertEqual([(fila['fecha'], fila['cantidad']) for fila in filas], [('20240115', 2.0)])
+        self.assertTrue(any('importarasistencia' in consulta['sql'] for consulta in replica))
+
+
+class EmpresasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        sembrar_dia(HOY, 4)  # Empresa 001
+        cabecera = ImportarAsistencia.objects.create(idempresa='002', fecha=HOY)
+        ImportarAsistenciaDetalle.objects.create(importar_asistencia=cabecera, idcodigogeneral='00000099', idlabor='L00001')
+
+    def setUp(self):
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+
+    def test_la_cabecera_filtra_por_empresa(self):
+        todas = json.loads(leer(self.client.get('/api/ingresos-dia-actual/')))
+        self.assertEqual(len(todas), 3)
+        solo_002 = json.loads(leer(self.client.get('/api/ingresos-dia-actual/', HTTP_X_EMPRESA='002')))
+        self.assertEqual([(fila['idempresa'], fila['detalle'][0]['idcodigogeneral']) for fila in solo_002],
+                         [('002', '00000099')])
+        self.assertEqual(self.client.get('/api/ingresos-dia-actual/00000001/', HTTP_X_EMPRESA='002').status_code, 404)
+
+    @override_settings(EMPRESA_BASES_DE_DATOS={'002': 'empresa_002'})
+    def test_router_por_empresa(self):
+        rutas = EmpresaRouter()
+        cabecera = ImportarAsistencia(idempresa='002')
+        self.assertEqual(rutas.db_for_write(ImportarAsistencia, instance=cabecera), 'empresa_002')
+        self.assertEqual(rutas.db_for_write(ImportarAsistenciaDetalle,
+                                            instance=ImportarAsistenciaDetalle(importar_asistencia=cabecera)), 'empresa_002')
+        self.assertIsNone(rutas.db_for_write(ImportarAsistencia, instance=ImportarAsistencia(idempresa='001')))
+        with con_empresa('002'):
+            self.assertEqual(rutas.db_for_read(ImportarAsistenciaDetalle), 'empresa_002')
+            self.assertIsNone(rutas.db_for_read(Registro))
+        self.assertTrue(rutas.allow_migrate('empresa_002', 'api', 'importarasistenciahistorico'))
+        self.assertFalse(rutas.allow_migrate('empresa_002', 'api', 'registro'))
+        self.assertIsNone(rutas.allow_migrate('default', 'api', 'registro'))
+
+        # 'empresa_002' no está en DATABASES: la importación falla al intentar escribir en esa base
+        respuesta = self.client.post('/api/importar-asistencia/', {'idempresa': '002', 'detalle': []},
+                                     content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('empresa_002', respuesta.json()['error'])
+
+
+class CatalogosLoteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Consumidor.objects.create(idconsumidor='000007', nombre_apellido='Consumidor Siete')
+        Planilla.objects.create(idplanilla='001', nombre='Planilla')
+
+    def setUp(self):
+        cache.clear()
+        INDICES['consumidor'].limpiar()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        self.client.get('/api/tipoUsuarios/')
+
+    def lote(self, catalogo, **operaciones):
+        return self.client.post(f'/api/catalogos/{catalogo}/lote/', operaciones, content_type='application/json')
+
+    def test_crea_actualiza_y_elimina_en_pocas_consultas(self):
+        INDICES['consumidor'].buscar('siete')
+        crear = [{'nombre_apellido': f'Consumidor {i}'} for i in range(50)]
+        # Filas a actualizar, último código, un INSERT y un UPDATE (más el savepoint)
+        with self.assertNumQueries(6), self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.lote('consumidor', crear=crear,
+                                  actualizar=[{'idconsumidor': '000007', 'nombre_apellido': 'Consumidor Renombrado'}])
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        creados = respuesta.json()['creados']
+        self.assertEqual([creados[0]['idconsumidor'], creados[-1]['idconsumidor']], ['000008', '000057'])
+        self.assertEqual(Consumidor.objects.get(pk='000007').nombre_apellido, 'Consumidor Renombrado')
+        # Índice de búsqueda y paquete de catálogos al día sin señales post_save
+        self.assertEqual(INDICES['consumidor'].buscar('renombrado'),
+                         [{'idconsumidor': '000007', 'nombre_apellido': 'Consumidor Renombrado'}])
+        self.assertEqual(len(self.client.get('/api/catalogos/').json()['consumidor']), 51)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.lote('consumidor', eliminar=['000007', '000008'])
+        self.assertEqual(respuesta.json()['eliminados'], 2)
+        self.assertEqual(INDICES['consumidor'].buscar('renombrado'), [])
+        self.assertEqual(len(self.client.get('/api/catalogos/').json()['consumidor']), 49)
+
+    def test_con_un_error_no_escribe_nada(self):
+        respuesta = self.lote('consumidor', crear=[{'nombre_apellido': 'Bien'}, {'nombre_apellido': ''}],
+                              eliminar=['999999'])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([(error['operacion'], error['fila']) for error in respuesta.json()['errores']],
+                         [('crear', 2), ('eliminar', 1)])
+        self.assertEqual(Consumidor.objects.count(), 1)
+
+    def test_codigos_enviados_por_el_cliente(self):
+        respuesta = self.lote('planillas', crear=[{'idplanilla': '001', 'nombre': 'Repetida'},
+                                                  {'idplanilla': '002', 'nombre': 'Nueva'},
+                                                  {'idplanilla': '002', 'nombre': 'Otra'}])
+        self.assertEqual([error['fila'] for error in respuesta.json()['errores']], [1, 3])
+        respuesta = self.lote('planillas', crear=[{'idplanilla': '002', 'nombre': 'Nueva'}],
+                              actualizar=[{'idplanilla': '001', 'nombre': 'Cambiada'}])
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(list(Planilla.objects.order_by('idplanilla').values_list('nombre', flat=True)), ['Cambiada', 'Nueva'])
+        self.assertEqual(self.lote('especies').status_code, 404)
+
+    def test_codigo_creado_por_otra_peticion(self):
+        escribir = LoteCatalogo._escribir
+
+        def con_carrera(lote, *args):
+            # Otra petición inserta el mismo código después de la validación
+            Planilla.objects.create(idplanilla='002', nombre='De otra petición')
+            return escribir(lote, *args)
+
+        with mock.patch.object(LoteCatalogo, '_escribir', con_carrera):
+            respuesta = self.lote('planillas', crear=[{'idplanilla': '003', 'nombre': 'Tercera'},
+                                                      {'idplanilla': '002', 'nombre': 'Nueva'}])
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual([(error['fila'], list(error['errores'])) for error in respuesta.json()['errores']],
+                         [(2, ['idplanilla'])])
+        self.assertFalse(Planilla.objects.filter(idplanilla='003').exists())
+
+    def test_codigos_que_no_son_texto(self):
+        respuesta = self.lote('planillas', actualizar=[{'idplanilla': ['001'], 'nombre': 'Lista'},
+                                                       {'idplanilla': {'a': 1}, 'nombre': 'Objeto'}],
+                              eliminar=[['001'], 1, '001'])
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual([(error['operacion'], error['fila']) for error in respuesta.json()['errores']],
+                         [('actualizar', 1), ('actualizar', 2), ('eliminar', 1), ('eliminar', 2)])
+        self.assertEqual(Planilla.objects.get().nombre, 'Planilla')
+
+
+class PerfilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directorio = tempfile.mkdtemp()
+        cls.configuracion = override_settings(PERFILES_DIRECTORIO=cls.directorio, PERFILES_INTERVALO_MUESTREO_MS=1)
+        cls.configuracion.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.configuracion.disable()
+        shutil.rmtree(cls.directorio)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        administrador = CustomUser.objects.create_user('00000001', 'Admin', password='clave', tipo_usuarioapp='Administrador')
+        supervisor = CustomUser.objects.create_user('00000002', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.administrador = f'Bearer {TokenUsuario.for_user(administrador).access_token}'
+        cls.supervisor = f'Bearer {TokenUsuario.for_user(supervisor).access_token}'
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+
+    def setUp(self):
+        for nombre in os.listdir(self.directorio):
+            os.remove(os.path.join(self.directorio, nombre))
+        self.client.defaults['HTTP_AUTHORIZATION'] = self.administrador
+
+    def test_perfil_cprofile_con_sql_y_descarga(self):
+        respuesta = self.client.get('/api/registros/', HTTP_X_PERFILAR='cprofile')
+        perfil = respuesta['X-Perfil']
+
+        lista = self.client.get('/api/perfiles/').json()
+        self.assertEqual([(p['id'], p['modo'], p['ruta'], p['estado']) for p in lista],
+                         [(perfil, 'cprofile', 'api/registros/', 200)])
+        datos = json.loads(b''.join(self.client.get(f'/api/perfiles/{perfil}/').streaming_content))
+        self.assertIn('registros_lista', datos['perfil'])
+        self.assertTrue(any('api_registro' in consulta['sql'] for consulta in datos['sql']))
+        prof = self.client.get(f'/api/perfiles/{perfil}/', {'formato': 'prof'})
+        self.assertEqual(prof.status_code, 200)
+        self.assertEqual(self.client.get('/api/perfiles/../settings/').status_code, 404)
+
+    def test_muestreo_y_solo_administradores(self):
+        respuesta = self.client.get('/api/registros/', HTTP_X_PERFILAR='muestreo')
+        datos = json.loads(b''.join(self.client.get(f'/api/perfiles/{respuesta["X-Perfil"]}/').streaming_content))
+        self.assertIsInstance(datos['perfil'], list)
+
+        self.client.defaults['HTTP_AUTHORIZATION'] = self.supervisor
+        self.assertNotIn('X-Perfil', self.client.get('/api/registros/', HTTP_X_PERFILAR='cprofile'))
+        self.assertEqual(self.client.get('/api/perfiles/').status_code, 403)
+
+    def test_staff_autenticado_por_claims(self):
+        staff = CustomUser.objects.create_user('00000003', 'Staff', password='clave', tipo_usuarioapp='Supervisor', is_staff=True)
+        token = TokenUsuario.for_user(staff).access_token
+        self.assertTrue(token['is_staff'])
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        self.assertEqual(self.client.get('/api/perfiles/').status_code, 200)
+
+    @override_settings(PERFILES_RUTAS={'api/registros/': ('cprofile', 1.0)}, PERFILES_MAX_ARCHIVOS=2)
+    def test_por_ruta_con_retencion(self):
+        del self.client.defaults['HTTP_AUTHORIZATION']
+        ids = [self.client.get('/api/registros/')['X-Perfil'] for _ in range(3)]
+        self.assertNotIn('X-Perfil', self.client.get('/api/estado/'))
+        self.client.defaults['HTTP_AUTHORIZATION'] = self.administrador
+        self.assertEqual(sorted(p['id'] for p in self.client.get('/api/perfiles/').json()), sorted(ids)[1:])
+        self.assertEqual(len(os.listdir(self.directorio)), 4)  # .json y .prof de cada uno
+
+
+class ArranqueTests(TestCase):
+    def test_rutas_sin_importar_vistas(self):
+        # En un proceso nuevo: cargar las rutas solo importa el módulo de usuarios (lo necesita el router)
+        codigo = (
+            'import sys, django; django.setup(); from django.urls import get_resolver; '
+            'get_resolver().url_patterns; '
+            "print(sorted(m for m in sys.modules if m.startswith(('api.views.', 'api.serializers.'))))"
+        )
+        resultado = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True, check=True)
+        cargados = eval(resultado.stdout)
+        self.assertIn('api.views.usuarios', cargados)
+        self.assertNotIn('api.views.asistencias', cargados)
+        self.assertNotIn('api.serializers.asistencias', cargados)
+
+    def test_precargar(self):
+        self.assertGreater(precargar(), len(urls.urlpatterns))  # Más las del router
+        diferidas = [patron.callback for patron in urls.urlpatterns
+                     if isinstance(getattr(patron, 'callback', None), views.VistaDiferida)]
+        self.assertTrue(diferidas)
+        self.assertTrue(all('vista' in vista.__dict__ for vista in diferidas))
+        for paquete in (views, serializers):
+            for modulo in paquete.MODULOS:
+                self.assertIn(f'{paquete.__name__}.{modulo}', sys.modules)
+        self.assertIs(serializers.TareaSerializer, sys.modules['api.serializers.dia'].TareaSerializer)
+        with self.assertRaises(AttributeError):
+            views.no_existe
+
+    def test_vista_diferida(self):
+        self.assertTrue(views.vista('registros_lista').csrf_exempt)
+        self.assertFalse(views.vista('metricas_prometheus').csrf_exempt)
+        self.assertEqual(self.client.get('/api/metricas/').status_code, 200)
+
+
+class DiaTests(TestCase):
+    def setUp(self):
+        usuario = CustomUser.objects.create_user('00000009', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        cache.clear()
+
+    def test_un_solo_dia_abierto(self):
+        self.assertEqual(self.client.post('/api/estado/').status_code, 201)
+        self.assertEqual(self.client.post('/api/estado/').status_code, 400)
+        # La garantía es de la base de datos, no de la vista
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        self.assertEqual(Registro.objects.filter(estado='Abierto').count(), 1)
+
+    def test_cerrar_y_volver_a_abrir(self):
+        self.assertIsNone(dia_abierto())
+        self.assertEqual(self.client.put('/api/estado/').status_code, 400)
+        abierto = self.client.post('/api/estado/').json()
+        self.assertEqual(dia_abierto().pk, abierto['id'])
+
+        cerrado = self.client.put('/api/estado/').json()
+        self.assertEqual((cerrado['id'], cerrado['estado']), (abierto['id'], 'Cerrado'))
+        self.assertIsNone(Registro.objects.get(pk=abierto['id']).clave_abierto)
+        self.assertIsNone(dia_abierto())
+        self.assertEqual(self.client.put('/api/estado/').status_code, 400)
+        self.assertEqual(self.client.post('/api/estado/').status_code, 201)
+
+    def test_puntero_en_cache(self):
+        registro = Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        self.assertEqual(dia_abierto().pk, registro.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(dia_abierto().pk, registro.pk)
+        registro.estado = 'Cerrado'
+        registro.save()
+        self.assertIsNone(dia_abierto())
+
+    def test_escrituras_no_usan_el_puntero_en_cache(self):
+        # Otro worker cerró el día: el puntero de este proceso sigue apuntando a él hasta que caduque
+        registro = Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        cabecera = ImportarAsistencia.objects.create(idsucursal='001', idespecie='001', fecha=HOY)
+        ImportarAsistenciaDetalle.objects.create(importar_asistencia=cabecera, idcodigogeneral='00000001',
+                                                 idlabor='L00001', cantidad=1)
+        self.assertEqual(dia_abierto().pk, registro.pk)
+        Registro.objects.filter(pk=registro.pk).update(estado='Cerrado', clave_abierto=None)
+        self.assertEqual(dia_abierto().pk, registro.pk)
+
+        datos = {'idcodigogeneral': '00000002', 'idsucursal': '001', 'idespecie': '001', 'detalle': []}
+        self.assertEqual(self.client.post('/api/importar-asistencia/', datos, content_type='application/json').status_code, 400)
+        for url in ('/api/asistencia/00000001/L00001/', '/api/pota/importarasistencia/00000001/'):
+            self.assertEqual(self.client.put(url, {'cantidad': 9}, content_type='application/json').status_code, 400)
+        self.assertEqual(ImportarAsistenciaDetalle.objects.get().cantidad, 1)
+        self.assertEqual(ImportarAsistencia.objects.count(), 1)
+
+
+class SucursalesTests(TestCase):
+    def setUp(self):
+        usuario = CustomUser.objects.create_user('00000009', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        cache.clear()
+        ranking.limpiar()
+
+    def abrir(self, idsucursal=None):
+        data = {'idsucursal': idsucursal} if idsucursal else {}
+        return self.client.post('/api/estado/', data, content_type='application/json')
+
+    def sembrar_sucursal(self, idsucursal, idcodigogeneral, cantidad):
+        cabecera = ImportarAsistencia.objects.create(idsucursal=idsucursal, idespecie='001', fecha=HOY)
+        ImportarAsistenciaDetalle.objects.create(importar_asistencia=cabecera, idcodigogeneral=idcodigogeneral,
+                                                 idlabor='L00001', cantidad=cantidad)
+
+    def test_un_dia_abierto_por_sucursal(self):
+        self.assertEqual(self.abrir('001').status_code, 201)
+        self.assertEqual(self.abrir('001').status_code, 400)
+        self.assertEqual(self.abrir('002').status_code, 201)
+        self.assertEqual(self.abrir().status_code, 201)
+
+        with con_sucursal('001'):
+            self.assertEqual(dia_abierto().idsucursal, '001')
+        with con_sucursal('003'):
+            self.assertIsNone(dia_abierto().idsucursal)  # Sin día propio usa el general
+        self.assertEqual(len(dias_abiertos()), 3)
+
+        cerrado = self.client.put('/api/estado/', HTTP_X_SUCURSAL='001').json()
+        self.assertEqual((cerrado['idsucursal'], cerrado['estado']), ('001', 'Cerrado'))
+        with con_sucursal('001'):
+            self.assertIsNone(dia_abierto().idsucursal)
+        with con_sucursal('002'):
+            self.assertEqual(dia_abierto().idsucursal, '002')
+        self.assertEqual(self.client.put('/api/estado/', HTTP_X_SUCURSAL='001').status_code, 400)
+
+    def test_abrir_y_cerrar_con_la_sucursal_en_el_cuerpo(self):
+        # Abierto con la sucursal en el cuerpo, se cierra igual sin la cabecera
+        self.assertEqual(self.abrir('001').status_code, 201)
+        self.assertEqual(self.abrir().status_code, 201)
+        cerrado = self.client.put('/api/estado/', {'idsucursal': '001'}, content_type='application/json').json()
+        self.assertEqual((cerrado['idsucursal'], cerrado['estado']), ('001', 'Cerrado'))
+        self.assertEqual(Registro.objects.get(idsucursal__isnull=True).estado, 'Abierto')
+
+        # Y abierto con la cabecera, se cierra con la cabecera y sin cuerpo
+        self.assertEqual(self.client.post('/api/estado/', HTTP_X_SUCURSAL='002').status_code, 201)
+        cerrado = self.client.put('/api/estado/', HTTP_X_SUCURSAL='002').json()
+        self.assertEqual((cerrado['idsucursal'], cerrado['estado']), ('002', 'Cerrado'))
+        self.assertEqual(Registro.objects.get(idsucursal__isnull=True).estado, 'Abierto')
+
+    def test_ranking_por_sucursal(self):
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+        self.sembrar_sucursal('001', '00000001', 5)
+        self.sembrar_sucursal('002', '00000002', 8)
+
+        with con_sucursal('001'):
+            self.assertEqual([fila['idcodigogeneral'] for fila in ranking.top(5)[1]], ['00000001'])
+        self.assertEqual([fila['idcodigogeneral'] for fila in ranking.top(5)[1]], ['00000002', '00000001'])
+
+        # El detalle nuevo de la sucursal 002 cambia su ranking y el general, no el de la 001
+        with con_sucursal('002'):
+            ranking.top(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sembrar_sucursal('002', '00000003', 20)
+        with self.assertNumQueries(0):
+            with con_sucursal('001'):
+                self.assertEqual(len(ranking.top(5)[1]), 1)
+            with con_sucursal('002'):
+                self.assertEqual(ranking.top(1)[1][0]['idcodigogeneral'], '00000003')
+            self.assertEqual(ranking.top(1)[1][0]['idcodigogeneral'], '00000003')
+
+    def test_archivar_dia_de_sucursal(self):
+        self.sembrar_sucursal('001', '00000001', 5)
+        self.sembrar_sucursal('002', '00000002', 8)
+        self.assertEqual(self.abrir('001').status_code, 201)
+        self.assertEqual(self.abrir('002').status_code, 201)
+        registro = self.client.put('/api/estado/', HTTP_X_SUCURSAL='001').json()
+
+        self.assertEqual(archivar_dia(registro['id']), 1)
+        self.assertEqual(list(ImportarAsistencia.objects.values_list('idsucursal', flat=True)), ['002'])
+        respuesta = self.client.get(f'/api/importaciones-fechas/{HOY}/', HTTP_X_SUCURSAL='001')
+        self.assertEqual([fila['idsucursal'] for fila in respuesta.json()], ['001'])
+
+
+class CambiosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+
+    def setUp(self):
+        cache.clear()
+        ranking.limpiar()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+
+    def importar(self):
+        return self.client.post('/api/importar-asistencia/', {
+            'idempresa': '001', 'idsucursal': '001', 'idespecie': '001', 'idcodigogeneral': '00000001',
+            'detalle': [{'idcodigogeneral': '00000001', 'idlabor': 'L00001', 'cantidad': 1.0}],
+        }, content_type='application/json')
+
+    def test_altas_y_cambios_en_orden_con_cursor(self):
+        cabecera = self.importar().json()
+        self.client.put('/api/asistencia/00000001/L00001/', {'cantidad': 9.5}, content_type='application/json')
+
+        pagina = self.client.get('/api/cambios/', {'limite': 2}).json()
+        self.assertEqual([(c['modelo'], c['operacion']) for c in pagina['cambios']],
+                         [('importarasistencia', 'alta'), ('importarasistenciadetalle', 'alta')])
+        self.assertEqual(pagina['cambios'][0]['datos']['id'], cabecera['id'])
+        self.assertEqual(pagina['siguiente'], pagina['cambios'][1]['id'])
+
+        pagina = self.client.get('/api/cambios/', {'desde': pagina['siguiente']}).json()
+        self.assertEqual([(c['operacion'], c['datos']['cantidad']) for c in pagina['cambios']], [('cambio', 9.5)])
+        vacia = self.client.get('/api/cambios/', {'desde': pagina['siguiente']}).json()
+        self.assertEqual(vacia, {'cambios': [], 'siguiente': pagina['siguiente']})
+        self.assertEqual(self.client.get('/api/cambios/', {'desde': 'x'}).status_code, 400)
+
+    def test_misma_transaccion_que_la_asistencia(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            ImportarAsistencia.objects.create(idempresa='001', fecha=HOY)
+            self.assertEqual(CambioAsistencia.objects.count(), 1)
+            raise ValueError
+        self.assertFalse(CambioAsistencia.objects.exists())
+
+    def test_se_detiene_en_un_hueco_reciente(self):
+        # El id 3 falta: puede ser una transacción que todavía no se confirma
+        for id in (1, 2, 4, 5):
+            CambioAsistencia.objects.create(id=id, modelo='importarasistencia', operacion='alta', objeto_id=id, datos={})
+        pagina = self.client.get('/api/cambios/').json()
+        self.assertEqual(([cambio['id'] for cambio in pagina['cambios']], pagina['siguiente']), ([1, 2], 2))
+        self.assertEqual(self.client.get('/api/cambios/', {'desde': 2}).json()['cambios'], [])
+
+        # Se confirmó: sigue sin saltar nada
+        CambioAsistencia.objects.create(id=3, modelo='importarasistencia', operacion='alta', objeto_id=3, datos={})
+        self.assertEqual([cambio['id'] for cambio in self.client.get('/api/cambios/', {'desde': 2}).json()['cambios']],
+                         [3, 4, 5])
+
+        # Un hueco con cambios posteriores ya viejos es una transacción que se deshizo
+        CambioAsistencia.objects.create(id=7, modelo='importarasistencia', operacion='alta', objeto_id=7, datos={})
+        self.assertEqual(self.client.get('/api/cambios/', {'desde': 5}).json()['cambios'], [])
+        CambioAsistencia.objects.filter(id=7).update(creado=timezone.now() - timedelta(seconds=6))
+        self.assertEqual([cambio['id'] for cambio in self.client.get('/api/cambios/', {'desde': 5}).json()['cambios']], [7])
+
+    def test_exportar_cambios_a_jsonl(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio)
+        self.importar()
+        call_command('exportar_cambios', directorio, '--una-vez', stdout=StringIO())
+        self.client.put('/api/asistencia/00000001/L00001/', {'cantidad': 9.5}, content_type='application/json')
+        call_command('exportar_cambios', directorio, '--una-vez', '--lote', '1', stdout=StringIO())
+
+        archivos = sorted(nombre for nombre in os.listdir(directorio) if nombre.endswith('.jsonl'))
+        self.assertEqual(len(archivos), 1)
+        with open(os.path.join(directorio, archivos[0]), encoding='utf-8') as archivo:
+            lineas = [json.loads(linea) for linea in archivo]
+        self.assertEqual([linea['id'] for linea in lineas], list(CambioAsistencia.objects.values_list('id', flat=True)))
+        with open(os.path.join(directorio, 'cursor'), encoding='utf-8') as archivo:
+            self.assertEqual(int(archivo.read()), lineas[-1]['id'])
+
+
+@override_settings(LOGIN_MAX_HILOS=0)
+class AutenticacionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.supervisor = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.trabajador = CustomUser.objects.create_user('00000002', 'Trabajador', password='clave', tipo_usuarioapp='Proceso')
+
+    def setUp(self):
+        cache.clear()
+        revocaciones._cargado = None  # Sin revocaciones de otras pruebas en memoria
+
+    def login(self, dni):
+        respuesta = self.client.post('/api/token/', {'dni': dni, 'password': 'clave'}, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        return f'Bearer {respuesta.json()["access"]}'
+
+    def test_revoca_los_anteriores_y_acepta_el_nuevo_login(self):
+        anterior = self.login('00000002')
+        supervisor = self.login('00000001')
+        respuesta = self.client.put('/api/usuarios/actualizar/00000002/', {'apel_nomb': 'Cambiado'},
+                                    content_type='application/json', HTTP_AUTHORIZATION=supervisor)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.client.get('/api/tipoUsuarios/', HTTP_AUTHORIZATION=anterior).status_code, 401)
+
+        # Un login en el mismo segundo de la revocación sigue valiendo, también después de recargar la lista
+        nuevo = self.login('00000002')
+        self.assertEqual(self.client.get('/api/tipoUsuarios/', HTTP_AUTHORIZATION=nuevo).status_code, 200)
+        revocaciones._cargado = None
+        self.assertEqual(self.client.get('/api/tipoUsuarios/', HTTP_AUTHORIZATION=nuevo).status_code, 200)
+        self.assertEqual(self.client.get('/api/tipoUsuarios/', HTTP_AUTHORIZATION=anterior).status_code, 401)
+
+    def test_tokens_sin_emitido_usan_segundos_enteros(self):
+        self.assertTrue(token_revocado({'iat': 100}, 100.7))
+        self.assertFalse(token_revocado({'iat': 101}, 100.7))
+        self.assertTrue(token_revocado({'iat': 101, 'emitido': 100.5}, 100.7))
+        self.assertFalse(token_revocado({'iat': 100, 'emitido': 100.8}, 100.7))
+        self.assertFalse(token_revocado({'iat': 100}, None))
+
+    def test_usuario_armado_con_los_claims(self):
+        autenticacion = ClaimsJWTAuthentication()
+        token = autenticacion.get_validated_token(str(TokenUsuario.for_user(self.trabajador).access_token))
+        revocaciones.revocado_en(self.trabajador.id)
+        with self.assertNumQueries(0):
+            usuario = autenticacion.get_user(token)
+        self.assertEqual((usuario.id, usuario.dni, usuario.tipo_usuarioapp), (self.trabajador.id, '00000002', 'Proceso'))
+
+        CustomUser.objects.filter(pk=self.trabajador.pk).update(is_active=False)
+        inactivo = autenticacion.get_validated_token(
+            str(TokenUsuario.for_user(CustomUser.objects.get(pk=self.trabajador.pk)).access_token))
+        with self.assertRaises(AuthenticationFailed):
+            autenticacion.get_user(inactivo)
+
+
+def tarea_de_prueba(fallar=False, liberar=False):
+    # Destino de las tareas de TareasTests ('api.tests.tarea_de_prueba')
+    if liberar:
+        Tarea.objects.filter(estado='En proceso').update(estado='Pendiente')
+    if fallar:
+        raise ValueError('falla de prueba')
+
+
+@override_settings(TAREAS_ESPERA_REINTENTO=30)
+class TareasTests(TestCase):
+    def test_reclama_una_sola_vez_y_en_orden(self):
+        futura = encolar('api.tests.tarea_de_prueba')
+        futura.ejecutar_desde = timezone.now() + timedelta(hours=1)
+        futura.save()
+        primera = encolar('api.tests.tarea_de_prueba')
+        segunda = encolar('api.tests.tarea_de_prueba')
+
+        reclamada = reclamar_tarea()
+        self.assertEqual((reclamada.pk, reclamada.estado, reclamada.intentos), (primera.pk, 'En proceso', 1))
+        self.assertEqual(reclamar_tarea().pk, segunda.pk)
+        self.assertIsNone(reclamar_tarea())  # La tercera todavía no debe ejecutarse
+
+    def test_reintenta_con_espera_creciente_y_falla_al_final(self):
+        tarea = encolar('api.tests.tarea_de_prueba', max_intentos=3, fallar=True)
+        for intento, espera in ((1, 30), (2, 60)):
+            antes = timezone.now()
+            tarea = ejecutar_tarea(reclamar_tarea())
+            self.assertEqual((tarea.estado, tarea.intentos), ('Pendiente', intento))
+            self.assertIn('falla de prueba', tarea.error)
+            self.assertAlmostEqual((tarea.ejecutar_desde - antes).total_seconds(), espera, delta=2)
+            Tarea.objects.filter(pk=tarea.pk).update(ejecutar_desde=timezone.now())
+
+        tarea = ejecutar_tarea(reclamar_tarea())
+        self.assertEqual((tarea.estado, tarea.intentos), ('Fallida', 3))
+        self.assertIsNotNone(tarea.terminado)
+
+    def test_completa(self):
+        encolar('api.tests.tarea_de_prueba')
+        tarea = ejecutar_tarea(reclamar_tarea())
+        self.assertEqual(Tarea.objects.get(pk=tarea.pk).estado, 'Completada')
+
+    @override_settings(TAREAS_TIEMPO_MAXIMO=60)
+    def test_libera_las_colgadas(self):
+        reintentable = encolar('api.tests.tarea_de_prueba', max_intentos=2)
+        agotada = encolar('api.tests.tarea_de_prueba', max_intentos=1)
+        reciente = encolar('api.tests.tarea_de_prueba')
+        for tarea in (reintentable, agotada, reciente):
+            reclamar_tarea()
+        Tarea.objects.exclude(pk=reciente.pk).update(iniciado=timezone.now() - timedelta(minutes=5))
+
+        self.assertEqual(liberar_tareas_colgadas(), 2)
+        estados = dict(Tarea.objects.values_list('pk', 'estado'))
+        self.assertEqual([estados[t.pk] for t in (reintentable, agotada, reciente)], ['Pendiente', 'Fallida', 'En proceso'])
+
+    def test_no_pisa_una_tarea_liberada_mientras_se_ejecutaba(self):
+        encolar('api.tests.tarea_de_prueba', liberar=True)
+        tarea = ejecutar_tarea(reclamar_tarea())
+        self.assertEqual(tarea.estado, 'Pendiente')
+        self.assertEqual(Tarea.objects.get(pk=tarea.pk).estado, 'Pendiente')
+
+        # Liberada y reclamada por otro proceso: el resultado del primero tampoco se guarda
+        Tarea.objects.all().delete()
+        encolar('api.tests.tarea_de_prueba')
+        tarea = reclamar_tarea()
+        Tarea.objects.filter(pk=tarea.pk).update(intentos=F('intentos') + 1)
+        ejecutar_tarea(tarea)
+        self.assertEqual(Tarea.objects.get(pk=tarea.pk).estado, 'En proceso')
+
+    def test_comando_procesa_las_pendientes(self):
+        encolar('api.tests.tarea_de_prueba')
+        encolar('api.tests.tarea_de_prueba', max_intentos=1, fallar=True)
+        call_command('procesar_tareas', '--una-vez', '--procesos', '1', stdout=StringIO())
+        self.assertEqual(sorted(Tarea.objects.values_list('estado', flat=True)), ['Completada', 'Fallida'])
+
+
+class ArchivoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        cls.token = TokenUsuario.for_user(usuario).access_token
+        sembrar_dia(AYER, 6)
+        sembrar_dia(HOY, 4)
+        cls.cerrado = Registro.objects.create(FechaAbierto=AYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                              FechaCerrado=HOY, HoraCerrado='06:00:00')
+        cls.abierto = Registro.objects.create(FechaAbierto=HOY, HoraAbierto='06:00:00', estado='Abierto')
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+
+    def test_mueve_solo_el_dia_cerrado(self):
+        # El cierre llega a HOY, pero las asistencias del día abierto se quedan
+        self.assertEqual(archivar_dia(self.abierto.pk), 0)
+        self.assertEqual(archivar_dia(self.cerrado.pk), 3)
+        self.assertTrue(Registro.objects.get(pk=self.cerrado.pk).archivado)
+        self.assertEqual(set(ImportarAsistencia.objects.values_list('fecha', flat=True)), {HOY})
+        self.assertEqual(set(ImportarAsistenciaHistorico.objects.values_list('fecha', 'periodo')), {(AYER, AYER[:6])})
+        self.assertEqual(ImportarAsistenciaDetalleHistorico.objects.count(), 6)
+        self.assertEqual(ImportarAsistenciaDetalle.objects.count(), 4)
+        self.assertEqual(archivar_dia(self.cerrado.pk), 0)  # Ya archivado
+
+    def test_rango_con_y_sin_historico(self):
+        archivar_dia(self.cerrado.pk)
+        actuales = asistencias_en_rango(AYER, HOY)
+        self.assertEqual([consulta.count() for consulta in actuales], [2])
+        self.assertEqual([consulta.count() for consulta in asistencias_en_rango(AYER, HOY, archivado=True)], [3, 2])
+        self.assertEqual([consulta.count() for consulta in asistencias_en_rango(AYER, AYER, archivado=True)], [3, 0])
+
+    def test_listado_completo_igual_despues_de_archivar(self):
+        antes = self.client.get('/api/importar-asistencia-detalle/').json()
+        archivar_dia(self.cerrado.pk)
+        self.assertEqual(self.client.get('/api/importar-asistencia-detalle/').json(), antes)
+        fechas = self.client.get(f'/api/importaciones-fechas/{AYER}/').json()
+        self.assertEqual(len(fechas), 5)  # El rango del día cerrado llega hasta HOY
+
+    def test_archiva_ids_reutilizados(self):
+        # Tras reiniciar MySQL < 8 el AUTO_INCREMENT vuelve a MAX(id) + 1 y repite ids ya archivados
+        archivar_dia(self.cerrado.pk)
+        cabecera = ImportarAsistenciaHistorico.objects.order_by('clave').first()
+        detalle = cabecera.detalle.order_by('item').first()
+        ImportarAsistencia.objects.create(id=cabecera.id_original, idempresa='001', idsucursal='001', fecha=ANTEAYER)
+        ImportarAsistenciaDetalle.objects.create(item=detalle.item, importar_asistencia_id=cabecera.id_original,
+                                                 idcodigogeneral='00000009', idlabor='L00009', cantidad=5.0)
+        registro = Registro.objects.create(FechaAbierto=ANTEAYER, HoraAbierto='06:00:00', estado='Cerrado',
+                                           FechaCerrado=ANTEAYER, HoraCerrado='18:00:00')
+        self.assertEqual(archivar_dia(registro.pk), 1)
+
+        archivadas = ImportarAsistenciaHistorico.objects.filter(id_original=cabecera.id_original).order_by('clave')
+        self.assertEqual([(a.fecha, [d.idlabor for d in a.detalle.all()]) for a in archivadas],
+                         [(AYER, ['L00001', 'L00002']), (ANTEAYER, ['L00009'])])
+        listado = [fila for fila in self.client.get('/api/importar-asistencia-detalle/').json()
+                   if fila['id'] == cabecera.id_original]
+        self.assertEqual([[d['importar_asistencia'] for d in fila['detalle']] for fila in listado],
+                         [[cabecera.id_original] * 2, [cabecera.id_original]])
+
+
+@override_settings(LOGIN_MAX_HILOS=0)
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user('00000001', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+
+    def setUp(self):
+        cache.clear()
+
+    def entrar(self, dni='00000001', password='clave', ip='10.0.0.1'):
+        return self.client.post('/api/token/', {'dni': dni, 'password': password},
+                                content_type='application/json', REMOTE_ADDR=ip)
+
+    def test_limite_por_dni(self):
+        # 10 por minuto por DNI, aunque vengan de distintas IP
+        for intento in range(10):
+            self.assertEqual(self.entrar(password='mal', ip=f'10.0.0.{intento}').status_code, 401)
+        respuesta = self.entrar(ip='10.0.0.99')
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertIn('Retry-After', respuesta)
+        self.assertEqual(self.entrar(dni='00000002', password='mal').status_code, 401)  # Otro DNI
+
+    @mock.patch.object(login.LoginIpThrottle, 'rate', '3/min', create=True)
+    def test_limite_por_ip(self):
+        for dni in ('00000002', '00000003', '00000004'):
+            self.assertEqual(self.entrar(dni=dni, password='mal').status_code, 401)
+        self.assertEqual(self.entrar().status_code, 429)
+        self.assertEqual(self.entrar(ip='10.0.0.2').status_code, 200)
+
+    @override_settings(LOGIN_MAX_HILOS=1, LOGIN_MAX_EN_ESPERA=0)
+    def test_503_con_el_pool_saturado(self):
+        self.addCleanup(setattr, login, '_pool', None)
+        login._pool = None
+        login._iniciar_pool()
+        login._cupos.acquire()  # Un login en curso ocupa el único cupo
+        try:
+            respuesta = self.entrar()
+        finally:
+            login._cupos.release()
+        self.assertEqual(respuesta.status_code, 503)
+        self.assertEqual(respuesta['Retry-After'], '1')
+        login._pool.shutdown()
+
+    def test_regenera_el_hash_al_iniciar_sesion(self):
+        with override_settings(LOGIN_PBKDF2_ITERACIONES=1000):
+            self.usuario.set_password('clave')
+            self.usuario.save()
+        self.assertTrue(CustomUser.objects.get(pk=self.usuario.pk).password.startswith('pbkdf2_sha256$1000$'))
+
+        with override_settings(LOGIN_PBKDF2_ITERACIONES=2000):
+            self.assertEqual(self.entrar().status_code, 200)
+        self.assertTrue(CustomUser.objects.get(pk=self.usuario.pk).password.startswith('pbkdf2_sha256$2000$'))
+
+
+class MetricasTests(TestCase):
+    def setUp(self):
+        usuario = CustomUser.objects.create_user('00000009', 'Supervisor', password='clave', tipo_usuarioapp='Supervisor')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {TokenUsuario.for_user(usuario).access_token}'
+        self.metricas = Metricas()
+        parche = mock.patch('api.middleware.metricas', self.metricas)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def test_contadores_e_histogramas(self):
+        self.assertEqual(self.client.get('/api/registros/').status_code, 200)
+        self.assertEqual(self.client.get('/api/registros/').status_code, 200)
+        self.assertEqual(self.metricas._peticiones[('api/registros/', 'GET', 200)], 2)
+        duracion = self.metricas._histogramas[('api_peticion_duracion_segundos', 'api/registros/', 'GET')]
+        self.assertEqual(duracion.total, 2)
+        self.assertEqual(sum(duracion.cuentas), 2)
+        self.assertGreater(self.metricas._histogramas[('api_respuesta_bytes', 'api/registros/', 'GET')].suma, 0)
+        self.assertIn('api_peticiones_total{ruta="api/registros/",metodo="GET",estado="200"} 2', self.metricas.exportar())
+
+    def test_tiempo_en_base_de_datos(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get('/api/registros/')
+        bd = self.metricas._histogramas[('api_bd_consultas', 'api/registros/', 'GET')]
+        self.assertEqual(bd.suma, len(consultas))
+        self.assertGreater(bd.suma, 0)
+        tiempo_bd = self.metricas._histogramas[('api_bd_duracion_segundos', 'api/registros/', 'GET')].suma
+        total = self.metricas._histogramas[('api_peticion_duracion_segundos', 'api/registros/', 'GET')].suma
+        self.assertGreater(tiempo_bd, 0)
+        self.assertLessEqual(tiempo_bd, total)
+
+    def test_solo_redes_permitidas(self):
+        self.assertEqual(self.client.get('/api/metricas/', REMOTE_ADDR='10.0.0.1').status_code, 403)
+        with override_settings(METRICAS_REDES_PERMITIDAS=['10.0.0.0/8']):
+            self.assertEqual(self.client.get('/api/metricas/', REMOTE_ADDR='10.0.0.1').status_code, 200)
+        self.assertEqual(self.client.get('/api/metricas/').status_code, 200)  # 127.0.0.1
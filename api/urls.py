@@ -1,45 +1,63 @@
 # api/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import *
 from . import views
+from .views import vista
 
 router = DefaultRouter()
-router.register(r'usuarios', CustomUserViewSet, basename='usuario')
+# El router revisa las acciones de la clase: el módulo de usuarios se importa junto con las rutas
+router.register(r'usuarios', views.CustomUserViewSet, basename='usuario')
 
 
 
 urlpatterns = [
+    # Antes del router, que tomaría 'lote' como la pk de un usuario
+    path('usuarios/lote/', vista('aprovisionar_usuarios'), name='aprovisionar-usuarios'),
     path('', include(router.urls)),
-    path('token/', ObtainTokenView.as_view(), name='obtain_token'),
-    path('usuarios/', CustomUserViewSet.as_view({'post': 'create'}), name='create_user'),
-    path('usuarios/eliminar/<str:dni>/', views.eliminar_usuario, name='eliminar_usuario'),
-    path('usuarios/actualizar/<str:dni>/', actualizar_usuario, name='actualizar_usuario'),
-    path('usuarios/dni/<str:dni>/', UserByDniAPIView.as_view(), name='user-by-dni'),
-    path('empresas/', EmpresaListCreateAPIView.as_view(), name='empresa-list-create'),
-    path('tipoUsuarios/', obtener_tipos_usuarios, name='obtener_tipos_usuarios'),
-    path('usuarios/', CustomUserViewSet.as_view({'post': 'create'}), name='create_user'),
-
-
-    path('tiposenvio/', TipoEnvioListCreate.as_view(), name='tiposenvio-list-create'),
-    path('responsables/', views.responsable_list),
-    path('responsables/<str:pk>/', views.responsable_detail),
-    path('planillas/', PlanillaAPIView.as_view(), name='planilla-list'),
-    path('planillas/<str:id>/', PlanillaAPIView.as_view(), name='planilla-detail'),
-    path('emisor/', EmisorListCreateAPIView.as_view(), name='emisor-list-create'),
-    path('turno/', TurnoListCreateAPIView.as_view(), name='turno-list-create'),
-    path('consumidor/', ConsumidorListCreateAPIView.as_view(), name='consumidor-list-create'),
-    path('estado/', DiaAPIView.as_view(), name='abrir-dia'),
-    path('registros/', views.registros_lista, name='todos-los-registros'),
-
-    path('importar-asistencia/', importar_asistencia_Post, name='importar_asistencia_list'),
-    path('importar-asistencia-detalle/', views.importar_asistencia_list, name='importar_asistencia_list'),
-    path('asistencia/<str:idcodigogeneral>/<str:idlabor>/', MerluzasistenciaUpdateByCodigoGeneralView.as_view(), name='update_asistencia'),
-    path('pota/importarasistencia/', POTAAsistenciaUpdateByCodigoGeneralView.as_view(), name='importar_asistencia_list'),
-    path('pota/importarasistencia/<str:idcodigogeneral>/', POTAAsistenciaUpdateByCodigoGeneralView.as_view()),
-    path('ingresos-dia-actual/', ingresos_del_dia_actual, name='importaciones_activas'),
-    path('ingresos-dia-actual/<str:idcodigogeneral>/', views.ingresos_del_dia_actual, name='ingresos-dia-actual-detalle'),
-
-    path('importaciones-fechas/<str:fecha_abierto>/', importaciones_por_fecha, name='importaciones_por_fecha'),
+    path('token/', vista('ObtainTokenView'), name='obtain_token'),
+    path('usuarios/', vista('CustomUserViewSet', {'post': 'create'}), name='create_user'),
+    path('usuarios/eliminar/<str:dni>/', vista('eliminar_usuario'), name='eliminar_usuario'),
+    path('usuarios/actualizar/<str:dni>/', vista('actualizar_usuario'), name='actualizar_usuario'),
+    path('usuarios/dni/lote/', vista('usuarios_por_dni_lote'), name='usuarios-por-dni-lote'),
+    path('usuarios/dni/<str:dni>/', vista('UserByDniAPIView'), name='user-by-dni'),
+    path('empresas/', vista('EmpresaListCreateAPIView'), name='empresa-list-create'),
+    path('tipoUsuarios/', vista('obtener_tipos_usuarios'), name='obtener_tipos_usuarios'),
+    path('usuarios/', vista('CustomUserViewSet', {'post': 'create'}), name='create_user'),
+
+
+    path('tiposenvio/', vista('TipoEnvioListCreate'), name='tiposenvio-list-create'),
+    path('responsables/', vista('responsable_list')),
+    path('responsables/<str:pk>/', vista('responsable_detail')),
+    path('planillas/', vista('PlanillaAPIView'), name='planilla-list'),
+    path('planillas/<str:id>/', vista('PlanillaAPIView'), name='planilla-detail'),
+    path('emisor/', vista('EmisorListCreateAPIView'), name='emisor-list-create'),
+    path('turno/', vista('TurnoListCreateAPIView'), name='turno-list-create'),
+    path('consumidor/', vista('ConsumidorListCreateAPIView'), name='consumidor-list-create'),
+    path('estado/', vista('DiaAPIView'), name='abrir-dia'),
+    path('registros/', vista('registros_lista'), name='todos-los-registros'),
+    path('catalogos/', vista('catalogos'), name='catalogos'),
+    path('catalogos/<str:catalogo>/lote/', vista('catalogo_lote'), name='catalogo-lote'),
+    path('buscar/<str:modelo>/', vista('buscar_nombres'), name='buscar-nombres'),
+
+    path('importar-asistencia/', vista('importar_asistencia_Post'), name='importar_asistencia_list'),
+    path('importar-asistencia-detalle/', vista('importar_asistencia_list'), name='importar_asistencia_list'),
+    path('asistencia/<str:idcodigogeneral>/<str:idlabor>/', vista('MerluzasistenciaUpdateByCodigoGeneralView'), name='update_asistencia'),
+    path('pota/importarasistencia/', vista('POTAAsistenciaUpdateByCodigoGeneralView'), name='importar_asistencia_list'),
+    path('pota/importarasistencia/<str:idcodigogeneral>/', vista('POTAAsistenciaUpdateByCodigoGeneralView')),
+    path('ingresos-dia-actual/', vista('ingresos_del_dia_actual'), name='importaciones_activas'),
+    path('ingresos-dia-actual/<str:idcodigogeneral>/', vista('ingresos_del_dia_actual'), name='ingresos-dia-actual-detalle'),
+    path('trabajadores/<str:idcodigogeneral>/ingresos/', vista('ingresos_trabajador'), name='ingresos-trabajador'),
+    path('ranking/', vista('ranking_dia'), name='ranking'),
+    path('ranking/<str:idcodigogeneral>/', vista('ranking_dia'), name='ranking-trabajador'),
+
+    path('importaciones-fechas/<str:fecha_abierto>/', vista('importaciones_por_fecha'), name='importaciones_por_fecha'),
+    path('reportes/rango/', vista('reporte_por_rango'), name='reporte-rango'),
+
+    path('tareas/', vista('tareas_lista'), name='tareas-lista'),
+    path('tareas/<int:pk>/', vista('tarea_detalle'), name='tarea-detalle'),
+    path('cambios/', vista('cambios_lista'), name='cambios'),
+    path('metricas/', vista('metricas_prometheus'), name='metricas'),
+    path('perfiles/', vista('perfiles_lista'), name='perfiles'),
+    path('perfiles/<str:perfil>/', vista('perfil_descarga'), name='perfil-descarga'),
    
     ]
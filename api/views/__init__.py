@@ -0,0 +1,67 @@
+# api/views/__init__.py
+# Vistas separadas por área. Cada módulo se importa la primera vez que se usa una de sus
+# vistas: `from api.views import X` sigue funcionando, y las rutas de api/urls.py usan
+# vista() para no importar ninguna hasta su primera petición (ver api/arranque.py).
+from importlib import import_module
+
+from django.utils.functional import cached_property
+
+from ..arranque import atributos_diferidos
+
+MODULOS = {
+    'usuarios': (
+        'UsuariosPagination', 'CustomUserViewSet', 'ObtainTokenView', 'TokenUsuarioObtainPairView',
+        'getCurrentUser', 'eliminar_usuario', 'actualizar_usuario', 'UserByDniAPIView',
+        'aprovisionar_usuarios', 'MAX_DNIS_POR_LOTE', 'usuarios_por_dni_lote', 'obtener_tipos_usuarios',
+    ),
+    'maestros': (
+        'EmpresaListCreateAPIView', 'TipoEnvioListCreate', 'responsable_list', 'responsable_detail',
+        'PlanillaAPIView', 'EmisorListCreateAPIView', 'EspecieListCreateAPIView', 'TurnoListCreateAPIView',
+        'ConsumidorListCreateAPIView', 'MAX_RESULTADOS_BUSQUEDA', 'buscar_nombres', 'catalogos', 'catalogo_lote',
+    ),
+    'dia': ('DiaAPIView', 'registros_lista'),
+    'asistencias': (
+        'importar_asistencia_Post', 'CAMPOS_PENDIENTE', 'registrar_cantidad_diferida',
+        'MerluzasistenciaUpdateByCodigoGeneralView', 'importar_asistencia_list',
+        'POTAAsistenciaUpdateByCodigoGeneralView',
+    ),
+    'ingresos': ('ingresos_del_dia_actual', 'ingresos_trabajador'),
+    'reportes': ('importaciones_por_fecha', 'reporte_por_rango', 'MAX_RANKING', 'ranking_dia'),
+    'tareas': ('tareas_lista', 'tarea_detalle'),
+    'cambios': ('cambios_lista',),
+    'diagnostico': ('metricas_prometheus', 'perfiles_lista', 'perfil_descarga'),
+}
+
+__getattr__, __all__ = atributos_diferidos(__name__, MODULOS)
+
+
+class VistaDiferida:
+    # Vista de una ruta que importa su módulo al atender la primera petición
+    def __init__(self, nombre, acciones=None, **initkwargs):
+        self.nombre = nombre
+        self.acciones = acciones
+        self.initkwargs = initkwargs
+        modulo = next(modulo for modulo, nombres in MODULOS.items() if nombre in nombres)
+        self.__module__ = f'{__name__}.{modulo}'
+        self.__name__ = self.__qualname__ = nombre
+
+    @cached_property
+    def vista(self):
+        vista = getattr(import_module(self.__module__), self.nombre)
+        if isinstance(vista, type):
+            argumentos = (self.acciones,) if self.acciones else ()
+            vista = vista.as_view(*argumentos, **self.initkwargs)
+        return vista
+
+    @property
+    def csrf_exempt(self):
+        # CsrfViewMiddleware lo consulta antes de llamar a la vista (las de DRF están exentas)
+        return getattr(self.vista, 'csrf_exempt', False)
+
+    def __call__(self, request, *args, **kwargs):
+        return self.vista(request, *args, **kwargs)
+
+
+def vista(nombre, acciones=None, **initkwargs):
+    # Para urls.py: vista('DiaAPIView') en lugar de DiaAPIView.as_view()
+    return VistaDiferida(nombre, acciones, **initkwargs)
@@ -0,0 +1,250 @@
+# api/views/asistencias.py
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from django.utils import timezone
+from django.db import transaction
+from ..models import ImportarAsistencia, ImportarAsistenciaDetalle
+from ..serializers import ImportarAsistenciaSerializer, ImportarAsistenciaDetalleSerializer
+from ..empresas import con_empresa, empresa_actual
+from ..sucursales import con_sucursal, sucursal_actual
+from ..dia import consultar_dia_abierto
+
+from datetime import datetime
+
+@api_view(['POST'])
+def importar_asistencia_Post(request):
+    if request.method == 'POST':
+        # Cabecera y detalles van a la base de la empresa de la asistencia (api/empresas.py)
+        # y al día abierto de su sucursal (api/sucursales.py)
+        with con_empresa(request.data.get('idempresa') or empresa_actual()), \
+                con_sucursal(request.data.get('idsucursal') or sucursal_actual()):
+            return _importar_asistencia(request)
+
+
+def _importar_asistencia(request):
+    if request.method == 'POST':
+        try:
+            # Obtener el día abierto: sin caché, una escritura no puede ir a un día recién cerrado
+            ultimo_registro = consultar_dia_abierto()
+            if ultimo_registro is None:
+                return Response({"error": "No hay registro abierto para importar asistencia."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            idcodigogeneral = request.data.get('idcodigogeneral')
+
+            # Verificar si el trabajador ya fue importado en este registro abierto
+            existing_worker = ImportarAsistenciaDetalle.objects.filter(
+                idcodigogeneral=idcodigogeneral,
+                importar_asistencia__id=ultimo_registro.pk
+            )
+            if existing_worker.exists():
+                return Response({"error": "Este trabajador ya ha sido importado en este registro abierto."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+            # Crear la instancia de ImportarAsistencia
+            importar_asistencia_data = {
+                'idempresa': request.data.get('idempresa'),
+                'tipo_envio': request.data.get('tipo_envio'),
+                'idresponsable': request.data.get('idresponsable'),
+                'idplanilla': request.data.get('idplanilla'),
+                'idemisor': request.data.get('idemisor'),
+                'idturno': request.data.get('idturno'),
+                'fecha': ultimo_registro.FechaAbierto,
+                'idsucursal': request.data.get('idsucursal'),
+                'idespecie': request.data.get('idespecie')  # Asegúrate de agregar el campo idespecie
+            }
+            importar_asistencia_serializer = ImportarAsistenciaSerializer(data=importar_asistencia_data)
+            importar_asistencia_serializer.is_valid(raise_exception=True)
+            importar_asistencia = importar_asistencia_serializer.save()
+
+            # Crear las instancias de ImportarAsistenciaDetalle
+            detalle_data = request.data.get('detalle', [])
+            for detalle_item in detalle_data:
+                detalle_item['importar_asistencia'] = importar_asistencia.pk
+                detalle_serializer = ImportarAsistenciaDetalleSerializer(data=detalle_item)
+                detalle_serializer.is_valid(raise_exception=True)
+                detalle_serializer.save()
+
+            return Response(importar_asistencia_serializer.data, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+
+#------------------------------------------------------------------------------
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from ..models import ImportarAsistencia, ImportarAsistenciaDetalle, ImportarAsistenciaHistorico
+from ..serializers import asistencias_rapidas
+from ..cantidades import cantidades
+from ..replicas import en_primaria, en_replica, lectura_en_replica
+from ..empresas import base_actual
+from ..dia import consultar_dia_abierto, dia_abierto
+from datetime import datetime
+
+CAMPOS_PENDIENTE = ('item', 'importar_asistencia_id', 'idcodigogeneral', 'idlabor')
+
+
+def registrar_cantidad_diferida(detalles, request):
+    # Modo CANTIDADES_DIFERIDAS: se responde 202 apenas el cambio queda en el log (api/cantidades.py).
+    # Solo para asistencias en 'default': las empresas con base propia guardan al momento.
+    detalle = detalles.values(*CAMPOS_PENDIENTE).first()
+    if not detalle:
+        return Response({"error": "No se encontró el registro de ImportarAsistenciaDetalle para actualizar en el día abierto más cercano."}, status=status.HTTP_404_NOT_FOUND)
+    if 'cantidad' not in request.data:
+        return Response({"error": "La cantidad no se proporcionó en los datos de la solicitud"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        pendiente = cantidades.registrar(detalle, request.data['cantidad'])
+    except ValidationError as e:
+        return Response({"cantidad": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(pendiente, status=status.HTTP_202_ACCEPTED)
+
+
+class MerluzasistenciaUpdateByCodigoGeneralView(APIView):
+    def put(self, request, idcodigogeneral, idlabor):
+        try:
+            # Obtener la fecha actual
+            fecha_actual = datetime.now().strftime("%Y%m%d")
+            
+            # Verificar si hay un día abierto (sin caché: es una escritura)
+            registro_abierto = consultar_dia_abierto()
+            if not registro_abierto:
+                return Response({"error": "No hay día abierto para actualizar la asistencia."}, status=status.HTTP_400_BAD_REQUEST)
+                
+            # Buscar el registro de ImportarAsistenciaDetalle por idcodigogeneral e idlabor en el día abierto más cercano
+            detalles = ImportarAsistenciaDetalle.objects.filter(
+                idcodigogeneral=idcodigogeneral, 
+                idlabor=idlabor, 
+                importar_asistencia__fecha=registro_abierto.FechaAbierto
+            )
+            if settings.CANTIDADES_DIFERIDAS and base_actual() == 'default':
+                return registrar_cantidad_diferida(detalles, request)
+            asistencia_detalle = detalles.first()
+            
+            # Verificar si se encontró un registro para actualizar
+            if not asistencia_detalle:
+                return Response({"error": "No se encontró el registro de ImportarAsistenciaDetalle para actualizar en el día abierto más cercano."}, status=status.HTTP_404_NOT_FOUND)
+            
+            # Actualizar la cantidad si existe en los datos de la solicitud
+            if 'cantidad' in request.data:
+                asistencia_detalle.cantidad = request.data['cantidad']
+                asistencia_detalle.save()
+                
+                # Serializar la asistencia actualizada y sus detalles
+                asistencia = ImportarAsistencia.objects.filter(pk=asistencia_detalle.importar_asistencia_id)
+                data = asistencias_rapidas(asistencia)[0]
+                
+                return Response(data, status=status.HTTP_200_OK)
+            else:
+                return Response({"error": "La cantidad no se proporcionó en los datos de la solicitud"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@lectura_en_replica
+def importar_asistencia_list(request):
+    try:
+        # Primero los días ya archivados (api/archivo.py), en el orden en que se archivaron
+        data = asistencias_rapidas(ImportarAsistenciaHistorico.objects.order_by('clave'))
+        importar_asistencias = ImportarAsistencia.objects.all()
+        registro_abierto = None
+        if en_replica():
+            registro_abierto = dia_abierto()  # Siempre de la base principal
+        if registro_abierto:
+            # Los días cerrados desde la réplica; el día abierto, desde la base principal
+            data.extend(asistencias_rapidas(importar_asistencias.exclude(fecha__gte=registro_abierto.FechaAbierto)))
+            with en_primaria():
+                data.extend(asistencias_rapidas(importar_asistencias.filter(fecha__gte=registro_abierto.FechaAbierto)))
+        else:
+            data.extend(asistencias_rapidas(importar_asistencias))
+        data = cantidades.superponer(data)
+        return Response(data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+# ------------------------------------------------------------------------------------
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+from ..models import ImportarAsistencia
+from ..serializers import asistencias_rapidas
+from ..cantidades import cantidades
+from ..empresas import base_actual
+from ..dia import consultar_dia_abierto, dia_abierto
+from datetime import datetime
+from datetime import timedelta
+from django.db.models import Q
+
+
+class POTAAsistenciaUpdateByCodigoGeneralView(APIView):
+    def get(self, request, codigo_general=None):
+        try:
+            # Verificar si el día está abierto
+            registro_abierto = dia_abierto()
+            if not registro_abierto:
+                return Response({"error": "El día está cerrado, no se pueden obtener datos de asistencia."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            
+            # Obtener la fecha de cierre del registro abierto
+            fecha_cierre = registro_abierto.FechaCerrado
+            
+            # Calcular la fecha mínima y máxima para el rango de búsqueda
+            fecha_inicio = registro_abierto.FechaAbierto
+            fecha_fin = fecha_cierre if fecha_cierre else datetime.now().strftime('%Y%m%d')
+            
+            # Filtrar los trabajadores importados en el rango de fechas
+            importar_asistencias = ImportarAsistencia.objects.filter(
+                fecha__range=(fecha_inicio, fecha_fin)
+            )
+            
+            # Serializar los datos de asistencia y sus detalles, con las cantidades aún sin guardar
+            data = cantidades.superponer(asistencias_rapidas(importar_asistencias))
+            
+            return Response(data, status=status.HTTP_200_OK)
+        
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def put(self, request, idcodigogeneral):
+        try:
+            # Verificar si el día está abierto (sin caché: es una escritura)
+            registro_abierto = consultar_dia_abierto()
+            if not registro_abierto:
+                return Response({"error": "El día está cerrado, no se pueden actualizar los datos de asistencia."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            
+            # Filtrar el ImportarAsistenciaDetalle basado en la fecha de apertura del registro más reciente y el idcodigogeneral
+            detalles = ImportarAsistenciaDetalle.objects.filter(
+                Q(importar_asistencia__fecha__gte=registro_abierto.FechaAbierto) &
+                Q(idcodigogeneral=idcodigogeneral)
+            )
+            if settings.CANTIDADES_DIFERIDAS and base_actual() == 'default':
+                return registrar_cantidad_diferida(detalles, request)
+            asistencia_detalle = detalles.first()
+            
+            # Verificar si se encontró el registro de asistencia
+            if not asistencia_detalle:
+                return Response({"error": "No se encontró el registro de ImportarAsistenciaDetalle con idcodigogeneral proporcionado o no pertenece al día abierto actual."},
+                                status=status.HTTP_404_NOT_FOUND)
+            
+            # Actualizar la cantidad si existe en los datos de la solicitud
+            if 'cantidad' in request.data:
+                asistencia_detalle.cantidad = request.data['cantidad']
+                asistencia_detalle.save()
+                
+                # Serializar la asistencia actualizada y sus detalles
+                asistencia = ImportarAsistencia.objects.filter(pk=asistencia_detalle.importar_asistencia_id)
+                data = asistencias_rapidas(asistencia)[0]
+                
+                return Response(data, status=status.HTTP_200_OK)
+            else:
+                return Response({"error": "La cantidad no se proporcionó en los datos de la solicitud"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
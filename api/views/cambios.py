@@ -0,0 +1,24 @@
+# api/views/cambios.py
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from django.conf import settings
+from ..cambios import leer_cambios
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cambios_lista(request):
+    # ?desde=<último id procesado>&limite=<n>; el consumidor sigue con ?desde=<siguiente>.
+    # Un id que falta corta la página hasta que aparece o pasan CAMBIOS_VENTANA_HUECOS segundos
+    # (5 por defecto): es la demora máxima que agrega una transacción deshecha (ver api/cambios.py)
+    try:
+        desde = int(request.query_params.get('desde', 0))
+        limite = int(request.query_params.get('limite', settings.CAMBIOS_LIMITE))
+    except ValueError:
+        return Response({"error": "desde y limite deben ser números enteros."}, status=status.HTTP_400_BAD_REQUEST)
+    limite = max(1, min(limite, settings.CAMBIOS_LIMITE_MAXIMO))
+
+    cambios = leer_cambios(desde, limite)
+    siguiente = cambios[-1]['id'] if cambios else desde
+    return Response({'cambios': cambios, 'siguiente': siguiente}, status=status.HTTP_200_OK)
@@ -0,0 +1,68 @@
+# api/views/dia.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from ..serializers import RegistroSerializer
+from ..cantidades import cantidades
+from ..dia import DiaYaAbierto, SinDiaAbierto, abrir_dia, cerrar_dia
+from ..sucursales import con_sucursal, sucursal_actual
+
+def _sucursal_de(request):
+    # Abrir y cerrar aceptan la sucursal igual: en el cuerpo ({"idsucursal": ...}) o en la cabecera
+    # X-Sucursal. El cierre suele ir sin cuerpo, y un cuerpo vacío o que no es JSON no es un error aquí
+    try:
+        datos = request.data
+    except (ParseError, UnsupportedMediaType):
+        datos = {}
+    idsucursal = datos.get('idsucursal') if hasattr(datos, 'get') else None
+    return idsucursal or sucursal_actual()
+
+class DiaAPIView(APIView):
+    def post(self, request):
+        # La base de datos rechaza un segundo día abierto en la misma sucursal (api/dia.py);
+        # sin sucursal se abre el día general
+        try:
+            with con_sucursal(_sucursal_de(request)):
+                registro = abrir_dia()
+        except DiaYaAbierto:
+            return Response({"message": "Ya hay un día abierto."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(RegistroSerializer(registro).data, status=status.HTTP_201_CREATED)
+
+    def put(self, request):
+        # Las cantidades diferidas de este proceso se guardan antes de cerrar (y de archivar) el día
+        cantidades.vaciar()
+
+        try:
+            with con_sucursal(_sucursal_de(request)):
+                registro, tareas = cerrar_dia()
+        except SinDiaAbierto:
+            return Response({"error": "No hay día abierto para cerrar"}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = RegistroSerializer(registro).data
+        data['tareas'] = [tarea.id for tarea in tareas]
+        return Response(data)
+
+
+#------------------------------------------
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from django.db.models import Q
+from ..models import Registro
+from ..serializers import RegistroSerializer
+from ..replicas import lectura_en_replica
+from ..sucursales import sucursal_actual
+
+@api_view(['GET'])
+@lectura_en_replica
+def registros_lista(request):
+    try:
+        registros = Registro.objects.all()
+        if sucursal_actual():
+            # Los días de la sucursal y los generales
+            registros = registros.filter(Q(idsucursal=sucursal_actual()) | Q(idsucursal__isnull=True))
+        serializer = RegistroSerializer(registros, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,37 @@
+# api/views/diagnostico.py
+import ipaddress
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from ..metricas import metricas
+
+def metricas_prometheus(request):
+    # Sin autenticación para que Prometheus pueda leerla: solo desde las redes de METRICAS_REDES_PERMITIDAS
+    ip = ipaddress.ip_address(request.META.get('REMOTE_ADDR') or '0.0.0.0')
+    if not any(ip in ipaddress.ip_network(red) for red in settings.METRICAS_REDES_PERMITIDAS):
+        return HttpResponseForbidden()
+    return HttpResponse(metricas.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+#------------------------------------------
+import os
+from django.http import FileResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import status
+from ..perfiles import EsAdministrador, listar_perfiles, ruta_perfil
+
+@api_view(['GET'])
+@permission_classes([EsAdministrador])
+def perfiles_lista(request):
+    # Perfiles guardados por api/perfiles.py, del más reciente al más antiguo
+    return Response(listar_perfiles(), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([EsAdministrador])
+def perfil_descarga(request, perfil):
+    # JSON con el SQL y el informe; ?formato=prof descarga el archivo de cProfile (pstats, snakeviz)
+    extension = '.prof' if request.query_params.get('formato') == 'prof' else '.json'
+    ruta = ruta_perfil(perfil, extension)
+    if ruta is None:
+        return Response({'error': 'Perfil no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(open(ruta, 'rb'), as_attachment=True, filename=os.path.basename(ruta))
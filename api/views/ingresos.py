@@ -0,0 +1,108 @@
+# api/views/ingresos.py
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from ..models import ImportarAsistencia
+from ..dia import dia_abierto
+from ..serializers import CAMPOS_DETALLE, asistencias_en_stream, asistencias_rapidas, json_en_stream
+from ..cantidades import cantidades
+
+@api_view(['GET'])
+def ingresos_del_dia_actual(request, idcodigogeneral=None):
+    try:
+        # Obtener el registro abierto actual
+        registro_abierto = dia_abierto()
+        if not registro_abierto:
+            return Response({"error": "No hay registro abierto para el día actual."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        # Obtener la fecha de apertura y cierre del registro abierto
+        fecha_apertura = registro_abierto.FechaAbierto
+        fecha_cierre = registro_abierto.FechaCerrado
+        
+        # Si la fecha de cierre no está establecida, usar la fecha actual
+        if not fecha_cierre:
+            fecha_cierre = timezone.now().strftime('%Y%m%d')
+
+        # Filtrar los registros de ImportarAsistencia dentro del rango de fechas del registro abierto
+        importar_asistencias = ImportarAsistencia.objects.filter(
+            fecha__range=(fecha_apertura, fecha_cierre)
+        )
+
+        # Si se proporciona idcodigogeneral, filtrar por ese valor
+        if idcodigogeneral:
+            # Filtrar los registros por idcodigogeneral
+            importar_asistencias = importar_asistencias.filter(detalle__idcodigogeneral=idcodigogeneral)
+
+            # Verificar si hay registros asociados con el idcodigogeneral proporcionado
+            if not importar_asistencias.exists():
+                return Response({"error": f"No se encontraron registros para el idcodigogeneral {idcodigogeneral}."},
+                                status=status.HTTP_404_NOT_FOUND)
+
+        # Serializar los datos y sus detalles (sin repetir cabeceras). En JSON se escribe mientras
+        # se lee, por lotes, sin armar la lista del día completo en memoria
+        if request.accepted_renderer.format == 'json':
+            filas = cantidades.superponer_en_stream(asistencias_en_stream(importar_asistencias, CAMPOS_DETALLE))
+            return StreamingHttpResponse(json_en_stream(filas), content_type='application/json')
+
+        data = cantidades.superponer(asistencias_rapidas(importar_asistencias, CAMPOS_DETALLE))
+        return Response(data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+#----------------------------------------------------------------
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from django.utils import timezone
+from ..models import ImportarAsistenciaDetalle, ImportarAsistenciaDetalleHistorico
+from ..dia import dia_abierto
+from ..serializers import ingresos_trabajador_rapidos
+from ..cantidades import cantidades
+from ..cache import ingresos_trabajador_en_cache, guardar_ingresos_trabajador
+import re
+
+@api_view(['GET'])
+def ingresos_trabajador(request, idcodigogeneral):
+    # Detalles de un trabajador en el día abierto o en el rango ?desde=YYYYMMDD&hasta=YYYYMMDD
+    try:
+        desde = request.query_params.get('desde')
+        hasta = request.query_params.get('hasta')
+        if hasta and not desde:
+            return Response({"error": "Falta el parámetro desde."}, status=status.HTTP_400_BAD_REQUEST)
+        if any(fecha and not re.fullmatch(r'\d{8}', fecha) for fecha in (desde, hasta)):
+            return Response({"error": "Las fechas deben tener el formato YYYYMMDD."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if desde:
+            hasta = hasta or timezone.now().strftime('%Y%m%d')
+        else:
+            registro_abierto = dia_abierto()
+            if not registro_abierto:
+                return Response({"error": "No hay registro abierto para el día actual."},
+                                status=status.HTTP_404_NOT_FOUND)
+            desde = registro_abierto.FechaAbierto
+            hasta = registro_abierto.FechaCerrado or timezone.now().strftime('%Y%m%d')
+
+        data = ingresos_trabajador_en_cache(idcodigogeneral, desde, hasta)
+        if data is None:
+            # Una consulta por tabla sobre el índice de idcodigogeneral; el día abierto nunca está archivado
+            data = []
+            if request.query_params.get('desde'):
+                data.extend(ingresos_trabajador_rapidos(ImportarAsistenciaDetalleHistorico.objects.filter(
+                    periodo__range=(desde[:6], hasta[:6]),
+                    idcodigogeneral=idcodigogeneral,
+                    importar_asistencia__fecha__range=(desde, hasta)
+                )))
+            data.extend(ingresos_trabajador_rapidos(ImportarAsistenciaDetalle.objects.filter(
+                idcodigogeneral=idcodigogeneral,
+                importar_asistencia__fecha__range=(desde, hasta)
+            )))
+            guardar_ingresos_trabajador(idcodigogeneral, desde, hasta, data)
+
+        return Response(cantidades.superponer(data), status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
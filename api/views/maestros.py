@@ -0,0 +1,265 @@
+# api/views/maestros.py
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Empresa
+from ..serializers import EmpresaSerializer
+
+class EmpresaListCreateAPIView(APIView):
+    def get(self, request):
+        empresas = Empresa.objects.all()
+        serializer = EmpresaSerializer(empresas, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = EmpresaSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+from rest_framework import generics
+from ..models import TipoEnvio
+from ..serializers import TipoEnvioSerializer
+
+class TipoEnvioListCreate(generics.ListCreateAPIView):
+    queryset = TipoEnvio.objects.all()
+    serializer_class = TipoEnvioSerializer
+
+
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from ..models import Responsable
+from ..serializers import ResponsableSerializer
+
+@api_view(['GET', 'POST'])
+def responsable_list(request):
+    if request.method == 'GET':
+        responsables = Responsable.objects.all()
+        serializer = ResponsableSerializer(responsables, many=True)
+        return Response(serializer.data)
+
+    elif request.method == 'POST':
+        serializer = ResponsableSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET', 'PUT', 'DELETE'])
+def responsable_detail(request, pk):
+    try:
+        responsable = Responsable.objects.get(pk=pk)
+    except Responsable.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        serializer = ResponsableSerializer(responsable)
+        return Response(serializer.data)
+
+    elif request.method == 'PUT':
+        serializer = ResponsableSerializer(responsable, data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    elif request.method == 'DELETE':
+        responsable.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Planilla
+from ..serializers import PlanillaSerializer
+
+class PlanillaAPIView(APIView):
+    def get(self, request):
+        planillas = Planilla.objects.all()
+        serializer = PlanillaSerializer(planillas, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = PlanillaSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def put(self, request, id):
+        planilla = Planilla.objects.get(idplanilla=id)
+        serializer = PlanillaSerializer(planilla, data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, id):
+        planilla = Planilla.objects.get(idplanilla=id)
+        planilla.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Emisor
+from ..serializers import EmisorSerializer
+
+class EmisorListCreateAPIView(APIView):
+    def get(self, request):
+        emisor = Emisor.objects.all()
+        serializer = EmisorSerializer(emisor, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = EmisorSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Especie
+from ..serializers import EspecieSerializer
+
+class EspecieListCreateAPIView(APIView):
+    def get(self, request):
+        especie = Especie.objects.all()
+        serializer = EspecieSerializer(especie, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = EspecieSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Turno
+from ..serializers import TurnoSerializer
+
+class TurnoListCreateAPIView(APIView):
+    def get(self, request):
+        turno = Turno.objects.all()
+        serializer = TurnoSerializer(turno, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = TurnoSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Consumidor
+from ..serializers import ConsumidorSerializer
+
+class ConsumidorListCreateAPIView(APIView):
+    def get(self, request):
+        consumidor = Consumidor.objects.all()
+        serializer = ConsumidorSerializer(consumidor, many=True)
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = ConsumidorSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+#------------------------------------------
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from ..busqueda import INDICES
+
+MAX_RESULTADOS_BUSQUEDA = 50
+
+@api_view(['GET'])
+def buscar_nombres(request, modelo):
+    # /api/buscar/<consumidor|responsable>/?q=<texto>&k=<cantidad>
+    indice = INDICES.get(modelo)
+    if indice is None:
+        return Response({"error": f"No se puede buscar en {modelo}."}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        k = min(int(request.query_params.get('k', 10)), MAX_RESULTADOS_BUSQUEDA)
+    except ValueError:
+        return Response({"error": "k debe ser un número."}, status=status.HTTP_400_BAD_REQUEST)
+
+    texto = request.query_params.get('q', '')
+    resultados = indice.buscar(texto, k) if texto.strip() and k > 0 else []
+    return Response(resultados, status=status.HTTP_200_OK)
+
+
+#------------------------------------------
+from rest_framework.decorators import api_view
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from ..catalogos import paquete_catalogos
+
+@api_view(['GET'])
+def catalogos(request):
+    # Todos los catálogos y el día abierto en un solo documento, ya serializado y comprimido
+    paquete = paquete_catalogos()
+    etag = f'W/"{paquete["version"]}"'
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(paquete['gzip'], content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(paquete['json'], content_type='application/json')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'  # La app puede guardarlo, pero debe revalidar con el ETag
+    patch_vary_headers(response, ['Accept-Encoding', 'X-Sucursal'])
+    return response
+
+
+#------------------------------------------
+from django.conf import settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from ..catalogos_lote import CATALOGOS_LOTE, ConflictoLote, ErroresLote, LoteCatalogo
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def catalogo_lote(request, catalogo):
+    # {"crear": [{...}], "actualizar": [{<código>, ...}], "eliminar": [<código>, ...]}; todo o nada
+    if catalogo not in CATALOGOS_LOTE:
+        return Response({'error': 'Catálogos válidos: ' + ', '.join(CATALOGOS_LOTE) + '.'},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    operaciones = {}
+    for operacion in ('crear', 'actualizar', 'eliminar'):
+        filas = request.data.get(operacion, []) if isinstance(request.data, dict) else None
+        if not isinstance(filas, list):
+            return Response({'error': f'"{operacion}" debe ser una lista.'}, status=status.HTTP_400_BAD_REQUEST)
+        operaciones[operacion] = filas
+    if sum(len(filas) for filas in operaciones.values()) > settings.CATALOGOS_LOTE_MAX_FILAS:
+        return Response({'error': f'Se permiten como máximo {settings.CATALOGOS_LOTE_MAX_FILAS} filas por petición.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        resultado = LoteCatalogo(catalogo).aplicar(**operaciones)
+    except ConflictoLote as e:
+        return Response({'errores': e.errores}, status=status.HTTP_409_CONFLICT)
+    except ErroresLote as e:
+        return Response({'errores': e.errores}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(resultado, status=status.HTTP_200_OK)
@@ -0,0 +1,113 @@
+# api/views/reportes.py
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import ImportarAsistencia
+from ..serializers import CAMPOS_DETALLE, asistencias_rapidas
+from ..models import Registro
+from ..archivo import asistencias_en_rango
+from ..replicas import en_primaria, lectura_en_replica
+from ..sucursales import sucursal_actual
+from django.db.models import F, Q
+from contextlib import nullcontext
+
+@api_view(['GET'])
+@lectura_en_replica
+def importaciones_por_fecha(request, fecha_abierto):
+    try:
+        # Obtener el registro para la fecha proporcionada (de la base principal: puede estar recién cerrado)
+        # Con sucursal, su propio día de esa fecha o, si no tuvo, el día general
+        registros = Registro.objects.filter(FechaAbierto=fecha_abierto)
+        if sucursal_actual():
+            registros = registros.filter(
+                Q(idsucursal=sucursal_actual()) | Q(idsucursal__isnull=True)
+            ).order_by(F('idsucursal').asc(nulls_last=True))
+        with en_primaria():
+            registro = registros.first()
+        
+        if not registro:
+            return Response({"error": "No hay registro para la fecha proporcionada."},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        # Obtener la fecha de apertura y cierre del registro
+        fecha_apertura = registro.FechaAbierto
+        fecha_cierre = registro.FechaCerrado
+        
+        # Filtrar los registros dentro del rango de fechas del registro, en las tablas
+        # actuales y, si el día ya fue archivado, también en el histórico de su periodo
+        consultas = asistencias_en_rango(fecha_apertura, fecha_cierre, registro.archivado)
+
+        # Serializar los datos y sus detalles; un día abierto se lee de la base principal
+        data = []
+        with en_primaria() if registro.estado == 'Abierto' else nullcontext():
+            for importar_asistencias in consultas:
+                data.extend(asistencias_rapidas(importar_asistencias, CAMPOS_DETALLE))
+        
+        return Response(data, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+#------------------------------------------
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from datetime import datetime
+from ..reportes import DIMENSIONES, MAX_DIAS, reporte_rango
+from ..replicas import lectura_en_replica
+
+@api_view(['GET'])
+@lectura_en_replica
+def reporte_por_rango(request):
+    # /api/reportes/rango/?desde=YYYYMMDD&hasta=YYYYMMDD&agrupar=idcodigogeneral,idlabor
+    try:
+        desde = datetime.strptime(request.query_params.get('desde', ''), '%Y%m%d').date()
+        hasta = datetime.strptime(request.query_params.get('hasta', ''), '%Y%m%d').date()
+    except ValueError:
+        return Response({"error": "desde y hasta son obligatorios con el formato YYYYMMDD."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if hasta < desde or (hasta - desde).days >= MAX_DIAS:
+        return Response({"error": f"El rango debe ser válido y de hasta {MAX_DIAS} días."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    agrupar = [dimension for dimension in request.query_params.get('agrupar', '').split(',') if dimension]
+    desconocidas = [dimension for dimension in agrupar if dimension not in DIMENSIONES]
+    if desconocidas or len(set(agrupar)) != len(agrupar):
+        return Response({"error": "Dimensiones válidas: " + ', '.join(DIMENSIONES) + "."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    filas = reporte_rango(desde, hasta, agrupar)
+    return Response({
+        "desde": desde.strftime('%Y%m%d'),
+        "hasta": hasta.strftime('%Y%m%d'),
+        "agrupar": agrupar,
+        "filas": filas,
+    }, status=status.HTTP_200_OK)
+
+
+#------------------------------------------
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from ..ranking import ranking
+
+MAX_RANKING = 500
+
+@api_view(['GET'])
+def ranking_dia(request, idcodigogeneral=None):
+    # Totales de cantidad del día abierto por trabajador, labor y especie.
+    # /api/ranking/?n=20&idlabor=&idespecie=  o  /api/ranking/<idcodigogeneral>/ con su posición
+    idlabor = request.query_params.get('idlabor') or None
+    idespecie = request.query_params.get('idespecie') or None
+    try:
+        n = min(int(request.query_params.get('n', 20)), MAX_RANKING)
+    except ValueError:
+        return Response({"error": "n debe ser un número."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if idcodigogeneral:
+        fecha, filas = ranking.trabajador(idcodigogeneral, idlabor, idespecie)
+    else:
+        fecha, filas = ranking.top(n, idlabor, idespecie)
+    if fecha is None:
+        return Response({"error": "No hay registro abierto para el día actual."}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"fecha": fecha, "ranking": filas}, status=status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+# api/views/tareas.py
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import Tarea
+from ..serializers import TareaSerializer
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tareas_lista(request):
+    tareas = Tarea.objects.order_by('-id')
+
+    # Filtros opcionales: ?registro=<id>&estado=<estado>
+    registro = request.query_params.get('registro')
+    if registro:
+        tareas = tareas.filter(registro_id=registro)
+    estado = request.query_params.get('estado')
+    if estado:
+        tareas = tareas.filter(estado=estado)
+
+    serializer = TareaSerializer(tareas[:200], many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def tarea_detalle(request, pk):
+    try:
+        tarea = Tarea.objects.get(pk=pk)
+    except Tarea.DoesNotExist:
+        return Response({"error": "La tarea no existe."}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = TareaSerializer(tarea)
+    return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,226 @@
+# api/views/usuarios.py
+from django.contrib.auth import authenticate
+from rest_framework import viewsets
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import Q
+from django.http import JsonResponse
+from datetime import datetime, timedelta
+
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from ..authentication import TokenUsuario, revocar_tokens
+from ..login import LoginDniThrottle, LoginIpThrottle, ejecutar_login
+from ..models import CustomUser
+from ..serializers import CustomUserSerializer
+
+class UsuariosPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'tamano'
+    max_page_size = 500
+
+class CustomUserViewSet(viewsets.ModelViewSet):
+    queryset = CustomUser.objects.order_by('apel_nomb', 'id')
+    serializer_class = CustomUserSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = UsuariosPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Búsqueda por prefijo de DNI o de apellidos y nombres: ?buscar=<texto>
+        # (LIKE 'texto%' usa los índices de dni y apel_nomb)
+        buscar = self.request.query_params.get('buscar')
+        if buscar and self.action == 'list':
+            queryset = queryset.filter(Q(dni__istartswith=buscar) | Q(apel_nomb__istartswith=buscar))
+        return queryset
+
+    def get_permissions(self):
+        # Usar AllowAny solo para la acción 'create'
+        if self.action == 'create':
+            self.permission_classes = [AllowAny]
+
+        return super().get_permissions()
+
+    def perform_create(self, serializer):
+        # El token se obtiene al iniciar sesión; aquí no se devolvía al cliente
+        serializer.save()
+
+    def perform_update(self, serializer):
+        serializer.save()
+        revocar_tokens(serializer.instance.id)
+
+    def perform_destroy(self, instance):
+        revocar_tokens(instance.id)
+        instance.delete()
+
+
+
+
+class ObtainTokenView(APIView):
+    throttle_classes = [LoginIpThrottle, LoginDniThrottle]
+
+    def post(self, request):
+        dni = request.data.get('dni')
+        password = request.data.get('password')
+
+        # El hash de la contraseña se calcula en el pool acotado de api/login.py
+        user = ejecutar_login(authenticate, request, dni=dni, password=password)
+
+        if user:
+            refresh = TokenUsuario.for_user(user)
+            return Response({
+                'id': user.id,
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            }, status=status.HTTP_200_OK)
+        else:
+            return Response({'error': 'Credenciales inválidas'}, status=status.HTTP_401_UNAUTHORIZED)
+
+class TokenUsuarioObtainPairView(TokenObtainPairView):
+    throttle_classes = [LoginIpThrottle, LoginDniThrottle]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+
+        try:
+            ejecutar_login(serializer.is_valid, raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def getCurrentUser(request):
+    user = request.user
+
+    # Utiliza tu propio serializador para CustomUser
+    user_serializer = CustomUserSerializer(user)
+
+    user_data = {
+        'id': user.id,
+        'dni': user.dni,
+        'apel_nomb': user.apel_nomb,
+        'tipo_usuarioapp': user.tipo_usuarioapp,
+        'is_active': user.is_active,
+        'is_staff': user.is_staff,
+        'date_joined': user.date_joined,
+        # Agrega otros campos según tu modelo de usuario
+    }
+
+    return JsonResponse(user_data)
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+def eliminar_usuario(request, dni):
+    try:
+        usuario = CustomUser.objects.get(dni=dni)
+    except CustomUser.DoesNotExist:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    revocar_tokens(usuario.id)
+    usuario.delete()
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def actualizar_usuario(request, dni):
+    try:
+        usuario = CustomUser.objects.get(dni=dni)
+    except CustomUser.DoesNotExist:
+        return Response({'error': 'El usuario no existe'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'PUT':
+        # Elimina la contraseña de los datos de la solicitud si está presente
+        if 'password' in request.data:
+            del request.data['password']
+
+        serializer = CustomUserSerializer(usuario, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            # Los tokens emitidos llevan el tipo de usuario anterior
+            revocar_tokens(usuario.id)
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+from rest_framework import generics
+from rest_framework import status
+from rest_framework.response import Response
+from ..models import CustomUser
+from ..serializers import CustomUserSerializer
+from ..cache import resumenes_usuarios
+
+class UserByDniAPIView(generics.RetrieveAPIView):
+    serializer_class = CustomUserSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        dni = self.kwargs.get('dni')
+        usuario = resumenes_usuarios([dni]).get(dni)
+        if usuario is None:
+            return Response({'detail': 'Usuario no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(usuario, status=status.HTTP_200_OK)
+
+from django.conf import settings
+from ..aprovisionamiento import aprovisionar, leer_filas
+from ..perfiles import EsAdministrador
+
+@api_view(['POST'])
+@permission_classes([EsAdministrador])
+def aprovisionar_usuarios(request):
+    # Cuerpo JSON (lista de usuarios o {"usuarios": [...]}) o archivo .csv/.json en el campo 'archivo'
+    try:
+        archivo = request.FILES.get('archivo')
+        if archivo:
+            filas = leer_filas(archivo.read().decode('utf-8'), archivo.name)
+        else:
+            filas = request.data.get('usuarios') if isinstance(request.data, dict) else request.data
+        if not isinstance(filas, list):
+            raise ValueError('Se esperaba una lista de usuarios.')
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if len(filas) > settings.APROVISIONAR_MAX_FILAS:
+        return Response({'error': f'Se permiten como máximo {settings.APROVISIONAR_MAX_FILAS} usuarios por petición; '
+                                  'para más usar el comando aprovisionar_usuarios.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    # En el mismo proceso: un pool de procesos por petición dejaría al worker arrancando intérpretes
+    # (APROVISIONAR_MAX_FILAS acota el hasheo a unos segundos, ~85 ms por usuario, bajo el timeout
+    # de gunicorn); el pool es para el comando
+    resultado = aprovisionar(filas, procesos=1)
+    estado = status.HTTP_201_CREATED if resultado['creados'] else status.HTTP_400_BAD_REQUEST
+    return Response(resultado, status=estado)
+
+MAX_DNIS_POR_LOTE = 500
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def usuarios_por_dni_lote(request):
+    # Cuerpo: {"dnis": ["12345678", ...]}; responde en el mismo orden los encontrados
+    dnis = request.data.get('dnis')
+    if not isinstance(dnis, list) or not all(isinstance(dni, str) for dni in dnis):
+        return Response({'error': 'dnis debe ser una lista de textos.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(dnis) > MAX_DNIS_POR_LOTE:
+        return Response({'error': f'Se permiten como máximo {MAX_DNIS_POR_LOTE} DNI por petición.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    dnis = list(dict.fromkeys(dnis))
+    encontrados = resumenes_usuarios(dnis)
+    return Response({
+        'usuarios': [encontrados[dni] for dni in dnis if dni in encontrados],
+        'no_encontrados': [dni for dni in dnis if dni not in encontrados],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def obtener_tipos_usuarios(request):
+    tipo_usuarioapp = [choice[1] for choice in CustomUser.TipoUsuario.choices]
+    return JsonResponse({'tipos_usuarios': tipo_usuarioapp})
@@ -47,19 +47,49 @@ INSTALLED_APPS = [
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),  # Tiempo de vida del token de acceso
+    'TOKEN_OBTAIN_SERIALIZER': 'api.serializers.TokenUsuarioObtainPairSerializer',
 }
 
-
+# Autenticación JWT por claims (api/authentication.py)
+JWT_REVOCACIONES_TTL = 30  # Segundos entre recargas de la lista de tokens revocados
+JWT_USUARIOS_CACHE_TTL = 60  # Segundos en caché de usuarios de tokens sin claims
 
 REST_FRAMEWORK = {
  'DEFAULT_AUTHENTICATION_CLASSES': (
- 'rest_framework_simplejwt.authentication.JWTAuthentication',
+ 'api.authentication.ClaimsJWTAuthentication',
  'rest_framework.authentication.BasicAuthentication',
  'rest_framework.authentication.SessionAuthentication',
- )
+ ),
+ # Los contadores de los throttles se guardan en CACHES['default']: con el LocMemCache por
+ # defecto cada worker cuenta por separado y el límite real se multiplica por la cantidad de
+ # workers. En producción CACHES['default'] debe ser compartido (Redis o Memcached).
+ 'DEFAULT_THROTTLE_RATES': {
+ 'login_dni': '10/min',  # Intentos de login por DNI
+ 'login_ip': '600/min',  # Por IP; alto porque los trabajadores de una planta salen por la misma IP
+ },
  }
 
+# Inicio de sesión (api/login.py y api/hashers.py)
+LOGIN_MAX_HILOS = 4  # Hashes de contraseña simultáneos por proceso; 0 = en el hilo de la petición
+LOGIN_MAX_EN_ESPERA = 32  # Logins en cola antes de responder 503
+LOGIN_TIEMPO_ESPERA = 10  # Segundos máximos de espera de un login
+LOGIN_PBKDF2_ITERACIONES = 320000  # Al cambiarlo, las contraseñas se vuelven a generar al iniciar sesión
+
+# Los de Django, con el PBKDF2 de costo configurable primero; los demás verifican las contraseñas
+# guardadas con ellos, que se vuelven a generar con el primero al iniciar sesión
+PASSWORD_HASHERS = [
+    'api.hashers.PBKDF2CostoConfigurableHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 MIDDLEWARE = [
+    'api.middleware.MetricasMiddleware',
+    'api.perfiles.PerfilMiddleware',
+    'api.empresas.EmpresaMiddleware',
+    'api.sucursales.SucursalMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.BrokenLinkEmailsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,6 +102,21 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Métricas por ruta en /api/metricas/ (api/middleware.py)
+METRICAS_REGISTRAR_LENTAS = True  # Registrar en el logger 'api.lentas' las peticiones lentas
+METRICAS_UMBRAL_LENTO_MS = 1000
+# /api/metricas/ no pide token (expone rutas, tiempos y volumen de peticiones): solo se sirve a estas redes.
+# Detrás de un proxy REMOTE_ADDR es la IP del proxy; en ese caso filtrar también en el proxy
+METRICAS_REDES_PERMITIDAS = ['127.0.0.1/32', '::1/128']
+
+# Perfiles bajo demanda en /api/perfiles/ (api/perfiles.py): cabecera X-Perfilar: cprofile|muestreo
+# de un administrador, o una fracción de las peticiones de cada ruta configurada aquí
+PERFILES_RUTAS = {}  # Ruta -> (modo, fracción), p. ej. {'api/pota/importarasistencia/': ('muestreo', 0.05)}
+PERFILES_DIRECTORIO = BASE_DIR / 'perfiles'
+PERFILES_MAX_ARCHIVOS = 200
+PERFILES_MAX_DIAS = 7
+PERFILES_INTERVALO_MUESTREO_MS = 5
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -162,3 +207,76 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # settings.py
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', '[::1]', '10.0.2.2']
+
+
+# Cola de tareas en segundo plano (api/tareas.py)
+# Los trabajadores se inician con: python manage.py procesar_tareas --procesos 4
+
+TAREAS_CIERRE_DIA = [  # Rutas de las funciones a encolar al cerrar un día
+    'api.archivo.archivar_dia',
+]
+TAREAS_MAX_INTENTOS = 3
+TAREAS_ESPERA_REINTENTO = 30  # Segundos, se duplica en cada reintento
+TAREAS_TIEMPO_MAXIMO = 600  # Segundos antes de considerar colgada una tarea 'En proceso'
+TAREAS_PROCESOS = 2
+
+
+# Caché de /api/trabajadores/<idcodigogeneral>/ingresos/ (api/cache.py)
+# Segundos de vida de cada respuesta; 0 la desactiva. Se invalida al guardar un detalle del
+# trabajador, pero con el caché local por defecto cada proceso solo ve sus propias
+# invalidaciones: con varios procesos configurar CACHES con un caché compartido (Redis, Memcached).
+INGRESOS_TRABAJADOR_CACHE_TTL = 0
+
+# Caché de resúmenes de usuarios por DNI (api/cache.py), invalidado al guardar o eliminar un usuario.
+# Segundos; 0 la desactiva. Con el caché local por defecto, en otros procesos un cambio puede tardar
+# hasta este tiempo en verse.
+USUARIOS_DNI_CACHE_TTL = 60
+
+# Alta masiva de usuarios (api/aprovisionamiento.py)
+APROVISIONAR_PROCESOS = 4  # Procesos del comando aprovisionar_usuarios para hashear en paralelo; 1 = en el mismo proceso
+APROVISIONAR_MAX_FILAS = 50  # Usuarios por petición a /api/usuarios/lote/ (~85 ms de hasheo cada uno, bajo el timeout de 30 s de gunicorn); sin límite en el comando
+
+# Paquete de catálogos de /api/catalogos/ (api/catalogos.py), invalidado al cambiar un catálogo o un día.
+# Segundos; con el caché local por defecto, es lo máximo que otro proceso puede servir un paquete anterior.
+CATALOGOS_CACHE_TTL = 300
+CATALOGOS_LOTE_MAX_FILAS = 1000  # Filas (altas + cambios + bajas) por petición a /api/catalogos/<catalogo>/lote/
+
+# Búsqueda por nombre en /api/buscar/<modelo>/ (api/busqueda.py)
+BUSQUEDA_TTL_RECONSTRUCCION = 300  # Segundos; el índice se rearma en segundo plano con los cambios de otros procesos
+
+# Puntero al día abierto (api/dia.py), invalidado al abrir o cerrar un día. Segundos; 0 lo desactiva.
+# Con el caché local por defecto, otro proceso puede ver el día anterior hasta este tiempo.
+DIA_ABIERTO_CACHE_TTL = 5
+
+# Ranking de cantidades del día abierto en /api/ranking/ (api/ranking.py)
+RANKING_TTL_RECONSTRUCCION = 30  # Segundos; se rearma desde la base de datos con lo guardado por otros procesos
+
+# Reporte por rango de fechas en /api/reportes/rango/ (api/reportes.py)
+REPORTES_HILOS = 4  # Meses agregados en paralelo por proceso; 0 = en el hilo de la petición
+REPORTES_CACHE_TTL = 60 * 60 * 24  # Segundos; solo se guardan los meses anteriores al día abierto
+
+# Escritura diferida de cantidades en los PUT de asistencia-merluza y asistencia-pota (api/cantidades.py)
+# Con True el PUT responde 202 con el cambio apenas queda en el log local, sin la asistencia completa.
+CANTIDADES_DIFERIDAS = False
+CANTIDADES_INTERVALO_MS = 200  # Cada cuánto se guardan en la base de datos; 0 = solo con vaciar()
+CANTIDADES_DIRECTORIO = BASE_DIR / 'cantidades_pendientes'  # Logs por proceso; debe sobrevivir a reinicios
+
+# Réplica de solo lectura para reportes (api/replicas.py): importar-asistencia-detalle,
+# importaciones-fechas, registros y reportes/rango leen de este alias, salvo los datos del día
+# abierto, que siempre se leen de 'default'. None = todo en 'default'. Ejemplo:
+#   DATABASES['replica'] = dict(DATABASES['default'], HOST='10.0.0.2', TEST={'MIRROR': 'default'})
+#   DATABASE_REPLICA = 'replica'
+# Para probarlo en local con SQLite, la réplica puede ser una copia del archivo de 'default'.
+DATABASE_REPLICA = None
+
+# Asistencias por empresa (api/empresas.py): idempresa -> alias de DATABASES con sus propias tablas
+# de asistencia (creadas con `migrate --database <alias>`). Las empresas que no están aquí quedan
+# en 'default'. Las peticiones eligen la empresa con la cabecera X-Empresa.
+EMPRESA_BASES_DE_DATOS = {}
+
+DATABASE_ROUTERS = ['api.empresas.EmpresaRouter', 'api.replicas.ReplicaRouter']
+
+# Log de cambios de asistencias en /api/cambios/ y `exportar_cambios` (api/cambios.py)
+CAMBIOS_LIMITE = 1000  # Cambios por página si no se indica ?limite=
+CAMBIOS_LIMITE_MAXIMO = 10000
+CAMBIOS_VENTANA_HUECOS = 5  # Segundos que se espera a que aparezca un id que falta antes de saltarlo: demora máxima por una transacción deshecha; debe superar la escritura de cambios más larga
@@ -0,0 +1,39 @@
+# Configuración para los workers de producción:
+#   DJANGO_SETTINGS_MODULE=backend.settings_produccion gunicorn backend.wsgi
+# La API solo usa tokens JWT: sin el admin, las sesiones ni los mensajes, cada worker arranca
+# con menos aplicaciones, modelos y middleware (ver `python manage.py bench_arranque`).
+from .settings import *
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages',
+                   'django.contrib.staticfiles')
+]
+
+# AuthenticationMiddleware y SessionMiddleware solo sirven a SessionAuthentication: DRF autentica
+# cada petición con ClaimsJWTAuthentication. BrokenLinkEmailsMiddleware y el CommonMiddleware
+# repetido no hacen nada útil en una API.
+MIDDLEWARE = [
+    'api.middleware.MetricasMiddleware',
+    'api.perfiles.PerfilMiddleware',
+    'api.empresas.EmpresaMiddleware',
+    'api.sucursales.SucursalMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+REST_FRAMEWORK = dict(REST_FRAMEWORK, DEFAULT_AUTHENTICATION_CLASSES=(
+    'api.authentication.ClaimsJWTAuthentication',
+    'rest_framework.authentication.BasicAuthentication',
+))
+
+TEMPLATES = [dict(TEMPLATES[0], OPTIONS={'context_processors': [
+    'django.template.context_processors.debug',
+    'django.template.context_processors.request',
+    'django.contrib.auth.context_processors.auth',
+]})]
@@ -0,0 +1,34 @@
+# Configuración de gunicorn; se lee sola al ejecutar `gunicorn backend.wsgi` desde esta carpeta.
+# Con preload_app el maestro carga Django, las rutas, vistas y serializers una sola vez
+# (api/arranque.py) y los workers los comparten al crearse con fork, en lugar de importarlos
+# cada uno. Un worker nuevo arranca al instante y usa solo la memoria que modifica.
+import gc
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings_produccion')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+preload_app = True
+max_requests = 5000  # Reinicia cada worker para acotar la memoria que deja de compartir
+max_requests_jitter = 500
+
+
+def when_ready(server):
+    # En el maestro, después de cargar backend.wsgi y antes de crear los workers
+    from api.arranque import precargar
+
+    rutas = precargar()
+    # Los objetos ya cargados no vuelven a ser revisados por el recolector: los workers no
+    # escriben en sus páginas y siguen compartidas
+    gc.collect()
+    gc.freeze()
+    server.log.info('Precargadas %s rutas', rutas)
+
+
+def post_fork(server, worker):
+    # Conexiones abiertas por el maestro después de precargar(), si las hubiera
+    from django.db import connections
+
+    for conexion in connections.all():
+        conexion.connection = None